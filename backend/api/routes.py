@@ -1,21 +1,66 @@
-import base64
 import io
+import json
 import os
 import re
+import threading
+import time
 import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
 from api.auth import get_current_user
-from graph.graph import graph_app
-from utils.pptx_generator import build_pptx
+from graph.draft import run_draft_pipeline
+from graph.graph import (
+    CHECKPOINT_RESUME_ATTEMPTS,
+    analysis_graph_app,
+    checkpoint_config,
+    clear_checkpoint,
+    graph_app,
+    pending_checkpoint_jobs,
+    record_resume_attempt,
+    resume_attempts,
+    run_config,
+    variant_graph_app,
+)
+from graph.nodes import Formatting_Node, derive_priorities, regenerate_narrative_slides, retheme_presentation
+from utils.code_outline import build_code_outline, code_language
+from utils.deadlines import JOB_DEADLINE_SECONDS, job_deadline, node_timeout
+from utils.image_pipeline import is_near_duplicate, preprocess_image
+from utils.llm_resilience import circuit_snapshot
+from utils.model_routing import MODEL_ROUTES, route_metrics_snapshot
+from utils.artifact_store import artifact_store, iter_chunks
+from utils.deck_snapshot import SNAPSHOT_MEDIA_TYPE, render_snapshot, snapshot_key
+from utils.pptx_generator import THEME_REGISTRY, resolve_theme
+from utils.render_cache import render_cache
+from utils.source_dedup import SourceDeduper
+from utils.source_filters import FILTER_REASONS, run_source_filters
+from utils.token_budget import estimate_tokens, plan_ingestion_limits, truncate_to_tokens
 import models
 
 router = APIRouter()
 
+
+class SlideRegenerationRequest(BaseModel):
+    slide_indexes: List[int]
+    instructions: str = ""
+
+
+class ThemeChangeRequest(BaseModel):
+    theme_vibe: str
+
+
+class ThemePreviewRequest(BaseModel):
+    themes: List[str] = list(THEME_REGISTRY)
+
+MAX_THEME_PREVIEWS = 8
+
 # In-memory job store for POC
 JOBS: Dict[str, Dict[str, Any]] = {}
 
@@ -33,8 +78,24 @@ SUPPORTED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
 
 MAX_FILES_PER_REQUEST = 12
 MAX_IMAGE_SOURCES = 6
-MAX_TEXT_CHARS_PER_SOURCE = 30000
-MAX_TOTAL_TEXT_CHARS = 180000
+# Per-file warnings for filtered sources; a repository archive can drop thousands.
+MAX_FILTER_WARNINGS = 20
+MAX_TEXT_TOKENS_PER_SOURCE, MAX_TOTAL_TEXT_TOKENS = plan_ingestion_limits()
+
+# raw: send code verbatim, outline: always send structural digests, auto: digest larger files.
+CODE_SOURCE_MODE = os.environ.get("OMNIPITCH_CODE_SOURCE_MODE", "auto").strip().lower()
+CODE_OUTLINE_MIN_CHARS = 2400
+
+# standard: LLM pipeline only, draft: heuristic deck only, draft_refine: heuristic deck now,
+# LLM deck swapped in when the background run completes.
+GENERATION_MODES = {"standard", "draft", "draft_refine"}
+
+# "custom" carries slides that Narrative_Node pushes while its output is still streaming.
+GRAPH_STREAM_MODES = ["updates", "custom"]
+
+MAX_BATCH_VARIANTS = 6
+BATCH_VARIANT_CONCURRENCY = int(os.environ.get("OMNIPITCH_BATCH_CONCURRENCY", 3))
+VARIANT_BRIEF_FIELDS = ("target_audience", "persona", "purpose", "key_message", "design_vibe")
 
 STEP_PROGRESS = {
     "Preparing Inputs": 5,
@@ -51,6 +112,7 @@ NEXT_STEP_BY_NODE = {
     "BusinessValue_Node": "Structuring Narrative",
     "Narrative_Node": "Formatting Custom JSON",
     "Formatting_Node": "Rendering Presentation",
+    "Repair_Node": "Rendering Presentation",
 }
 MODEL_REFUSAL_HINTS = (
     "can't assist with that",
@@ -119,35 +181,68 @@ def extract_text_from_pdf(content: bytes) -> str:
     return "\n".join(pages)
 
 
-def append_text_chunk(label: str, text: str, result: Dict[str, Any], count_as_source: bool = True):
+def append_text_chunk(label: str, text: str, result: Dict[str, Any], count_as_source: bool = True) -> bool:
     if not text or not text.strip():
-        return
+        return True
 
     normalized = text.strip()
-    if len(normalized) > MAX_TEXT_CHARS_PER_SOURCE:
-        normalized = normalized[:MAX_TEXT_CHARS_PER_SOURCE].rstrip()
+    if count_as_source:
+        duplicate = result["deduper"].check(label, normalized)
+        if duplicate:
+            result["duplicate_sources"].append({
+                "name": duplicate.label,
+                "duplicate_of": duplicate.duplicate_of,
+                "match": duplicate.kind,
+                "similarity": duplicate.similarity,
+            })
+            result["source_summary"]["duplicate_sources"] += 1
+            result["source_summary"]["duplicate_chars_skipped"] += len(normalized)
+            return False
+
+    token_count = estimate_tokens(normalized)
+    if token_count > MAX_TEXT_TOKENS_PER_SOURCE:
+        normalized = truncate_to_tokens(normalized, MAX_TEXT_TOKENS_PER_SOURCE)
+        token_count = estimate_tokens(normalized)
         result["warnings"].append(
             f"Trimmed '{label}' to keep the input focused for the AI pipeline."
         )
 
-    remaining_chars = MAX_TOTAL_TEXT_CHARS - result["text_char_count"]
-    if remaining_chars <= 0:
+    remaining_tokens = MAX_TOTAL_TEXT_TOKENS - result["text_token_count"]
+    if remaining_tokens <= 0:
         result["warnings"].append(
             "Input corpus reached the current size budget, so some extra text sources were skipped."
         )
-        return
+        return True
 
-    if len(normalized) > remaining_chars:
-        normalized = normalized[:remaining_chars].rstrip()
+    if token_count > remaining_tokens:
+        normalized = truncate_to_tokens(normalized, remaining_tokens)
+        token_count = estimate_tokens(normalized)
         result["warnings"].append(
             f"Partially included '{label}' because the combined input was very large."
         )
 
     result["text_parts"].append(f"\n\n--- Source: {label} ---\n{normalized}")
     result["text_char_count"] += len(normalized)
+    result["text_token_count"] += token_count
 
     if count_as_source:
         result["source_summary"]["text_sources"] += 1
+    return True
+
+
+def prepare_code_text(filename: str, text: str, result: Dict[str, Any]) -> str:
+    language = code_language(filename)
+    if CODE_SOURCE_MODE == "raw" or not language:
+        return text
+    if CODE_SOURCE_MODE == "auto" and language != "env" and len(text) < CODE_OUTLINE_MIN_CHARS:
+        return text
+
+    outline = build_code_outline(filename, text)
+    if not outline or (language != "env" and len(outline) >= len(text)):
+        return text
+
+    result["source_summary"]["code_outlines"] += 1
+    return outline
 
 
 def append_image_source(label: str, content: bytes, result: Dict[str, Any]) -> bool:
@@ -157,15 +252,26 @@ def append_image_source(label: str, content: bytes, result: Dict[str, Any]) -> b
         )
         return False
 
-    ext = os.path.splitext(label.lower())[1]
-    mime = "image/png" if ext == ".png" else "image/jpeg"
-    encoded = base64.b64encode(content).decode("utf-8")
-    result["images"].append(f"data:{mime};base64,{encoded}")
+    processed = preprocess_image(label, content)
+    if processed is None:
+        result["warnings"].append(f"Skipped '{label}' because the image could not be decoded or is too large to process safely.")
+        return False
+
+    if is_near_duplicate(processed.phash, result["image_hashes"]):
+        result["source_summary"]["duplicate_images"] += 1
+        result["warnings"].append(f"Skipped '{label}' because it duplicates an image already in the packet.")
+        return False
+
+    result["images"].append(processed.data_url)
+    result["image_details"].append(processed.detail)
+    result["image_hashes"].append(processed.phash)
     result["source_summary"]["image_sources"] += 1
+    result["source_summary"]["image_bytes_in"] += processed.bytes_in
+    result["source_summary"]["image_bytes_saved"] += processed.bytes_saved
     return True
 
 
-def ingest_bytes(filename: str, content: bytes, result: Dict[str, Any]) -> bool:
+def ingest_bytes(filename: str, content: bytes, result: Dict[str, Any], from_archive: bool = False) -> bool:
     ext = os.path.splitext((filename or "").lower())[1]
 
     if ext in SUPPORTED_ARCHIVE_EXTENSIONS:
@@ -179,7 +285,7 @@ def ingest_bytes(filename: str, content: bytes, result: Dict[str, Any]) -> bool:
 
                     archived_bytes = archive.read(archived_name)
                     result["source_summary"]["archive_entries"] += 1
-                    if ingest_bytes(archived_name, archived_bytes, result):
+                    if ingest_bytes(archived_name, archived_bytes, result, from_archive=True):
                         extracted_items += 1
 
             if extracted_items == 0:
@@ -193,16 +299,14 @@ def ingest_bytes(filename: str, content: bytes, result: Dict[str, Any]) -> bool:
 
     if ext == ".pdf":
         try:
-            append_text_chunk(filename, extract_text_from_pdf(content), result)
-            return True
+            return append_text_chunk(filename, extract_text_from_pdf(content), result)
         except Exception as exc:
             result["warnings"].append(f"Could not extract text from '{filename}': {exc}")
             return False
 
     if ext == ".docx":
         try:
-            append_text_chunk(filename, extract_text_from_docx(content), result)
-            return True
+            return append_text_chunk(filename, extract_text_from_docx(content), result)
         except Exception as exc:
             result["warnings"].append(f"Could not extract text from '{filename}': {exc}")
             return False
@@ -220,8 +324,25 @@ def ingest_bytes(filename: str, content: bytes, result: Dict[str, Any]) -> bool:
         result["warnings"].append(f"Skipped '{filename}' because no readable content could be extracted.")
         return False
 
-    append_text_chunk(filename, decoded_text, result)
-    return True
+    # Lockfiles, bundles and generated code arrive inside repository archives or as code files;
+    # a document the user picked on its own is always kept.
+    if from_archive or ext in SUPPORTED_CODE_EXTENSIONS:
+        filter_report = run_source_filters(filename, decoded_text)
+        filtered_bytes = result["source_summary"]["filtered_bytes"]
+        for filter_name, removed in filter_report.removed_bytes.items():
+            filtered_bytes[filter_name] = filtered_bytes.get(filter_name, 0) + removed
+        if filter_report.dropped_by:
+            result["source_summary"]["filtered_sources"] += 1
+            filtered_count = result["source_summary"]["filtered_sources"]
+            if filtered_count <= MAX_FILTER_WARNINGS:
+                reason = FILTER_REASONS.get(filter_report.dropped_by, filter_report.dropped_by)
+                result["warnings"].append(f"Left out '{filename}' because it is {reason}.")
+            elif filtered_count == MAX_FILTER_WARNINGS + 1:
+                result["warnings"].append("Further filtered files are only counted in the source summary.")
+            return False
+        decoded_text = filter_report.text
+
+    return append_text_chunk(filename, prepare_code_text(filename, decoded_text, result), result)
 
 
 def build_user_brief(
@@ -243,6 +364,288 @@ def build_user_brief(
     return "\n".join(lines)
 
 
+MERGED_STATE_KEYS = ("token_usage", "node_timings", "fallback_nodes")
+
+
+def apply_node_update(final_state: Dict[str, Any], node_state: Dict[str, Any]):
+    # Parallel branches each report only their own entry for reducer-backed keys.
+    for key, value in node_state.items():
+        if key in MERGED_STATE_KEYS and isinstance(value, dict):
+            final_state[key] = {**(final_state.get(key) or {}), **value}
+        else:
+            final_state[key] = value
+
+
+def summarize_node_timings(node_timings: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    if not node_timings:
+        return {}
+    started_at = min(timing["started_at"] for timing in node_timings.values())
+    finished_at = max(timing["finished_at"] for timing in node_timings.values())
+    serial_ms = sum(timing["duration_ms"] for timing in node_timings.values())
+    critical_path_ms = round((finished_at - started_at) * 1000, 1)
+    return {
+        "critical_path_ms": critical_path_ms,
+        "serial_ms": round(serial_ms, 1),
+        "parallel_savings_ms": round(max(serial_ms - critical_path_ms, 0), 1),
+    }
+
+
+def build_job_record(
+    org_name: str,
+    warnings: Optional[List[str]] = None,
+    sources: Optional[List[Dict[str, Any]]] = None,
+    source_summary: Optional[Dict[str, Any]] = None,
+    generation_mode: str = "standard",
+) -> Dict[str, Any]:
+    return {
+        "status": "uploading",
+        "current_step": "Preparing Inputs",
+        "progress_percent": STEP_PROGRESS["Preparing Inputs"],
+        "state": {},
+        "artifact": None,
+        "download_name": f"{safe_filename(org_name)}_Executive_Deck.pptx",
+        "error_msg": None,
+        "warnings": warnings or [],
+        "sources": sources or [],
+        "outline": [],
+        "presentation_json": None,
+        "slides_generated": 0,
+        "source_summary": source_summary or {},
+        "token_usage": {},
+        "node_timings": {},
+        "pipeline_timing": {},
+        "deadline_seconds": JOB_DEADLINE_SECONDS or None,
+        "fallback_nodes": {},
+        "fallback_slides": [],
+        "generation_mode": generation_mode,
+        "is_draft": False,
+        "draft_ms": None,
+        "refine_status": None,
+        "refine_job_id": None,
+        "revision": 0,
+        "last_revision": None,
+        "revising": False,
+        "created_at": time.time(),
+        "time_to_first_slide_ms": None,
+        "streamed_slides": 0,
+    }
+
+
+def pipeline_args_from_state(job_id: str, state: Dict[str, Any]) -> tuple:
+    return (
+        job_id,
+        state.get("raw_docs", ""),
+        state.get("images", []),
+        state.get("org_name", ""),
+        state.get("purpose", ""),
+        state.get("persona", ""),
+        state.get("target_audience", ""),
+        state.get("key_message", ""),
+        state.get("theme_vibe", ""),
+        state.get("image_details", []),
+    )
+
+
+def resume_pending_jobs() -> List[str]:
+    """Restart jobs whose checkpoints outlived the process that was running them."""
+    resumed = []
+    for job_id in pending_checkpoint_jobs():
+        if job_id in JOBS:
+            continue
+        # A refinement only matters to the draft job it swaps into, which did not survive the restart.
+        if job_id.endswith("-refine") or record_resume_attempt(job_id) > CHECKPOINT_RESUME_ATTEMPTS:
+            clear_checkpoint(job_id)
+            continue
+        snapshot = graph_app.get_state(checkpoint_config(job_id))
+        state = dict(snapshot.values or {})
+        JOBS[job_id] = build_job_record(state.get("org_name", ""))
+        threading.Thread(
+            target=execute_graph_pipeline,
+            args=pipeline_args_from_state(job_id, state),
+            daemon=True,
+        ).start()
+        resumed.append(job_id)
+    return resumed
+
+
+def mark_first_slide(job_id: str):
+    if JOBS[job_id].get("time_to_first_slide_ms") is None:
+        JOBS[job_id]["time_to_first_slide_ms"] = round((time.time() - JOBS[job_id]["created_at"]) * 1000, 1)
+
+
+def publish_stream_event(job_id: str, final_state: Dict[str, Any], payload: Any):
+    streamed = payload.get("narrative_slide") if isinstance(payload, dict) else None
+    # Once Formatting_Node has published the real deck, late slides from a stream that
+    # lost its deadline race must not overwrite it.
+    if not streamed or final_state.get("presentation_json"):
+        return
+    preview = streamed["presentation_json"]
+    JOBS[job_id]["presentation_json"] = preview
+    JOBS[job_id]["outline"] = [slide.get("title", "Untitled Slide") for slide in preview["slides"]]
+    JOBS[job_id]["streamed_slides"] = len(preview["slides"])
+    mark_first_slide(job_id)
+
+
+def publish_node_update(job_id: str, final_state: Dict[str, Any], node_name: str, node_state: Any):
+    if isinstance(node_state, dict):
+        apply_node_update(final_state, node_state)
+        JOBS[job_id]["state"] = final_state.copy()
+        if final_state.get("token_usage"):
+            JOBS[job_id]["token_usage"] = final_state["token_usage"]
+        if final_state.get("node_timings"):
+            JOBS[job_id]["node_timings"] = final_state["node_timings"]
+            JOBS[job_id]["pipeline_timing"] = summarize_node_timings(final_state["node_timings"])
+        if final_state.get("fallback_nodes"):
+            JOBS[job_id]["fallback_nodes"] = final_state["fallback_nodes"]
+        if final_state.get("presentation_json"):
+            JOBS[job_id]["presentation_json"] = final_state["presentation_json"]
+            mark_first_slide(job_id)
+
+    outline = []
+    if final_state.get("presentation_json", {}).get("slides"):
+        outline = [
+            slide.get("title", "Untitled Slide")
+            for slide in final_state["presentation_json"]["slides"]
+        ]
+    elif final_state.get("narrative_structure", {}).get("slides"):
+        outline = [
+            slide.get("title", "Untitled Slide")
+            for slide in final_state["narrative_structure"]["slides"]
+        ]
+
+    if outline:
+        JOBS[job_id]["outline"] = outline
+
+    next_step = NEXT_STEP_BY_NODE.get(node_name)
+    if next_step:
+        JOBS[job_id]["current_step"] = next_step
+        JOBS[job_id]["progress_percent"] = STEP_PROGRESS[next_step]
+
+
+def build_initial_state(
+    raw_text: str,
+    images: list,
+    org_name: str,
+    purpose: str,
+    persona: str,
+    target_audience: str,
+    key_message: str,
+    theme_vibe: str,
+    image_details: Optional[list] = None,
+) -> Dict[str, Any]:
+    return {
+        "raw_docs": raw_text,
+        "images": images,
+        "image_details": image_details or [],
+        "org_name": org_name,
+        "purpose": purpose,
+        "persona": persona,
+        "target_audience": target_audience,
+        "key_message": key_message,
+        "theme_vibe": theme_vibe,
+    }
+
+
+def store_deck(presentation_json: Dict[str, Any], org_name: str, theme_vibe: str) -> Dict[str, Any]:
+    data, render_source = render_cache.render(presentation_json, org_name, theme_vibe)
+    artifact = artifact_store.put(data).as_record()
+    # The snapshot is drawn from these exact bytes and keyed by their hash, so render-cache
+    # hits and re-stores of the same deck reuse it instead of drawing it again.
+    title = presentation_json.get("deck_title", "")
+    key = snapshot_key(artifact["key"], title)
+    stored = artifact_store.stat(key)
+    if stored is None:
+        stored = artifact_store.put(render_snapshot(data, title), SNAPSHOT_MEDIA_TYPE, key)
+    snapshot = stored.as_record()
+    snapshot.update({"deck_key": artifact["key"], "url": f"/api/snapshots/{key}"})
+    return {**artifact, "render_source": render_source, "snapshot": snapshot}
+
+
+def render_draft_deck(job_id: str, initial_state: Dict[str, Any]):
+    """Render the heuristic-only deck synchronously so the upload response can return it."""
+    draft_state = run_draft_pipeline(initial_state)
+    presentation_json = draft_state.get("presentation_json") or {}
+    artifact = store_deck(presentation_json, initial_state.get("org_name", ""), initial_state.get("theme_vibe", ""))
+    slides = presentation_json.get("slides", [])
+
+    JOBS[job_id].update({
+        "status": "completed",
+        "current_step": "Completed",
+        "progress_percent": STEP_PROGRESS["Completed"],
+        "state": draft_state,
+        "artifact": artifact,
+        "presentation_json": presentation_json,
+        "outline": [slide.get("title", "Untitled Slide") for slide in slides],
+        "slides_generated": len(slides) + 2,
+        "fallback_slides": list(range(len(slides))),
+        "is_draft": True,
+        "draft_ms": draft_state.get("draft_ms"),
+    })
+    mark_first_slide(job_id)
+
+
+REFINED_JOB_KEYS = (
+    "artifact", "presentation_json", "outline", "slides_generated", "state", "token_usage",
+    "node_timings", "pipeline_timing", "fallback_nodes", "fallback_slides",
+)
+
+
+def refine_draft_job(job_id: str, *pipeline_args):
+    """Run the LLM pipeline under a shadow job and swap its deck in over the draft."""
+    refine_job_id = f"{job_id}-refine"
+    JOBS[refine_job_id] = build_job_record("")
+    JOBS[job_id]["refine_status"] = "processing"
+    JOBS[job_id]["refine_job_id"] = refine_job_id
+
+    execute_graph_pipeline(refine_job_id, *pipeline_args)
+    refined = JOBS.pop(refine_job_id)
+    if refined["status"] != "completed":
+        # The draft stays downloadable; only the refinement is reported as failed. Nothing
+        # can retry the shadow job, so its thread goes too.
+        JOBS[job_id]["refine_status"] = "error"
+        clear_checkpoint(refine_job_id)
+        return
+
+    JOBS[job_id].update({key: refined[key] for key in REFINED_JOB_KEYS if key in refined})
+    JOBS[job_id]["is_draft"] = False
+    JOBS[job_id]["refine_status"] = "completed"
+
+
+def render_job_deck(job_id: str, final_state: Dict[str, Any], org_name: str, theme_vibe: str):
+    if not (final_state.get("presentation_json") or {}).get("slides"):
+        raise ValueError(final_state.get("errors") or "Narrative output did not contain any slides.")
+
+    slide_quality = final_state.get("slide_quality") or {}
+    JOBS[job_id]["slide_quality"] = slide_quality
+    if slide_quality.get("failing"):
+        JOBS[job_id]["warnings"].append(
+            f"{len(slide_quality['failing'])} slide(s) still have layout or density issues after "
+            f"{final_state.get('formatting_attempts', 0)} repair pass(es); review slides "
+            f"{', '.join(str(index + 1) for index in slide_quality['failing'])}."
+        )
+    dropped_images = ((final_state.get("token_usage") or {}).get("CodeParser_Node") or {}).get("images_dropped") or []
+    if dropped_images:
+        JOBS[job_id]["warnings"].append(
+            f"{len(dropped_images)} image(s) were not analyzed because they exceed the image token budget: "
+            f"image(s) {', '.join(str(index + 1) for index in dropped_images)} in upload order."
+        )
+    JOBS[job_id]["current_step"] = "Rendering Presentation"
+    JOBS[job_id]["progress_percent"] = STEP_PROGRESS["Rendering Presentation"]
+    artifact = store_deck(final_state.get("presentation_json", {}), org_name, theme_vibe)
+    generated_slides = final_state.get("presentation_json", {}).get("slides", [])
+
+    JOBS[job_id]["status"] = "completed"
+    JOBS[job_id]["artifact"] = artifact
+    JOBS[job_id]["slides_generated"] = len(generated_slides) + 2
+    JOBS[job_id]["current_step"] = "Completed"
+    JOBS[job_id]["progress_percent"] = STEP_PROGRESS["Completed"]
+    JOBS[job_id]["presentation_json"] = final_state.get("presentation_json")
+    JOBS[job_id]["fallback_slides"] = [
+        index for index, slide in enumerate(generated_slides)
+        if slide.get("content_origin") == "fallback"
+    ]
+
+
 def execute_graph_pipeline(
     job_id: str,
     raw_text: str,
@@ -253,6 +656,7 @@ def execute_graph_pipeline(
     target_audience: str,
     key_message: str,
     theme_vibe: str,
+    image_details: Optional[list] = None,
 ):
     """Background task to run LangGraph and generate PPTX."""
     try:
@@ -260,76 +664,140 @@ def execute_graph_pipeline(
         JOBS[job_id]["current_step"] = "Parsing Architecture"
         JOBS[job_id]["progress_percent"] = STEP_PROGRESS["Parsing Architecture"]
 
-        initial_state = {
-            "raw_docs": raw_text,
-            "images": images,
-            "org_name": org_name,
-            "purpose": purpose,
-            "persona": persona,
-            "target_audience": target_audience,
-            "key_message": key_message,
-            "theme_vibe": theme_vibe,
-        }
+        initial_state = build_initial_state(
+            raw_text, images, org_name, purpose, persona, target_audience, key_message, theme_vibe, image_details
+        )
 
+        # With a checkpointer, a job id that already has a thread resumes after its last
+        # completed node instead of paying for the upstream LLM calls again.
+        config = run_config(job_id, job_deadline())
+        snapshot = graph_app.get_state(config) if checkpoint_config(job_id) else None
+        stream_input = initial_state
         final_state = initial_state
-        for event in graph_app.stream(initial_state):
+        if snapshot and snapshot.values:
+            stream_input = None
+            final_state = {**initial_state, **snapshot.values}
+            JOBS[job_id]["resumed_from"] = list(snapshot.next) or ["Rendering Presentation"]
+
+        for mode, event in graph_app.stream(stream_input, config, stream_mode=GRAPH_STREAM_MODES):
+            if mode == "custom":
+                publish_stream_event(job_id, final_state, event)
+                continue
             for node_name, node_state in event.items():
-                if isinstance(node_state, dict):
-                    final_state.update(node_state)
-                    JOBS[job_id]["state"] = final_state.copy()
-                    if final_state.get("presentation_json"):
-                        JOBS[job_id]["presentation_json"] = final_state["presentation_json"]
-
-                outline = []
-                if final_state.get("presentation_json", {}).get("slides"):
-                    outline = [
-                        slide.get("title", "Untitled Slide")
-                        for slide in final_state["presentation_json"]["slides"]
-                    ]
-                elif final_state.get("narrative_structure", {}).get("slides"):
-                    outline = [
-                        slide.get("title", "Untitled Slide")
-                        for slide in final_state["narrative_structure"]["slides"]
-                    ]
-
-                if outline:
-                    JOBS[job_id]["outline"] = outline
-
-                next_step = NEXT_STEP_BY_NODE.get(node_name)
-                if next_step:
-                    JOBS[job_id]["current_step"] = next_step
-                    JOBS[job_id]["progress_percent"] = STEP_PROGRESS[next_step]
-
-        JOBS[job_id]["current_step"] = "Rendering Presentation"
-        JOBS[job_id]["progress_percent"] = STEP_PROGRESS["Rendering Presentation"]
-        pptx_path = build_pptx(final_state.get("presentation_json", {}), org_name, theme_vibe)
-        generated_slides = final_state.get("presentation_json", {}).get("slides", [])
-
-        JOBS[job_id]["status"] = "completed"
-        JOBS[job_id]["pptx_path"] = pptx_path
+                publish_node_update(job_id, final_state, node_name, node_state)
+
+        render_job_deck(job_id, final_state, org_name, theme_vibe)
         JOBS[job_id]["download_name"] = f"{safe_filename(org_name)}_Executive_Deck.pptx"
-        JOBS[job_id]["slides_generated"] = len(generated_slides) + 2
-        JOBS[job_id]["current_step"] = "Completed"
-        JOBS[job_id]["progress_percent"] = STEP_PROGRESS["Completed"]
-        JOBS[job_id]["presentation_json"] = final_state.get("presentation_json")
+        clear_checkpoint(job_id)
     except Exception as exc:
         JOBS[job_id]["status"] = "error"
         print(f"Generation job {job_id} failed: {exc}")
         JOBS[job_id]["error_msg"] = user_facing_generation_error(exc)
+        # The thread stays so a retry resumes after the last completed node, until the job
+        # has used up its resumes; it holds the raw sources and images, so not beyond that.
+        if resume_attempts(job_id) >= CHECKPOINT_RESUME_ATTEMPTS:
+            clear_checkpoint(job_id)
+
+
+def refresh_batch_progress(parent_id: str):
+    parent = JOBS[parent_id]
+    for variant in parent["variants"]:
+        child = JOBS.get(variant["job_id"], {})
+        variant["status"] = child.get("status")
+        variant["current_step"] = child.get("current_step")
+        variant["progress_percent"] = child.get("progress_percent", 0)
+    parent["progress_percent"] = round(
+        sum(variant["progress_percent"] for variant in parent["variants"]) / len(parent["variants"])
+    )
 
 
-@router.post("/upload")
-async def upload_document(
-    background_tasks: BackgroundTasks,
-    files: Optional[List[UploadFile]] = File(None),
-    file: Optional[UploadFile] = File(None),
-    org_name: str = Form(""),
-    purpose: str = Form(""),
-    target_audience: str = Form(""),
-    key_message: str = Form(""),
-    design_vibe: str = Form(""),
-    current_user: models.User = Depends(get_current_user),
-):
+def execute_batch_variant(parent_id: str, job_id: str, analysis_state: Dict[str, Any], variant: Dict[str, str]):
+    try:
+        state = dict(analysis_state)
+        for field in ("target_audience", "persona", "purpose"):
+            if variant[field]:
+                state[field] = variant[field]
+        if variant["design_vibe"]:
+            state["theme_vibe"] = variant["design_vibe"]
+        if variant["key_message"]:
+            state["key_message"] = variant["key_message"]
+            state["heuristic_priorities"] = derive_priorities(state.get("raw_docs", ""), variant["key_message"])
+
+        JOBS[job_id]["status"] = "processing"
+        final_state = dict(state)
+        for mode, event in variant_graph_app.stream(state, run_config(job_id, job_deadline()), stream_mode=GRAPH_STREAM_MODES):
+            if mode == "custom":
+                publish_stream_event(job_id, final_state, event)
+                continue
+            for node_name, node_state in event.items():
+                publish_node_update(job_id, final_state, node_name, node_state)
+                refresh_batch_progress(parent_id)
+
+        render_job_deck(job_id, final_state, state.get("org_name", ""), state.get("theme_vibe", ""))
+    except Exception as exc:
+        JOBS[job_id]["status"] = "error"
+        print(f"Batch variant {job_id} failed: {exc}")
+        JOBS[job_id]["error_msg"] = user_facing_generation_error(exc)
+    finally:
+        refresh_batch_progress(parent_id)
+
+
+def execute_batch_pipeline(parent_id: str, base_state: Dict[str, Any], variants: List[Dict[str, str]]):
+    """Analyse the shared sources once, then fan the audience-specific nodes out per variant."""
+    parent = JOBS[parent_id]
+    child_ids = [variant["job_id"] for variant in parent["variants"]]
+    try:
+        parent["status"] = "processing"
+        analysis_state = dict(base_state)
+        for event in analysis_graph_app.stream(base_state, run_config(parent_id, job_deadline())):
+            for node_name, node_state in event.items():
+                publish_node_update(parent_id, analysis_state, node_name, node_state)
+                for job_id in child_ids:
+                    JOBS[job_id]["current_step"] = parent["current_step"]
+                    JOBS[job_id]["progress_percent"] = parent["progress_percent"]
+    except Exception as exc:
+        print(f"Batch job {parent_id} failed during source analysis: {exc}")
+        for job_id in [parent_id] + child_ids:
+            JOBS[job_id]["status"] = "error"
+            JOBS[job_id]["error_msg"] = user_facing_generation_error(exc)
+        refresh_batch_progress(parent_id)
+        return
+
+    parent["current_step"] = "Generating Variants"
+    with ThreadPoolExecutor(max_workers=BATCH_VARIANT_CONCURRENCY, thread_name_prefix="omnipitch-batch") as pool:
+        for job_id, variant in zip(child_ids, variants):
+            pool.submit(execute_batch_variant, parent_id, job_id, analysis_state, variant)
+
+    refresh_batch_progress(parent_id)
+    completed = [job_id for job_id in child_ids if JOBS[job_id]["status"] == "completed"]
+    parent["status"] = "completed" if completed else "error"
+    parent["current_step"] = "Completed" if completed else parent["current_step"]
+    parent["slides_generated"] = sum(JOBS[job_id]["slides_generated"] for job_id in completed)
+    if len(completed) < len(child_ids):
+        parent["warnings"].append(f"{len(child_ids) - len(completed)} of {len(child_ids)} variant deck(s) failed to generate.")
+    if not completed:
+        parent["error_msg"] = "None of the variant decks could be generated."
+
+
+def parse_brief_variants(raw_variants: str) -> List[Dict[str, str]]:
+    try:
+        variants = json.loads(raw_variants or "[]")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Variants must be a JSON list of brief objects.")
+    if not isinstance(variants, list) or not 1 <= len(variants) <= MAX_BATCH_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_BATCH_VARIANTS} brief variants.")
+
+    parsed = []
+    for index, variant in enumerate(variants):
+        if not isinstance(variant, dict):
+            raise HTTPException(status_code=400, detail="Each variant must be an object of brief fields.")
+        item = {field: str(variant.get(field) or "").strip() for field in VARIANT_BRIEF_FIELDS}
+        item["label"] = str(variant.get("label") or item["target_audience"] or item["persona"] or f"Variant {index + 1}").strip()[:60]
+        parsed.append(item)
+    return parsed
+
+
+def collect_upload_files(files: Optional[List[UploadFile]], file: Optional[UploadFile]) -> List[UploadFile]:
     incoming_files = list(files or [])
     if file is not None:
         incoming_files.append(file)
@@ -339,33 +807,36 @@ async def upload_document(
             status_code=400,
             detail=f"You can upload up to {MAX_FILES_PER_REQUEST} files per generation."
         )
+    return incoming_files
 
-    job_id = str(uuid.uuid4())
+
+async def ingest_uploads(incoming_files: List[UploadFile], user_brief: str) -> Dict[str, Any]:
     ingestion_result = {
         "text_parts": [],
         "images": [],
+        "image_details": [],
+        "image_hashes": [],
         "warnings": [],
         "text_char_count": 0,
+        "text_token_count": 0,
+        "deduper": SourceDeduper(),
+        "duplicate_sources": [],
         "source_summary": {
             "files_received": len(incoming_files),
             "text_sources": 0,
             "image_sources": 0,
             "archive_entries": 0,
+            "code_outlines": 0,
+            "duplicate_sources": 0,
+            "duplicate_chars_skipped": 0,
+            "filtered_sources": 0,
+            "filtered_bytes": {},
+            "duplicate_images": 0,
+            "image_bytes_in": 0,
+            "image_bytes_saved": 0,
         },
     }
-    append_text_chunk(
-        "User Brief",
-        build_user_brief(
-            org_name,
-            purpose,
-            current_user.persona or "",
-            target_audience,
-            key_message,
-            design_vibe,
-        ),
-        ingestion_result,
-        count_as_source=False,
-    )
+    append_text_chunk("User Brief", user_brief, ingestion_result, count_as_source=False)
 
     source_manifest = []
     for uploaded_file in incoming_files:
@@ -377,36 +848,86 @@ async def upload_document(
             "size_bytes": len(content),
             "skipped": False,
         }
-        descriptor["skipped"] = not ingest_bytes(filename, content, ingestion_result)
+        duplicates_before = len(ingestion_result["duplicate_sources"])
+        # Image decoding, resizing and re-encoding (and PDF/DOCX/archive extraction) are CPU
+        # bound, so they run in the threadpool; files still go one at a time, in upload order.
+        descriptor["skipped"] = not await run_in_threadpool(ingest_bytes, filename, content, ingestion_result)
+        duplicates = ingestion_result["duplicate_sources"][duplicates_before:]
+        if duplicates:
+            descriptor["duplicates_skipped"] = len(duplicates)
+            descriptor["duplicates"] = duplicates[:20]
         source_manifest.append(descriptor)
 
-    raw_text = "".join(ingestion_result["text_parts"]).strip()
-    images = ingestion_result["images"]
+    filtered_count = ingestion_result["source_summary"]["filtered_sources"]
+    if filtered_count:
+        removed_kb = sum(ingestion_result["source_summary"]["filtered_bytes"].values()) / 1024
+        ingestion_result["warnings"].append(
+            f"Left out {filtered_count} low-signal file(s) such as lockfiles, minified bundles or generated code ({removed_kb:.0f} KB filtered)."
+        )
 
-    if not raw_text and not images:
+    duplicate_count = ingestion_result["source_summary"]["duplicate_sources"]
+    if duplicate_count:
+        near_count = sum(1 for item in ingestion_result["duplicate_sources"] if item["match"] == "near")
+        ingestion_result["warnings"].append(
+            f"Skipped {duplicate_count} duplicate source(s) ({duplicate_count - near_count} identical, {near_count} near-identical) so more distinct material fits the budget."
+        )
+
+    ingestion_result["raw_text"] = "".join(ingestion_result["text_parts"]).strip()
+    ingestion_result["source_manifest"] = source_manifest
+    if not ingestion_result["raw_text"] and not ingestion_result["images"]:
         raise HTTPException(
             status_code=400,
             detail="Add at least one supported file or enough briefing context for the deck."
         )
+    return ingestion_result
 
-    JOBS[job_id] = {
-        "status": "uploading",
-        "current_step": "Preparing Inputs",
-        "progress_percent": STEP_PROGRESS["Preparing Inputs"],
-        "state": {},
-        "pptx_path": None,
-        "download_name": f"{safe_filename(org_name)}_Executive_Deck.pptx",
-        "error_msg": None,
-        "warnings": ingestion_result["warnings"],
-        "sources": source_manifest,
-        "outline": [],
-        "presentation_json": None,
-        "slides_generated": 0,
-        "source_summary": ingestion_result["source_summary"],
-    }
 
-    background_tasks.add_task(
-        execute_graph_pipeline,
+@router.post("/upload")
+async def upload_document(
+    background_tasks: BackgroundTasks,
+    files: Optional[List[UploadFile]] = File(None),
+    file: Optional[UploadFile] = File(None),
+    org_name: str = Form(""),
+    purpose: str = Form(""),
+    target_audience: str = Form(""),
+    key_message: str = Form(""),
+    design_vibe: str = Form(""),
+    generation_mode: str = Form("standard"),
+    current_user: models.User = Depends(get_current_user),
+):
+    generation_mode = (generation_mode or "standard").strip().lower()
+    if generation_mode not in GENERATION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown generation mode. Use one of: {', '.join(sorted(GENERATION_MODES))}."
+        )
+
+    incoming_files = collect_upload_files(files, file)
+    job_id = str(uuid.uuid4())
+    ingestion_result = await ingest_uploads(
+        incoming_files,
+        build_user_brief(
+            org_name,
+            purpose,
+            current_user.persona or "",
+            target_audience,
+            key_message,
+            design_vibe,
+        ),
+    )
+    raw_text = ingestion_result["raw_text"]
+    images = ingestion_result["images"]
+    source_manifest = ingestion_result["source_manifest"]
+
+    JOBS[job_id] = build_job_record(
+        org_name,
+        warnings=ingestion_result["warnings"],
+        sources=source_manifest,
+        source_summary=ingestion_result["source_summary"],
+        generation_mode=generation_mode,
+    )
+
+    pipeline_args = (
         job_id,
         raw_text,
         images,
@@ -416,11 +937,26 @@ async def upload_document(
         target_audience,
         key_message,
         design_vibe,
+        ingestion_result["image_details"],
     )
+    if generation_mode == "standard":
+        background_tasks.add_task(execute_graph_pipeline, *pipeline_args)
+    else:
+        try:
+            await run_in_threadpool(render_draft_deck, job_id, build_initial_state(*pipeline_args[1:]))
+        except Exception as exc:
+            # The draft is only a head start; the full pipeline can still build the deck.
+            print(f"Draft render for job {job_id} failed: {exc}")
+            JOBS[job_id]["warnings"].append("The instant draft could not be built, so the full deck is being generated instead.")
+            JOBS[job_id]["generation_mode"] = generation_mode = "standard"
+            background_tasks.add_task(execute_graph_pipeline, *pipeline_args)
+        else:
+            if generation_mode == "draft_refine":
+                background_tasks.add_task(refine_draft_job, *pipeline_args)
 
     return {
         "job_id": job_id,
-        "status": "processing",
+        "status": "processing" if generation_mode == "standard" else JOBS[job_id]["status"],
         "current_step": JOBS[job_id]["current_step"],
         "progress_percent": JOBS[job_id]["progress_percent"],
         "error_msg": None,
@@ -430,15 +966,121 @@ async def upload_document(
         "outline": JOBS[job_id]["outline"],
         "presentation_json": JOBS[job_id]["presentation_json"],
         "slides_generated": JOBS[job_id]["slides_generated"],
+        "is_draft": JOBS[job_id]["is_draft"],
+        "draft_ms": JOBS[job_id]["draft_ms"],
     }
 
 
-@router.get("/status/{job_id}")
-async def get_status(job_id: str):
+@router.post("/upload/batch")
+async def upload_batch(
+    background_tasks: BackgroundTasks,
+    files: Optional[List[UploadFile]] = File(None),
+    file: Optional[UploadFile] = File(None),
+    org_name: str = Form(""),
+    purpose: str = Form(""),
+    key_message: str = Form(""),
+    design_vibe: str = Form(""),
+    variants: str = Form(...),
+    current_user: models.User = Depends(get_current_user),
+):
+    brief_variants = parse_brief_variants(variants)
+    incoming_files = collect_upload_files(files, file)
+    # The shared brief lists every audience so the source analysis stays audience-neutral.
+    ingestion_result = await ingest_uploads(
+        incoming_files,
+        build_user_brief(
+            org_name,
+            purpose,
+            current_user.persona or "",
+            ", ".join(variant["label"] for variant in brief_variants),
+            key_message,
+            design_vibe,
+        ),
+    )
+
+    parent_id = str(uuid.uuid4())
+    JOBS[parent_id] = build_job_record(
+        org_name,
+        warnings=ingestion_result["warnings"],
+        sources=ingestion_result["source_manifest"],
+        source_summary=ingestion_result["source_summary"],
+        generation_mode="batch",
+    )
+    JOBS[parent_id]["variants"] = []
+    for variant in brief_variants:
+        job_id = str(uuid.uuid4())
+        JOBS[job_id] = build_job_record(
+            org_name,
+            sources=ingestion_result["source_manifest"],
+            source_summary=ingestion_result["source_summary"],
+            generation_mode="batch",
+        )
+        JOBS[job_id]["parent_job_id"] = parent_id
+        JOBS[job_id]["variant_label"] = variant["label"]
+        JOBS[job_id]["download_name"] = f"{safe_filename(org_name)}_{safe_filename(variant['label'])}_Executive_Deck.pptx"
+        JOBS[parent_id]["variants"].append({
+            "label": variant["label"],
+            "job_id": job_id,
+            "status": JOBS[job_id]["status"],
+            "current_step": JOBS[job_id]["current_step"],
+            "progress_percent": JOBS[job_id]["progress_percent"],
+        })
+
+    base_state = build_initial_state(
+        ingestion_result["raw_text"],
+        ingestion_result["images"],
+        org_name,
+        purpose,
+        current_user.persona,
+        ", ".join(variant["label"] for variant in brief_variants),
+        key_message,
+        design_vibe,
+        ingestion_result["image_details"],
+    )
+    background_tasks.add_task(execute_batch_pipeline, parent_id, base_state, brief_variants)
+    return job_status_payload(parent_id, JOBS[parent_id])
+
+
+def retry_state(job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+    """Inputs to retry a failed job with, preferring its checkpoint thread.
+
+    While the thread exists, execute_graph_pipeline resumes it after the last completed
+    node, so LLM work that already succeeded is not paid for again. Its initial state also
+    covers jobs that failed before any node finished.
+    """
+    config = checkpoint_config(job_id)
+    snapshot = graph_app.get_state(config) if config else None
+    if snapshot and snapshot.values:
+        if record_resume_attempt(job_id) <= CHECKPOINT_RESUME_ATTEMPTS:
+            return dict(snapshot.values)
+        clear_checkpoint(job_id)
+    return job.get("state") or {}
+
+
+@router.post("/retry/{job_id}")
+async def retry_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(get_current_user),
+):
     if job_id not in JOBS:
         raise HTTPException(status_code=404, detail="Job not found")
 
     job = JOBS[job_id]
+    if job["status"] != "error":
+        raise HTTPException(status_code=400, detail="Only failed jobs can be retried")
+
+    state = await run_in_threadpool(retry_state, job_id, job)
+    if not state:
+        raise HTTPException(status_code=409, detail="This job has no saved inputs to retry; upload the sources again")
+
+    job["status"] = "processing"
+    job["error_msg"] = None
+    background_tasks.add_task(execute_graph_pipeline, *pipeline_args_from_state(job_id, state))
+    return {"job_id": job_id, "status": job["status"]}
+
+
+def job_status_payload(job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "job_id": job_id,
         "status": job["status"],
@@ -451,20 +1093,300 @@ async def get_status(job_id: str):
         "presentation_json": job.get("presentation_json"),
         "slides_generated": job.get("slides_generated", 0),
         "source_summary": job.get("source_summary", {}),
+        "token_usage": job.get("token_usage", {}),
+        "node_timings": job.get("node_timings", {}),
+        "pipeline_timing": job.get("pipeline_timing", {}),
+        "resumed_from": job.get("resumed_from"),
+        "deadline_seconds": job.get("deadline_seconds"),
+        "fallback_nodes": job.get("fallback_nodes", {}),
+        "fallback_slides": job.get("fallback_slides", []),
+        "generation_mode": job.get("generation_mode", "standard"),
+        "is_draft": job.get("is_draft", False),
+        "draft_ms": job.get("draft_ms"),
+        "refine_status": job.get("refine_status"),
+        "refine_job_id": job.get("refine_job_id"),
+        "revision": job.get("revision", 0),
+        "last_revision": job.get("last_revision"),
+        "time_to_first_slide_ms": job.get("time_to_first_slide_ms"),
+        "slide_quality": job.get("slide_quality"),
+        "artifact": job.get("artifact"),
+        "snapshot_url": f"/api/jobs/{job_id}/snapshot" if job.get("artifact") else None,
+        "streamed_slides": job.get("streamed_slides", 0),
+        "parent_job_id": job.get("parent_job_id"),
+        "variant_label": job.get("variant_label"),
+        "variants": job.get("variants"),
     }
 
 
-@router.get("/download/{job_id}")
-async def download_deck(job_id: str):
+@router.get("/status/{job_id}")
+async def get_status(job_id: str):
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job_status_payload(job_id, JOBS[job_id])
+
+
+def editable_job(job_id: str) -> Dict[str, Any]:
     if job_id not in JOBS:
         raise HTTPException(status_code=404, detail="Job not found")
 
     job = JOBS[job_id]
-    if job["status"] != "completed" or not job["pptx_path"]:
+    if job["status"] != "completed" or not (job.get("state") or {}).get("narrative_structure"):
+        raise HTTPException(status_code=400, detail="Only completed decks can be revised")
+    if job.get("revising"):
+        raise HTTPException(status_code=409, detail="This deck is already being revised")
+    return job
+
+
+def rerender_job(job_id: str, state: Dict[str, Any], revision: Dict[str, Any], reformat: bool = True):
+    """Re-run Formatting_Node and the renderer over an edited state and publish the new deck.
+
+    Theme changes pass ``reformat=False`` with an already rethemed presentation_json, since
+    slide normalization does not depend on the theme.
+    """
+    started_at = time.perf_counter()
+    if reformat:
+        formatted = Formatting_Node(state)
+        if formatted.get("errors"):
+            raise ValueError(formatted["errors"])
+        state.update(formatted)
+
+    presentation_json = state["presentation_json"]
+    slides = presentation_json.get("slides", [])
+    artifact = store_deck(presentation_json, state.get("org_name", ""), state.get("theme_vibe", ""))
+    job = JOBS[job_id]
+    job.update({
+        "state": state,
+        "artifact": artifact,
+        "presentation_json": presentation_json,
+        "outline": [slide.get("title", "Untitled Slide") for slide in slides],
+        "slides_generated": len(slides) + 2,
+        "token_usage": state.get("token_usage") or job.get("token_usage", {}),
+        "fallback_slides": [index for index, slide in enumerate(slides) if slide.get("content_origin") == "fallback"],
+        "revision": job.get("revision", 0) + 1,
+        "last_revision": {**revision, "render_ms": round((time.perf_counter() - started_at) * 1000, 1)},
+    })
+
+
+@router.post("/jobs/{job_id}/slides/regenerate")
+async def regenerate_slides(
+    job_id: str,
+    request: SlideRegenerationRequest,
+    current_user: models.User = Depends(get_current_user),
+):
+    job = editable_job(job_id)
+    slide_count = len(job["state"]["narrative_structure"].get("slides") or [])
+    invalid = [index for index in request.slide_indexes if not 0 <= index < slide_count]
+    if not request.slide_indexes or invalid:
+        raise HTTPException(status_code=400, detail=f"Slide indexes must be between 0 and {slide_count - 1}.")
+
+    job["revising"] = True
+    try:
+        started_at = time.perf_counter()
+        state = dict(job["state"])
+        state.update(await run_in_threadpool(
+            regenerate_narrative_slides,
+            state,
+            request.slide_indexes,
+            request.instructions,
+            node_timeout("Narrative_Node", job_deadline()),
+        ))
+        revision = {
+            "kind": "slides",
+            "slide_indexes": sorted(set(request.slide_indexes)),
+            "origins": state.pop("regenerated_slides", {}),
+            "narrative_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        }
+        await run_in_threadpool(rerender_job, job_id, state, revision)
+    finally:
+        job["revising"] = False
+    return job_status_payload(job_id, job)
+
+
+@router.post("/jobs/{job_id}/theme")
+async def change_theme(
+    job_id: str,
+    request: ThemeChangeRequest,
+    current_user: models.User = Depends(get_current_user),
+):
+    job = editable_job(job_id)
+    job["revising"] = True
+    try:
+        state = {
+            **job["state"],
+            "theme_vibe": request.theme_vibe,
+            "presentation_json": retheme_presentation(job["presentation_json"], request.theme_vibe),
+        }
+        await run_in_threadpool(rerender_job, job_id, state, {"kind": "theme", "theme_vibe": request.theme_vibe}, False)
+    finally:
+        job["revising"] = False
+    return job_status_payload(job_id, job)
+
+
+def render_theme_previews(job: Dict[str, Any], theme_vibes: List[str]) -> List[Dict[str, Any]]:
+    presentation_json = job["presentation_json"]
+    org_name = (job.get("state") or {}).get("org_name", "")
+    variants = [retheme_presentation(presentation_json, theme_vibe) for theme_vibe in theme_vibes]
+    rendered = render_cache.render_many([(variant, org_name, variant["theme_vibe"]) for variant in variants])
+    download_name = job.get("download_name", "Executive_Deck.pptx").removesuffix(".pptx")
+    previews = []
+    for theme_vibe, (data, render_source) in zip(theme_vibes, rendered):
+        theme = resolve_theme(theme_vibe)
+        artifact = {**artifact_store.put(data).as_record(), "render_source": render_source}
+        filename = f"{download_name}_{safe_filename(theme.name)}.pptx"
+        previews.append({
+            "theme": theme.name,
+            "theme_vibe": theme_vibe,
+            "artifact": artifact,
+            "download_url": f"/api/artifacts/{artifact['key']}?filename={quote(filename)}",
+        })
+    return previews
+
+
+@router.post("/jobs/{job_id}/themes/render")
+async def render_job_themes(
+    job_id: str,
+    request: ThemePreviewRequest,
+    current_user: models.User = Depends(get_current_user),
+):
+    """Render the finished deck in several themes at once, e.g. to preview every theme side by side.
+
+    Body slides are normalized and built once and only recolored per theme, and the variants
+    render in parallel on the render service. Nothing about the job itself changes; POST
+    /jobs/{job_id}/theme with one of the returned vibes then switches to it from the cache.
+    """
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = JOBS[job_id]
+    if job["status"] != "completed" or not (job.get("presentation_json") or {}).get("slides"):
+        raise HTTPException(status_code=400, detail="Only completed decks can be rendered in other themes")
+
+    theme_vibes = list(dict.fromkeys(vibe.strip() for vibe in request.themes if vibe.strip()))
+    if not theme_vibes or len(theme_vibes) > MAX_THEME_PREVIEWS:
+        raise HTTPException(status_code=400, detail=f"Pick between 1 and {MAX_THEME_PREVIEWS} themes.")
+
+    started_at = time.perf_counter()
+    previews = await run_in_threadpool(render_theme_previews, job, theme_vibes)
+    return {"job_id": job_id, "variants": previews, "render_ms": round((time.perf_counter() - started_at) * 1000, 1)}
+
+
+@router.get("/model-routes")
+async def get_model_routes(current_user: models.User = Depends(get_current_user)):
+    return {"routes": MODEL_ROUTES, "metrics": route_metrics_snapshot(), "circuits": circuit_snapshot()}
+
+
+@router.get("/render-cache")
+async def get_render_cache_stats(current_user: models.User = Depends(get_current_user)):
+    return render_cache.snapshot()
+
+
+def parse_byte_range(range_header: str, size: int) -> Optional[tuple]:
+    """Resolve a single ``bytes=`` range to inclusive offsets; raises 416 when unsatisfiable."""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+        else:
+            start, end = max(size - int(end_text), 0), size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def artifact_response(request: Request, key: str, filename: str, disposition: str = "attachment", headers: Optional[Dict[str, str]] = None):
+    stored = artifact_store.get(key)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Presentation file is no longer available; re-render the deck")
+    artifact, data = stored
+    headers = {
+        "ETag": artifact.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        # Download names always pass through safe_filename, so plain quoting is enough.
+        "Content-Disposition": f'{disposition}; filename="{filename}"',
+        **(headers or {}),
+    }
+    if artifact.etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if request.headers.get("range") and (not if_range or if_range.strip() == artifact.etag):
+        byte_range = parse_byte_range(request.headers["range"], artifact.size)
+
+    status_code, start, end = 200, 0, artifact.size - 1
+    if byte_range:
+        status_code, (start, end) = 206, byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=artifact.content_type)
+    return StreamingResponse(
+        iter_chunks(data, start, end + 1),
+        status_code=status_code,
+        headers=headers,
+        media_type=artifact.content_type,
+    )
+
+
+@router.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+async def download_deck(job_id: str, request: Request):
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    job = JOBS[job_id]
+    if job["status"] != "completed" or not job.get("artifact"):
         raise HTTPException(status_code=400, detail="Presentation not ready yet")
 
-    return FileResponse(
-        path=job["pptx_path"],
-        filename=job.get("download_name", "Executive_Deck.pptx"),
-        media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    return await run_in_threadpool(
+        artifact_response, request, job["artifact"]["key"], job.get("download_name", "Executive_Deck.pptx")
     )
+
+
+@router.api_route("/artifacts/{key}", methods=["GET", "HEAD"])
+async def download_artifact(key: str, request: Request, filename: str = "Executive_Deck.pptx"):
+    # Content-addressed, so any worker can serve it when the artifact store is shared.
+    return await run_in_threadpool(artifact_response, request, key, safe_filename(filename.removesuffix(".pptx")) + ".pptx")
+
+
+# Snapshot URLs change whenever the deck does, so browsers and CDNs may keep them forever.
+# The page is static markup; the policy keeps any text in it from ever running as script.
+SNAPSHOT_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; img-src data:; frame-ancestors *",
+    "X-Content-Type-Options": "nosniff",
+}
+
+
+@router.get("/jobs/{job_id}/snapshot")
+async def job_snapshot(job_id: str):
+    """Redirect to the static HTML/SVG snapshot of the job's current deck, for sharing and embedding."""
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job = JOBS[job_id]
+    if job["status"] != "completed" or not job.get("artifact"):
+        raise HTTPException(status_code=400, detail="Presentation not ready yet")
+
+    snapshot = job["artifact"].get("snapshot")
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="This deck has no snapshot; re-render it to create one")
+    return RedirectResponse(snapshot["url"], status_code=307, headers={"Cache-Control": "no-cache"})
+
+
+def snapshot_response(request: Request, key: str):
+    stored = artifact_store.get(key)
+    if stored is None or stored[0].content_type != SNAPSHOT_MEDIA_TYPE:
+        raise HTTPException(status_code=404, detail="Snapshot is no longer available; request it again from its job")
+    return artifact_response(request, key, "deck.html", "inline", SNAPSHOT_HEADERS)
+
+
+@router.api_route("/snapshots/{key}", methods=["GET", "HEAD"])
+async def download_snapshot(key: str, request: Request):
+    # Content-addressed like /artifacts, but only for snapshots, so a .pptx is never served inline.
+    return await run_in_threadpool(snapshot_response, request, key)
@@ -0,0 +1,27 @@
+import time
+from typing import Any, Dict
+
+from .nodes import (
+    Formatting_Node,
+    build_fallback_narrative,
+    fallback_business_outcomes,
+    fallback_code_analysis,
+)
+
+
+def run_draft_pipeline(initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a renderable deck from the heuristic fallbacks alone, without any LLM calls.
+
+    Follows the same node order as the graph so drafts and LLM decks share one shape;
+    only the model-backed steps are swapped for their deterministic fallbacks.
+    """
+    started_at = time.perf_counter()
+    state: Dict[str, Any] = dict(initial_state)
+    state.update(fallback_code_analysis(state))
+    state["business_value"] = fallback_business_outcomes(state)
+    state["narrative_structure"] = build_fallback_narrative(state)
+    state.update(Formatting_Node(state))
+    for slide in (state.get("presentation_json") or {}).get("slides", []):
+        slide["content_origin"] = "fallback"
+    state["draft_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+    return state
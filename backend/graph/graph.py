@@ -1,41 +1,234 @@
-from langgraph.graph import StateGraph, END
-from typing import Literal
+import inspect
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
+from typing import Any, Callable, Dict, List, Literal, Optional
 
 from .state import AgentState
-from .nodes import CodeParser_Node, BusinessValue_Node, Narrative_Node, Formatting_Node
+from .nodes import (
+    CodeParser_Node,
+    BusinessValue_Node,
+    Narrative_Node,
+    Formatting_Node,
+    Repair_Node,
+    Prefetch_Node,
+    Grounding_Node,
+)
+from .slide_quality import FORMATTING_REPAIR_ATTEMPTS
 
-def route_formatting(state: AgentState) -> Literal["Formatting_Node", "__end__"]:
-    errors = state.get("errors", "")
-    if errors:
-        return "Formatting_Node"
+# Checkpoints hold each job's raw sources and images. The default lives next to the backend
+# package rather than in whatever directory the server happened to be started from.
+CHECKPOINT_PATH = os.environ.get(
+    "OMNIPITCH_CHECKPOINT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "omnipitch_checkpoints.sqlite"),
+)
+# Failed and interrupted jobs keep their thread so a retry or restart resumes after the last
+# completed node. A thread is dropped once it has been resumed this many times (retries and
+# startup resumes alike), or when its latest checkpoint is older than the age limit.
+CHECKPOINT_RESUME_ATTEMPTS = int(os.environ.get("OMNIPITCH_CHECKPOINT_RESUME_ATTEMPTS", 2))
+CHECKPOINT_MAX_AGE_SECONDS = float(os.environ.get("OMNIPITCH_CHECKPOINT_MAX_AGE_HOURS", 24)) * 3600
+RESUME_ATTEMPTS_SCHEMA = "CREATE TABLE IF NOT EXISTS resume_attempts (thread_id TEXT PRIMARY KEY, attempts INTEGER NOT NULL)"
+
+def build_checkpointer():
+    if CHECKPOINT_PATH.strip().lower() in {"", "off", "none"}:
+        return None
+    try:
+        from langgraph.checkpoint.sqlite import SqliteSaver
+    except ImportError:
+        print("langgraph-checkpoint-sqlite is not installed; generation jobs will not be resumable.")
+        return None
+    connection = sqlite3.connect(CHECKPOINT_PATH, check_same_thread=False)
+    return SqliteSaver(connection)
+
+def checkpoint_config(job_id: str) -> Optional[Dict[str, Any]]:
+    if checkpointer is None:
+        return None
+    return {"configurable": {"thread_id": job_id}}
+
+def run_config(job_id: str, deadline_at: Optional[float] = None) -> Dict[str, Any]:
+    # The deadline travels in the run config rather than the state so a resumed job gets a
+    # fresh budget instead of inheriting an already expired one from its checkpoint.
+    config = checkpoint_config(job_id) or {"configurable": {}}
+    config["configurable"]["deadline_at"] = deadline_at
+    return config
+
+def checkpoint_age_seconds(job_id: str, checkpoint_id: str) -> float:
+    checkpoint = checkpointer.get_tuple({"configurable": {"thread_id": job_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}})
+    if checkpoint is None:
+        return 0.0
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(checkpoint.checkpoint["ts"])).total_seconds()
+
+def pending_checkpoint_jobs() -> List[str]:
+    """Threads left behind by jobs that failed or were interrupted mid-run.
+
+    Only the latest checkpoint of each thread is loaded, to read its age; threads past
+    CHECKPOINT_MAX_AGE_SECONDS are dropped here rather than resumed.
+    """
+    if checkpointer is None:
+        return []
+    with checkpointer.cursor() as cursor:
+        # Checkpoint ids are time-ordered, so the largest one is the thread's latest.
+        cursor.execute(
+            "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints WHERE checkpoint_ns = '' "
+            "GROUP BY thread_id ORDER BY MIN(rowid)"
+        )
+        threads = cursor.fetchall()
+    job_ids = []
+    for job_id, checkpoint_id in threads:
+        if CHECKPOINT_MAX_AGE_SECONDS > 0 and checkpoint_age_seconds(job_id, checkpoint_id) > CHECKPOINT_MAX_AGE_SECONDS:
+            clear_checkpoint(job_id)
+            continue
+        job_ids.append(job_id)
+    return job_ids
+
+def resume_attempts(job_id: str) -> int:
+    if checkpointer is None:
+        return 0
+    with checkpointer.cursor() as cursor:
+        cursor.execute(RESUME_ATTEMPTS_SCHEMA)
+        cursor.execute("SELECT attempts FROM resume_attempts WHERE thread_id = ?", (job_id,))
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+def record_resume_attempt(job_id: str) -> int:
+    """Count one more resume of ``job_id``'s thread and return the total so far."""
+    with checkpointer.cursor() as cursor:
+        cursor.execute(RESUME_ATTEMPTS_SCHEMA)
+        cursor.execute(
+            "INSERT INTO resume_attempts (thread_id, attempts) VALUES (?, 1) "
+            "ON CONFLICT(thread_id) DO UPDATE SET attempts = attempts + 1",
+            (job_id,),
+        )
+        cursor.execute("SELECT attempts FROM resume_attempts WHERE thread_id = ?", (job_id,))
+        return cursor.fetchone()[0]
+
+def clear_checkpoint(job_id: str):
+    if checkpointer is not None:
+        checkpointer.delete_thread(job_id)
+        with checkpointer.cursor() as cursor:
+            cursor.execute(RESUME_ATTEMPTS_SCHEMA)
+            cursor.execute("DELETE FROM resume_attempts WHERE thread_id = ?", (job_id,))
+
+def route_formatting(state: AgentState) -> Literal["Repair_Node", "__end__"]:
+    # Formatting is deterministic, so an error (no slides at all) cannot be fixed by running
+    # it again; end and let the pipeline fail the job. Failing slides get bounded repairs.
+    if state.get("errors"):
+        return "__end__"
+    failing = (state.get("slide_quality") or {}).get("failing")
+    if failing and state.get("formatting_attempts", 0) < FORMATTING_REPAIR_ATTEMPTS:
+        return "Repair_Node"
     return "__end__"
 
-def build_graph():
+def timed_node(node_name: str, node: Callable[..., dict]) -> Callable[[AgentState, RunnableConfig], dict]:
+    accepts_config = "config" in inspect.signature(node).parameters
+
+    def run(state: AgentState, config: RunnableConfig) -> dict:
+        started_at = time.time()
+        update = (node(state, config) if accepts_config else node(state)) or {}
+        finished_at = time.time()
+        return {
+            **update,
+            "node_timings": {
+                node_name: {
+                    "started_at": started_at,
+                    "finished_at": finished_at,
+                    "duration_ms": round((finished_at - started_at) * 1000, 1),
+                }
+            },
+        }
+    return run
+
+def build_graph(checkpointer=None):
     graph_builder = StateGraph(AgentState)
-    
-    graph_builder.add_node("CodeParser_Node", CodeParser_Node)
-    graph_builder.add_node("BusinessValue_Node", BusinessValue_Node)
-    graph_builder.add_node("Narrative_Node", Narrative_Node)
-    graph_builder.add_node("Formatting_Node", Formatting_Node)
-    
-    # Define flow: START -> CodeParser_Node -> BusinessValue_Node -> Narrative_Node -> Formatting_Node -> END
-    graph_builder.set_entry_point("CodeParser_Node")
+
+    graph_builder.add_node("CodeParser_Node", timed_node("CodeParser_Node", CodeParser_Node))
+    graph_builder.add_node("Prefetch_Node", timed_node("Prefetch_Node", Prefetch_Node))
+    graph_builder.add_node("Grounding_Node", timed_node("Grounding_Node", Grounding_Node))
+    graph_builder.add_node("BusinessValue_Node", timed_node("BusinessValue_Node", BusinessValue_Node))
+    graph_builder.add_node("Narrative_Node", timed_node("Narrative_Node", Narrative_Node))
+    graph_builder.add_node("Formatting_Node", timed_node("Formatting_Node", Formatting_Node))
+    graph_builder.add_node("Repair_Node", timed_node("Repair_Node", Repair_Node))
+
+    # Define flow:
+    #   START -> CodeParser_Node -> BusinessValue_Node --\
+    #   START -> Prefetch_Node (brand/terminology RAG) ---+-> Narrative_Node -> Formatting_Node -> END
+    #   START -> Grounding_Node (excerpt + heuristics) --/
+    # Formatting_Node -> Repair_Node (failing slides only, bounded) -> END
+    # Prefetch and grounding only need the raw inputs, so they run off the critical path.
+    graph_builder.add_edge(START, "CodeParser_Node")
+    graph_builder.add_edge(START, "Prefetch_Node")
+    graph_builder.add_edge(START, "Grounding_Node")
     graph_builder.add_edge("CodeParser_Node", "BusinessValue_Node")
-    graph_builder.add_edge("BusinessValue_Node", "Narrative_Node")
+    graph_builder.add_edge(["BusinessValue_Node", "Prefetch_Node", "Grounding_Node"], "Narrative_Node")
     graph_builder.add_edge("Narrative_Node", "Formatting_Node")
-    
+
     # Conditional edge for formatting validation
     graph_builder.add_conditional_edges(
         "Formatting_Node",
         route_formatting,
         {
-            "Formatting_Node": "Formatting_Node",
+            "Repair_Node": "Repair_Node",
             "__end__": END
         }
     )
-    
+    graph_builder.add_conditional_edges(
+        "Repair_Node",
+        route_formatting,
+        {
+            "Repair_Node": "Repair_Node",
+            "__end__": END
+        }
+    )
+
     # Compile the graph
-    app = graph_builder.compile()
+    app = graph_builder.compile(checkpointer=checkpointer)
     return app
 
-graph_app = build_graph()
+def build_analysis_graph():
+    # Audience-independent half of the pipeline, shared by every variant of a batch.
+    graph_builder = StateGraph(AgentState)
+    for node_name, node in (
+        ("CodeParser_Node", CodeParser_Node),
+        ("Prefetch_Node", Prefetch_Node),
+        ("Grounding_Node", Grounding_Node),
+    ):
+        graph_builder.add_node(node_name, timed_node(node_name, node))
+        graph_builder.add_edge(START, node_name)
+        graph_builder.add_edge(node_name, END)
+    return graph_builder.compile()
+
+def build_variant_graph():
+    # Audience-specific half: runs once per brief variant on top of a shared analysis.
+    graph_builder = StateGraph(AgentState)
+    graph_builder.add_node("BusinessValue_Node", timed_node("BusinessValue_Node", BusinessValue_Node))
+    graph_builder.add_node("Narrative_Node", timed_node("Narrative_Node", Narrative_Node))
+    graph_builder.add_node("Formatting_Node", timed_node("Formatting_Node", Formatting_Node))
+    graph_builder.add_node("Repair_Node", timed_node("Repair_Node", Repair_Node))
+    graph_builder.add_edge(START, "BusinessValue_Node")
+    graph_builder.add_edge("BusinessValue_Node", "Narrative_Node")
+    graph_builder.add_edge("Narrative_Node", "Formatting_Node")
+    graph_builder.add_conditional_edges(
+        "Formatting_Node",
+        route_formatting,
+        {
+            "Repair_Node": "Repair_Node",
+            "__end__": END
+        }
+    )
+    graph_builder.add_conditional_edges(
+        "Repair_Node",
+        route_formatting,
+        {
+            "Repair_Node": "Repair_Node",
+            "__end__": END
+        }
+    )
+    return graph_builder.compile()
+
+checkpointer = build_checkpointer()
+graph_app = build_graph(checkpointer)
+analysis_graph_app = build_analysis_graph()
+variant_graph_app = build_variant_graph()
@@ -0,0 +1,83 @@
+import os
+from typing import Any, Dict, List, Tuple
+
+# Repair passes allowed after Formatting_Node before the deck is rendered as it stands.
+# The first pass re-normalizes failing slides from the heuristic content; later passes ask
+# the narrative model to rewrite only the slides that still fail. 0 disables repair.
+FORMATTING_REPAIR_ATTEMPTS = int(os.environ.get("OMNIPITCH_FORMATTING_REPAIR_ATTEMPTS", 2))
+SLIDE_PASS_SCORE = 0.75
+
+REQUIRED_TEXT_FIELDS = ("title", "headline", "subheadline")
+PLACEHOLDER_HEADLINES = {"Executive Insight"}
+MIN_BULLETS = 2
+MAX_TRUNCATED_ITEMS = 1
+
+# Content each layout needs to fill its template: (slide field, minimum items).
+LAYOUT_REQUIREMENTS: Dict[str, Tuple[str, int]] = {
+    "insight-grid": ("cards", 3),
+    "comparison": ("cards", 2),
+    "metrics-band": ("metrics", 2),
+    "process-flow": ("flow_steps", 3),
+    "roadmap": ("flow_steps", 3),
+}
+
+ISSUE_PENALTIES = {
+    "empty": 0.5,
+    "placeholder": 0.25,
+    "sparse": 0.2,
+    "truncated": 0.15,
+    "layout": 0.3,
+}
+
+
+def is_truncated(value: str) -> bool:
+    return (value or "").endswith("…")
+
+
+def slide_issues(slide: Dict[str, Any]) -> List[str]:
+    issues = []
+    for field in REQUIRED_TEXT_FIELDS:
+        if not (slide.get(field) or "").strip():
+            issues.append(f"empty:{field}")
+    if slide.get("headline") in PLACEHOLDER_HEADLINES:
+        issues.append("placeholder:headline")
+
+    bullets = slide.get("bullets") or []
+    if len(bullets) < MIN_BULLETS:
+        issues.append("sparse:bullets")
+    truncated = [text for text in bullets + [slide.get("headline", ""), slide.get("subheadline", "")] if is_truncated(text)]
+    if len(truncated) > MAX_TRUNCATED_ITEMS:
+        issues.append("truncated:text")
+
+    if not layout_fits(slide, slide.get("layout_style", "")):
+        issues.append(f"layout:{slide['layout_style']}")
+    return issues
+
+
+def score_slide(slide: Dict[str, Any]) -> Dict[str, Any]:
+    issues = slide_issues(slide)
+    score = 1.0 - sum(ISSUE_PENALTIES[issue.split(":", 1)[0]] for issue in issues)
+    score = round(max(score, 0.0), 2)
+    passed = score >= SLIDE_PASS_SCORE and not any(issue.startswith("empty:") for issue in issues)
+    return {"score": score, "issues": issues, "passed": passed}
+
+
+def score_deck(slides: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return rescore_slides({"scores": [None] * len(slides)}, slides, list(range(len(slides))))
+
+
+def layout_fits(slide: Dict[str, Any], layout_style: str) -> bool:
+    requirement = LAYOUT_REQUIREMENTS.get(layout_style)
+    return requirement is None or len(slide.get(requirement[0]) or []) >= requirement[1]
+
+
+def rescore_slides(report: Dict[str, Any], slides: List[Dict[str, Any]], indexes: List[int]) -> Dict[str, Any]:
+    """Update a score_deck report for the given slides only, leaving passing slides untouched."""
+    scores = list(report.get("scores") or [])
+    for index in indexes:
+        scores[index] = score_slide(slides[index])
+    return {
+        "scores": scores,
+        "failing": [index for index, result in enumerate(scores) if not result["passed"]],
+        "mean_score": round(sum(result["score"] for result in scores) / len(scores), 2) if scores else 0.0,
+    }
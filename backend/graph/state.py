@@ -1,8 +1,14 @@
-from typing import TypedDict, List
+from typing import Annotated, TypedDict, List
+
+
+def merge_dicts(left: dict, right: dict) -> dict:
+    return {**(left or {}), **(right or {})}
+
 
 class AgentState(TypedDict):
     raw_docs: str
     images: List[str]
+    image_details: List[str]
     org_name: str
     purpose: str
     persona: str
@@ -15,6 +21,15 @@ class AgentState(TypedDict):
     strategic_priorities: List[str]
     open_questions: List[str]
     business_value: List[str]
+    style_context: str
+    grounding_excerpt: str
+    heuristic_signals: List[str]
+    heuristic_priorities: List[str]
     narrative_structure: dict
     presentation_json: dict
     errors: str
+    slide_quality: dict
+    formatting_attempts: int
+    token_usage: Annotated[dict, merge_dicts]
+    node_timings: Annotated[dict, merge_dicts]
+    fallback_nodes: Annotated[dict, merge_dicts]
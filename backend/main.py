@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import sys
@@ -9,14 +10,26 @@ load_dotenv()
 # Ensure backend root is in PYTHONPATH
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from api.routes import router as api_router
+from api.routes import router as api_router, resume_pending_jobs
 from api.auth import router as auth_router
 from database import engine, Base
+from utils.render_service import render_service
 
 # Create DB tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="OmniPitchAI Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Only one worker should resume interrupted jobs, otherwise each would redo the same LLM work.
+    if os.environ.get("OMNIPITCH_RESUME_JOBS_ON_STARTUP", "1") == "1":
+        resumed = resume_pending_jobs()
+        if resumed:
+            print(f"Resuming {len(resumed)} interrupted generation job(s) from checkpoints.")
+    render_service.start()
+    yield
+    render_service.shutdown()
+
+app = FastAPI(title="OmniPitchAI Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
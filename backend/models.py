@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Float, Integer, LargeBinary, String
+from sqlalchemy.dialects.mysql import LONGBLOB
 from database import Base
 
 class User(Base):
@@ -11,3 +12,13 @@ class User(Base):
     last_name = Column(String(100), nullable=True)
     company_name = Column(String(255), nullable=True)
     persona = Column(String(50), nullable=True) # E.g., Executive, Engineer, Sales...
+
+
+class DeckArtifact(Base):
+    __tablename__ = "deck_artifacts"
+
+    key = Column(String(64), primary_key=True)  # sha256 of the rendered file
+    content_type = Column(String(128), nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(Float, nullable=False)
+    data = Column(LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=False)
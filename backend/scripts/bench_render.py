@@ -0,0 +1,285 @@
+"""Benchmark the PPTX renderer and check its slide XML against golden structural snapshots.
+
+Synthetic presentation_json decks are generated offline for every layout_style, theme and
+deck size. Each render reports wall time, peak Python memory (tracemalloc) and output size.
+The exit status is 1 when the golden structure differs or, with --baseline, when render
+time regresses beyond --max-regression, so CI can gate on either:
+
+    python scripts/bench_render.py                          # benchmark + golden check
+    python scripts/bench_render.py --baseline bench.json    # also fail on slowdowns
+    python scripts/bench_render.py --write-baseline bench.json
+    python scripts/bench_render.py --update-golden          # after an intended visual change
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from lxml import etree
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import pptx_generator
+from utils.pptx_generator import RENDERER_VERSION, THEME_REGISTRY
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "render_structure.json")
+LAYOUT_STYLES = ["hero", "insight-grid", "metrics-band", "process-flow", "comparison", "roadmap", "closing"]
+DECK_SIZES = [8, 20, 50]
+
+SENTENCES = [
+    "Order platform processes 1,200 orders per day across 3 regions",
+    "Checkout latency fell 40% after the cache rollout",
+    "Support tickets dropped 18% quarter over quarter",
+    "Payments move to a single provider by Q3",
+    "R&D spend shifts toward <platform> work",
+    "Onboarding drops from 14 days to 3 with self-serve setup",
+]
+
+NS = {"a": "http://schemas.openxmlformats.org/drawingml/2006/main", "p": "http://schemas.openxmlformats.org/presentationml/2006/main"}
+
+
+def sentence(seed: int, words: int = 0) -> str:
+    text = SENTENCES[seed % len(SENTENCES)]
+    return " ".join(text.split()[:words]) if words else text
+
+
+def synthetic_slide(index: int, layout_style: str, with_payload: bool) -> Dict[str, Any]:
+    """A slide shaped like Formatting_Node output; every other slide carries a render_payload."""
+    slide = {
+        "title": f"Slide {index + 1}",
+        "headline": f"{sentence(index, 6)} ({layout_style})",
+        "subheadline": sentence(index + 1),
+        "section_label": ["Strategy", "Execution", "Impact"][index % 3],
+        "layout_style": layout_style,
+        "accent": "Strategic Edge",
+        "quote": sentence(index + 2, 8),
+        "bullets": [sentence(index + offset) for offset in range(3 + index % 2)],
+        "cards": [{"title": f"Card {card + 1}", "body": sentence(index + card), "tone": "secondary" if card % 2 else "primary"} for card in range(2 + index % 3)],
+        "metrics": [{"label": f"Metric {metric + 1}", "value": f"{(index + 1) * (metric + 3)}%", "detail": sentence(metric, 4)} for metric in range(2 + index % 2)],
+        "flow_steps": [sentence(index + step, 3) for step in range(3 + index % 2)],
+    }
+    if with_payload:
+        slide["render_payload"] = {
+            "lead_quote": sentence(index + 3, 7),
+            "bullet_points": slide["bullets"][:3],
+            "feature_cards": slide["cards"],
+            "metric_cards": slide["metrics"],
+            "step_cards": [{"title": f"Step {step + 1}", "body": body, "tone": "primary"} for step, body in enumerate(slide["flow_steps"])],
+            "comparison_cards": slide["cards"][:2],
+            "supporting_card": {"title": "Why now", "body": sentence(index + 4), "tone": "secondary"},
+            "supporting_cards": [{"title": f"Move {move + 1}", "body": sentence(index + move, 5), "tone": "primary"} for move in range(3)],
+        }
+    return slide
+
+
+def synthetic_deck(slide_count: int, theme_name: str = "Catalyst", layouts: List[str] = LAYOUT_STYLES) -> Dict[str, Any]:
+    return {
+        "deck_title": f"Synthetic deck ({slide_count} slides)",
+        "deck_subtitle": "Generated offline for renderer benchmarks",
+        "theme_vibe": theme_name,
+        "slides": [synthetic_slide(index, layouts[index % len(layouts)], index % 2 == 1) for index in range(slide_count)],
+    }
+
+
+def measure_render(presentation_json: Dict[str, Any], repeat: int) -> Dict[str, float]:
+    """Cold renders (slide fragment cache emptied each time): best time, peak memory of the first run.
+
+    The best of several runs is the least noisy figure on shared CI machines.
+    """
+    timings = []
+    peak_bytes = 0
+    size = 0
+    for attempt in range(repeat):
+        pptx_generator.slide_fragment_cache.entries.clear()
+        if attempt == 0:
+            tracemalloc.start()
+        started_at = time.perf_counter()
+        data = pptx_generator.render_pptx(presentation_json, "Benchmark")
+        timings.append((time.perf_counter() - started_at) * 1000)
+        if attempt == 0:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            # The traced run is slower; it only counts when it is the sole sample.
+            timings = timings if repeat == 1 else []
+        size = len(data)
+    return {"render_ms": round(min(timings), 2), "peak_kb": round(peak_bytes / 1024, 1), "size_kb": round(size / 1024, 1)}
+
+
+def run_benchmarks(sizes: List[int], themes: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    # Warm the per-theme templates so the first case does not pay for building them.
+    for theme_name in themes:
+        pptx_generator.new_presentation(THEME_REGISTRY[theme_name])
+
+    results: Dict[str, Dict[str, float]] = {}
+    slides_per_layout = 8
+    for layout_style in LAYOUT_STYLES:
+        result = measure_render(synthetic_deck(slides_per_layout, themes[0], [layout_style]), repeat)
+        result["ms_per_slide"] = round(result["render_ms"] / slides_per_layout, 2)
+        results[f"layout:{layout_style}"] = result
+    for theme_name in themes:
+        for size in sizes:
+            results[f"deck:{theme_name}:{size}"] = measure_render(synthetic_deck(size, theme_name), repeat)
+    return results
+
+
+def shape_outline(element) -> str:
+    """One line per shape: geometry, fill and line color, then each paragraph's styling and text."""
+    tag = etree.QName(element).localname
+    parts = [tag, element.xpath("string(./p:nvSpPr/p:cNvPr/@name | ./p:nvCxnSpPr/p:cNvPr/@name)", namespaces=NS)]
+    geometry = element.xpath("string(.//a:prstGeom/@prst)", namespaces=NS)
+    offset = element.xpath(".//a:xfrm/a:off", namespaces=NS)
+    extent = element.xpath(".//a:xfrm/a:ext", namespaces=NS)
+    if geometry:
+        parts.append(geometry)
+    if offset and extent:
+        parts.append(f"{offset[0].get('x')},{offset[0].get('y')} {extent[0].get('cx')}x{extent[0].get('cy')}")
+    fill = element.xpath("string(./p:spPr/a:solidFill/a:srgbClr/@val)", namespaces=NS)
+    line = element.xpath("string(./p:spPr/a:ln/a:solidFill/a:srgbClr/@val)", namespaces=NS)
+    if fill or line:
+        parts.append(f"fill={fill or '-'} line={line or '-'}")
+    body = element.find("p:txBody/a:bodyPr", NS)
+    if body is not None:
+        parts.append("body[" + " ".join(f"{key}={value}" for key, value in body.attrib.items()) + "".join(f" {etree.QName(child).localname}" for child in body) + "]")
+    for paragraph in element.xpath("./p:txBody/a:p", namespaces=NS):
+        properties = paragraph.find("a:pPr", NS)
+        runs = []
+        for child in paragraph:
+            name = etree.QName(child).localname
+            if name == "br":
+                runs.append("<br>")
+            elif name == "r":
+                run_properties = child.find("a:rPr", NS)
+                style = ""
+                if run_properties is not None:
+                    color = run_properties.xpath("string(./a:solidFill/a:srgbClr/@val)", namespaces=NS)
+                    font = run_properties.xpath("string(./a:latin/@typeface)", namespaces=NS)
+                    style = f"{run_properties.get('sz')}/{run_properties.get('b')}/{color}/{font}"
+                runs.append(f"{style}:{child.findtext('a:t', default='', namespaces=NS)!r}")
+        alignment = properties.get("algn") if properties is not None else None
+        spacing = paragraph.xpath("string(./a:pPr/a:spcAft/a:spcPts/@val)", namespaces=NS)
+        parts.append(f"p[{alignment or '-'}{' +' + spacing if spacing else ''}] " + " ".join(runs))
+    return " | ".join(parts)
+
+
+def deck_outline(presentation_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    pptx_generator.slide_fragment_cache.entries.clear()
+    prs = pptx_generator.build_presentation(presentation_json, "Benchmark")
+    outline = []
+    for slide in prs.slides:
+        # Reparse with plain lxml; python-pptx's element classes override xpath().
+        tree = etree.fromstring(etree.tostring(slide.part._element)).find("p:cSld/p:spTree", NS)
+        outline.append({
+            "layout": slide.slide_layout.name,
+            "shapes": [shape_outline(shape) for shape in tree if etree.QName(shape).localname in {"sp", "cxnSp", "pic", "graphicFrame"}],
+        })
+    return outline
+
+
+def golden_decks() -> Dict[str, Dict[str, Any]]:
+    # One slide of every layout, with and without render_payload, in every theme.
+    layouts = LAYOUT_STYLES + LAYOUT_STYLES
+    return {theme_name: synthetic_deck(len(layouts), theme_name, layouts) for theme_name in THEME_REGISTRY}
+
+
+def build_golden() -> Dict[str, Any]:
+    return {"renderer_version": RENDERER_VERSION, "decks": {name: deck_outline(deck) for name, deck in golden_decks().items()}}
+
+
+def compare_golden(expected: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    differences = []
+    for deck_name, expected_slides in expected["decks"].items():
+        actual_slides = actual["decks"].get(deck_name)
+        if actual_slides is None:
+            differences.append(f"{deck_name}: deck missing")
+            continue
+        if len(actual_slides) != len(expected_slides):
+            differences.append(f"{deck_name}: {len(actual_slides)} slides, expected {len(expected_slides)}")
+        for number, (expected_slide, actual_slide) in enumerate(zip(expected_slides, actual_slides), start=1):
+            if expected_slide["layout"] != actual_slide["layout"]:
+                differences.append(f"{deck_name} slide {number}: layout {actual_slide['layout']!r}, expected {expected_slide['layout']!r}")
+            expected_shapes, actual_shapes = expected_slide["shapes"], actual_slide["shapes"]
+            if len(expected_shapes) != len(actual_shapes):
+                differences.append(f"{deck_name} slide {number}: {len(actual_shapes)} shapes, expected {len(expected_shapes)}")
+            for index, (expected_shape, actual_shape) in enumerate(zip(expected_shapes, actual_shapes)):
+                if expected_shape != actual_shape:
+                    differences.append(f"{deck_name} slide {number} shape {index}:\n    expected {expected_shape}\n    actual   {actual_shape}")
+                    break
+    return differences
+
+
+def compare_baseline(baseline: Dict[str, Dict[str, float]], results: Dict[str, Dict[str, float]], max_regression: float) -> List[Tuple[str, float, float]]:
+    regressions = []
+    for case, result in results.items():
+        previous = baseline.get(case)
+        if previous and result["render_ms"] > previous["render_ms"] * (1 + max_regression):
+            regressions.append((case, previous["render_ms"], result["render_ms"]))
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    print(f"{'case':<34}{'render ms':>11}{'ms/slide':>10}{'peak KB':>10}{'size KB':>10}")
+    for case, result in results.items():
+        per_slide = f"{result['ms_per_slide']:.2f}" if "ms_per_slide" in result else ""
+        print(f"{case:<34}{result['render_ms']:>11.2f}{per_slide:>10}{result['peak_kb']:>10.1f}{result['size_kb']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DECK_SIZES), help="Comma-separated body slide counts.")
+    parser.add_argument("--themes", default=",".join(THEME_REGISTRY), help="Comma-separated theme names.")
+    parser.add_argument("--repeat", type=int, default=5, help="Renders per case; the best time is reported.")
+    parser.add_argument("--baseline", help="Results JSON from --write-baseline to compare render times against.")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed slowdown over the baseline, as a fraction.")
+    parser.add_argument("--write-baseline", help="Write this run's results to the given JSON file.")
+    parser.add_argument("--golden", default=GOLDEN_PATH)
+    parser.add_argument("--update-golden", action="store_true", help="Rewrite the golden structure from the current renderer.")
+    parser.add_argument("--skip-bench", action="store_true", help="Only run the golden check.")
+    options = parser.parse_args()
+
+    failed = False
+    actual = build_golden()
+    if options.update_golden:
+        os.makedirs(os.path.dirname(options.golden), exist_ok=True)
+        with open(options.golden, "w", encoding="utf-8") as handle:
+            json.dump(actual, handle, indent=1, ensure_ascii=False)
+            handle.write("\n")
+        print(f"Golden structure written to {options.golden}")
+    else:
+        with open(options.golden, "r", encoding="utf-8") as handle:
+            expected = json.load(handle)
+        differences = compare_golden(expected, actual)
+        for difference in differences[:20]:
+            print(f"GOLDEN: {difference}")
+        if differences:
+            failed = True
+            print(f"{len(differences)} golden difference(s). If the change is intended, bump RENDERER_VERSION and rerun with --update-golden.")
+        else:
+            print("Slide XML matches the golden structure.")
+
+    if not options.skip_bench:
+        themes = [theme.strip() for theme in options.themes.split(",") if theme.strip()]
+        unknown = [theme for theme in themes if theme not in THEME_REGISTRY]
+        if unknown:
+            parser.error(f"Unknown theme(s): {', '.join(unknown)}")
+        results = run_benchmarks([int(size) for size in options.sizes.split(",")], themes, max(options.repeat, 1))
+        print_results(results)
+
+        if options.write_baseline:
+            with open(options.write_baseline, "w", encoding="utf-8") as handle:
+                json.dump(results, handle, indent=1)
+            print(f"Baseline written to {options.write_baseline}")
+        if options.baseline:
+            with open(options.baseline, "r", encoding="utf-8") as handle:
+                regressions = compare_baseline(json.load(handle), results, options.max_regression)
+            for case, before, after in regressions:
+                print(f"REGRESSION: {case} {before:.2f}ms -> {after:.2f}ms")
+            failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Compare the direct-XML shape builders in utils/pptx_generator.py with the python-pptx object-model path.
+
+Both paths are run over the same text corpus and a full synthetic deck. Any difference
+in the emitted XML is reported and the exit status is 1. Timings for both are then
+printed:
+
+    python scripts/bench_shape_builder.py --iterations 300
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from lxml import etree
+from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE
+from pptx.enum.text import MSO_ANCHOR, MSO_AUTO_SIZE, PP_ALIGN
+from pptx.util import Inches, Pt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import pptx_generator
+from utils.pptx_generator import BULLET_FONT_SIZE, THEME_REGISTRY, ThemeSpec, ensure_min_length, style_paragraph
+from utils.text_fit import fit_font_sizes
+
+TEXT_CORPUS = [
+    "Order platform processes 1,200 orders per day across 3 regions",
+    "",
+    "R&D <spend> \"quoted\" 'single'",
+    "Line one\nLine two\vLine three",
+    "\n",
+    # Not "\n\nleading": python-pptx puts a:pPr after leading line breaks there, which the
+    # schema forbids; the XML builder keeps a:pPr first.
+    "middle\n\ntrailing\n",
+    "Bell\x07 and tab\there",
+    "Ünïcödé — “smart” quotes • bullets ✓",
+]
+LAYOUT_STYLES = ["hero", "insight-grid", "metrics-band", "process-flow", "comparison", "roadmap", "closing"]
+
+
+# --- object-model reference: the proxy-based builders the XML templates must reproduce ---
+
+def om_add_text_box(slide, left, top, width, height, text: str, theme: ThemeSpec, font_size: int, color=None, bold: bool = False, font_name: str = None, align=PP_ALIGN.LEFT):
+    width = ensure_min_length(width)
+    height = ensure_min_length(height)
+    text_box = slide.shapes.add_textbox(left, top, width, height)
+    text_frame = text_box.text_frame
+    text_frame.word_wrap = True
+    text_frame.auto_size = MSO_AUTO_SIZE.NONE
+    text_frame.vertical_anchor = MSO_ANCHOR.TOP
+    text_frame.margin_left = 0
+    text_frame.margin_right = 0
+    text_frame.margin_top = 0
+    text_frame.margin_bottom = 0
+    text_frame.clear()
+
+    (font_size,) = fit_font_sizes(((text, bold, font_size, 0),), width, height)
+    paragraph = text_frame.paragraphs[0]
+    paragraph.text = text
+    style_paragraph(paragraph, theme, font_size, color=color, bold=bold, font_name=font_name, align=align)
+    return text_box
+
+
+def om_add_body_bullets(slide, left, top, width, height, bullets: List[str], theme: ThemeSpec, font_size: int = 14):
+    if not bullets:
+        return
+
+    width = ensure_min_length(width)
+    height = ensure_min_length(height)
+    text_box = slide.shapes.add_textbox(left, top, width, height)
+    text_frame = text_box.text_frame
+    text_frame.word_wrap = True
+    text_frame.auto_size = MSO_AUTO_SIZE.NONE
+    text_frame.vertical_anchor = MSO_ANCHOR.TOP
+    text_frame.margin_left = 0
+    text_frame.margin_right = 0
+    text_frame.margin_top = 0
+    text_frame.margin_bottom = 0
+    text_frame.clear()
+
+    sizes = fit_font_sizes(tuple((f"• {bullet or ' '}", False, BULLET_FONT_SIZE, 10) for bullet in bullets), width, height)
+    for index, bullet in enumerate(bullets):
+        paragraph = text_frame.paragraphs[0] if index == 0 else text_frame.add_paragraph()
+        paragraph.text = bullet
+        paragraph.level = 0
+        paragraph.space_after = Pt(10)
+        style_paragraph(paragraph, theme, font_size, color=theme.text)
+        paragraph.text = f"• {paragraph.text}"
+        for run in paragraph.runs:
+            run.font.size = Pt(sizes[index])
+
+
+def om_add_card(slide, left, top, width, height, title: str, body: str, theme: ThemeSpec, accent=None, compact: bool = False):
+    card = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, left, top, width, height)
+    card.fill.solid()
+    card.fill.fore_color.rgb = theme.surface
+    card.fill.transparency = 0.05 if theme.background != theme.surface else 0
+    card.line.color.rgb = accent or theme.accent
+    card.line.transparency = 0.45
+
+    tf = card.text_frame
+    tf.clear()
+    inset = Inches(0.16 if compact else 0.22)
+    tf.margin_left = inset
+    tf.margin_top = inset
+    tf.margin_right = inset
+    tf.margin_bottom = inset
+    tf.vertical_anchor = MSO_ANCHOR.TOP
+    tf.word_wrap = True
+
+    title_size, body_size = fit_font_sizes(
+        (
+            (title, True, 10 if compact else 14, 4 if compact else 8),
+            (body, False, 11 if compact else 14, 0),
+        ),
+        width - 2 * inset,
+        height - 2 * inset,
+    )
+    p_title = tf.paragraphs[0]
+    p_title.text = title
+    style_paragraph(p_title, theme, title_size, color=accent or theme.accent, bold=True)
+    p_title.space_after = Pt(4 if compact else 8)
+
+    p_body = tf.add_paragraph()
+    p_body.text = body
+    style_paragraph(p_body, theme, body_size, color=theme.text, font_name=theme.body_font)
+    return card
+
+
+def om_add_metric_card(slide, left, top, width, height, metric: Dict[str, str], theme: ThemeSpec, accent=None, compact: bool = False):
+    accent_color = accent or theme.accent
+    card = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, left, top, width, height)
+    card.fill.solid()
+    card.fill.fore_color.rgb = theme.surface
+    card.line.color.rgb = accent_color
+    card.line.transparency = 0.35
+
+    tf = card.text_frame
+    tf.clear()
+    inset = Inches(0.16 if compact else 0.22)
+    tf.margin_left = inset
+    tf.margin_top = inset
+    tf.margin_right = inset
+    tf.margin_bottom = inset
+    tf.vertical_anchor = MSO_ANCHOR.TOP
+    tf.word_wrap = True
+
+    detail = metric.get("detail", "")
+    fit = [
+        (metric.get("label", "Metric"), True, 10 if compact else 12, 2 if compact else 6),
+        (metric.get("value", "Signal"), True, 18 if compact else 30, 2 if compact else 6),
+    ]
+    if detail:
+        fit.append((detail, False, 10 if compact else 13, 0))
+    sizes = fit_font_sizes(tuple(fit), width - 2 * inset, height - 2 * inset)
+
+    p_label = tf.paragraphs[0]
+    p_label.text = metric.get("label", "Metric")
+    style_paragraph(p_label, theme, sizes[0], color=theme.muted, bold=True)
+    p_label.space_after = Pt(2 if compact else 6)
+
+    p_value = tf.add_paragraph()
+    p_value.text = metric.get("value", "Signal")
+    style_paragraph(p_value, theme, sizes[1], color=accent_color, bold=True, font_name=theme.title_font)
+    p_value.space_after = Pt(2 if compact else 6)
+
+    if detail:
+        p_detail = tf.add_paragraph()
+        p_detail.text = detail
+        style_paragraph(p_detail, theme, sizes[2], color=theme.text)
+    return card
+
+
+OBJECT_MODEL_BUILDERS = {
+    "add_text_box": om_add_text_box,
+    "add_body_bullets": om_add_body_bullets,
+    "add_card": om_add_card,
+    "add_metric_card": om_add_metric_card,
+}
+
+
+@contextmanager
+def object_model_path():
+    fast = {name: getattr(pptx_generator, name) for name in OBJECT_MODEL_BUILDERS}
+    for name, builder in OBJECT_MODEL_BUILDERS.items():
+        setattr(pptx_generator, name, builder)
+    try:
+        yield
+    finally:
+        for name, builder in fast.items():
+            setattr(pptx_generator, name, builder)
+
+
+def blank_slide(theme: ThemeSpec):
+    prs = pptx_generator.new_presentation(theme)
+    return prs.slides.add_slide(prs.slide_layouts[pptx_generator.CONTENT_LAYOUT])
+
+
+def draw_primitives(slide, theme: ThemeSpec, text: str):
+    box = Inches(1), Inches(1), Inches(3), Inches(1.5)
+    pptx_generator.add_text_box(slide, *box, text, theme, 14)
+    pptx_generator.add_text_box(slide, *box, text, theme, 26, color=theme.accent, bold=True, font_name=theme.title_font, align=PP_ALIGN.CENTER)
+    pptx_generator.add_text_box(slide, Inches(1), Inches(1), 0, 0, text, theme, 10, align=PP_ALIGN.RIGHT)
+    pptx_generator.add_body_bullets(slide, *box, [text, "Second point", text], theme, font_size=13)
+    for compact in (False, True):
+        pptx_generator.add_card(slide, *box, text or "Title", text, theme, compact=compact)
+        pptx_generator.add_card(slide, *box, text, "Body", theme, accent=theme.accent_alt, compact=compact)
+        pptx_generator.add_metric_card(slide, *box, {"label": text, "value": "42%", "detail": text}, theme, compact=compact)
+        pptx_generator.add_metric_card(slide, *box, {"label": "Label", "value": text}, theme, accent=theme.accent_alt, compact=compact)
+
+
+def synthetic_deck(slide_count: int) -> dict:
+    slides = []
+    for index in range(slide_count):
+        layout_style = LAYOUT_STYLES[index % len(LAYOUT_STYLES)]
+        slides.append({
+            "title": f"Slide {index + 1}",
+            "headline": f"Headline for {layout_style} slide {index + 1}",
+            "subheadline": "Supporting detail that explains why the headline matters",
+            "section_label": "Strategy",
+            "layout_style": layout_style,
+            "accent": "Strategic Edge",
+            "quote": "Ship the platform once and reuse it everywhere",
+            "bullets": [TEXT_CORPUS[0], "Checkout latency fell 40% after the cache rollout", "Support tickets dropped 18%"],
+            "cards": [{"title": f"Card {card}", "body": TEXT_CORPUS[0], "tone": "secondary" if card % 2 else "primary"} for card in range(4)],
+            "metrics": [{"label": f"Metric {metric}", "value": f"{metric * 12}%", "detail": "Quarter over quarter"} for metric in range(3)],
+            "flow_steps": ["Discover", "Design", "Deliver", "Scale"],
+        })
+    return {"deck_title": "Shape builder benchmark", "deck_subtitle": "Synthetic deck", "theme_vibe": "Catalyst", "slides": slides}
+
+
+def slide_xml(prs) -> List[bytes]:
+    return [etree.tostring(slide.part._element) for slide in prs.slides]
+
+
+def check_equivalence() -> List[str]:
+    failures = []
+    for theme in THEME_REGISTRY.values():
+        for text in TEXT_CORPUS:
+            fast_slide = blank_slide(theme)
+            draw_primitives(fast_slide, theme, text)
+            with object_model_path():
+                reference_slide = blank_slide(theme)
+                draw_primitives(reference_slide, theme, text)
+            if etree.tostring(fast_slide.part._element) != etree.tostring(reference_slide.part._element):
+                failures.append(f"primitives differ for theme {theme.name!r}, text {text!r}")
+
+    deck = synthetic_deck(len(LAYOUT_STYLES))
+    for theme_name in THEME_REGISTRY:
+        deck = {**deck, "theme_vibe": theme_name}
+        pptx_generator.slide_fragment_cache.entries.clear()
+        fast = slide_xml(pptx_generator.build_presentation(deck, "Benchmark"))
+        pptx_generator.slide_fragment_cache.entries.clear()
+        with object_model_path():
+            reference = slide_xml(pptx_generator.build_presentation(deck, "Benchmark"))
+        for number, (fast_xml, reference_xml) in enumerate(zip(fast, reference), start=1):
+            if fast_xml != reference_xml:
+                failures.append(f"deck slide {number} differs for theme {theme_name!r}")
+    return failures
+
+
+def time_per_call(action, iterations: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        action()
+    return (time.perf_counter() - started_at) * 1000 / iterations
+
+
+def benchmark(iterations: int, deck_slides: int):
+    theme = THEME_REGISTRY["Catalyst"]
+    box = Inches(1), Inches(1), Inches(3), Inches(1.5)
+    bullets = TEXT_CORPUS[:1] * 4
+    metric = {"label": "Throughput", "value": "1,200/day", "detail": "Across 3 regions"}
+    cases = {
+        "add_text_box": lambda slide: pptx_generator.add_text_box(slide, *box, TEXT_CORPUS[0], theme, 14, bold=True),
+        "add_body_bullets": lambda slide: pptx_generator.add_body_bullets(slide, *box, bullets, theme),
+        "add_card": lambda slide: pptx_generator.add_card(slide, *box, "Insight", TEXT_CORPUS[0], theme),
+        "add_metric_card": lambda slide: pptx_generator.add_metric_card(slide, *box, metric, theme),
+    }
+
+    def deck_render():
+        pptx_generator.slide_fragment_cache.entries.clear()
+        pptx_generator.render_pptx(synthetic_deck(deck_slides), "Benchmark")
+
+    print(f"{'case':<22}{'object model':>16}{'direct XML':>14}{'speedup':>10}")
+    for name, draw in cases.items():
+        # A fresh slide every 40 shapes keeps the id scan as short as on a real slide.
+        def run(draw=draw):
+            slides = [blank_slide(theme) for _ in range(iterations // 40 + 1)]
+            for index in range(iterations):
+                draw(slides[index // 40])
+
+        fast_ms = time_per_call(run, 1) / iterations
+        with object_model_path():
+            reference_ms = time_per_call(run, 1) / iterations
+        print(f"{name:<22}{reference_ms:>14.3f}ms{fast_ms:>12.3f}ms{reference_ms / fast_ms:>9.1f}x")
+
+    deck_iterations = max(iterations // 60, 3)
+    fast_ms = time_per_call(deck_render, deck_iterations)
+    with object_model_path():
+        reference_ms = time_per_call(deck_render, deck_iterations)
+    print(f"{f'deck ({deck_slides} slides)':<22}{reference_ms:>14.1f}ms{fast_ms:>12.1f}ms{reference_ms / fast_ms:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=300, help="Shapes drawn per primitive timing.")
+    parser.add_argument("--deck-slides", type=int, default=14, help="Body slides in the timed full-deck render.")
+    parser.add_argument("--check-only", action="store_true", help="Only verify identical output.")
+    options = parser.parse_args()
+
+    failures = check_equivalence()
+    for failure in failures:
+        print(f"MISMATCH: {failure}")
+    if failures:
+        sys.exit(1)
+    print("Direct XML output matches the object-model path.")
+    if not options.check_only:
+        benchmark(options.iterations, options.deck_slides)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Exercise call_with_resilience against scripts/fake_openai_server.py, end to end over HTTP.
+
+Each check starts from a fresh fake server state and its own model name, so breakers and
+latency history do not leak between them:
+
+    retry          the first requests fail with 503 and the call succeeds on a retry
+    hedge          a slow primary request is overtaken by a hedged duplicate
+    breaker-open   a model that keeps failing opens its breaker and later calls are shed
+    breaker-probe  after the cooldown, a probe that gets a 400 leaves the breaker open and
+                   the next healthy probe closes it
+
+    python scripts/check_llm_resilience.py
+    python scripts/check_llm_resilience.py --only hedge
+
+The exit status is 1 when any check fails.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+# Short backoff and cooldown keep the run to a few seconds; set before the module reads them.
+os.environ.setdefault("OMNIPITCH_LLM_MAX_RETRIES", "2")
+os.environ.setdefault("OMNIPITCH_LLM_BACKOFF_BASE_SECONDS", "0.05")
+os.environ.setdefault("OMNIPITCH_LLM_HEDGE_PERCENTILE", "95")
+os.environ.setdefault("OMNIPITCH_LLM_CIRCUIT_FAILURES", "5")
+os.environ.setdefault("OMNIPITCH_LLM_CIRCUIT_COOLDOWN_SECONDS", "1")
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openai
+
+from scripts.fake_openai_server import FakeOpenAIHandler
+from utils.llm_resilience import (
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    HEDGE_MIN_SAMPLES,
+    LLM_MAX_RETRIES,
+    CircuitOpenError,
+    call_with_resilience,
+    circuit_breaker,
+    latency_tracker,
+)
+
+NODE = "BusinessValue_Node"
+SERVER_DEFAULTS = {
+    "delay": 0.0,
+    "slow_rate": 0.0,
+    "slow_delay": 5.0,
+    "slow_first": 0,
+    "fail_models": set(),
+    "fail_rate": 0.0,
+    "fail_first": 0,
+    "fail_status": 503,
+    "stream_chunk_chars": 24,
+    "stream_delay": 0.0,
+    "verbose": False,
+}
+
+
+def configure_server(**overrides):
+    FakeOpenAIHandler.options = argparse.Namespace(**{**SERVER_DEFAULTS, **overrides})
+    with FakeOpenAIHandler.counter_lock:
+        FakeOpenAIHandler.request_counter = 0
+
+
+def requests_served() -> int:
+    with FakeOpenAIHandler.counter_lock:
+        return FakeOpenAIHandler.request_counter
+
+
+def completion_call(base_url: str, model: str) -> Callable[[Optional[float]], str]:
+    def call(timeout: Optional[float]) -> str:
+        # The client's own retries are off so every retry the server sees comes from the layer under test.
+        client = openai.OpenAI(base_url=base_url, api_key="sk-local", max_retries=0, timeout=timeout or 30)
+        response = client.chat.completions.create(model=model, messages=[{"role": "user", "content": "ping"}])
+        return response.choices[0].message.content
+    return call
+
+
+def check_retry(base_url: str) -> str:
+    configure_server(fail_first=LLM_MAX_RETRIES)
+    call_with_resilience(NODE, "retry-model", completion_call(base_url, "retry-model"), 10)
+    served = requests_served()
+    assert served == LLM_MAX_RETRIES + 1, f"expected {LLM_MAX_RETRIES + 1} requests, server saw {served}"
+    return f"succeeded after {LLM_MAX_RETRIES} retried 503s"
+
+
+def check_hedge(base_url: str) -> str:
+    model = "hedge-model"
+    tracker = latency_tracker(NODE, model)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        tracker.record(0.05)
+    configure_server(delay=0.05, slow_first=1, slow_delay=3.0)
+    started_at = time.monotonic()
+    call_with_resilience(NODE, model, completion_call(base_url, model), 10)
+    elapsed = time.monotonic() - started_at
+    served = requests_served()
+    assert served == 2, f"expected a primary and a hedge, server saw {served} request(s)"
+    assert elapsed < 1.0, f"hedge did not win: call took {elapsed:.2f}s"
+    return f"hedged request answered in {elapsed * 1000:.0f} ms while the primary was stalled"
+
+
+def open_breaker(base_url: str, model: str):
+    configure_server(fail_models={model})
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        try:
+            call_with_resilience(NODE, model, completion_call(base_url, model), 10)
+        except CircuitOpenError:
+            break
+        except openai.APIStatusError:
+            continue
+    assert circuit_breaker(model).state == "open", f"breaker is {circuit_breaker(model).state}"
+
+
+def check_breaker_open(base_url: str) -> str:
+    model = "breaker-model"
+    open_breaker(base_url, model)
+    served = requests_served()
+    try:
+        call_with_resilience(NODE, model, completion_call(base_url, model), 10)
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("call went through an open breaker")
+    assert requests_served() == served, "an open breaker still sent a request"
+    return f"opened after {served} failed requests and shed the next call"
+
+
+def check_breaker_probe(base_url: str) -> str:
+    model = "probe-model"
+    open_breaker(base_url, model)
+    time.sleep(CIRCUIT_COOLDOWN_SECONDS)
+
+    configure_server(fail_models={model}, fail_status=400)
+    try:
+        call_with_resilience(NODE, model, completion_call(base_url, model), 10)
+    except openai.BadRequestError:
+        pass
+    state = circuit_breaker(model).state
+    assert state == "open", f"a 400 probe left the breaker {state}"
+
+    configure_server()
+    call_with_resilience(NODE, model, completion_call(base_url, model), 10)
+    state = circuit_breaker(model).state
+    assert state == "closed", f"a healthy probe left the breaker {state}"
+    return "a 400 probe kept it open; the next healthy probe closed it"
+
+
+CHECKS: Dict[str, Callable[[str], str]] = {
+    "retry": check_retry,
+    "hedge": check_hedge,
+    "breaker-open": check_breaker_open,
+    "breaker-probe": check_breaker_probe,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", choices=sorted(CHECKS), action="append", help="Run just these checks.")
+    options = parser.parse_args()
+
+    configure_server()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    failed = 0
+    for name in options.only or CHECKS:
+        try:
+            detail = CHECKS[name](base_url)
+        except Exception as exc:
+            failed += 1
+            print(f"FAIL  {name:<14} {type(exc).__name__}: {exc}")
+            continue
+        print(f"ok    {name:<14} {detail}")
+    server.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
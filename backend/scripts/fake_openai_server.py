@@ -0,0 +1,150 @@
+"""Local stand-in for the OpenAI chat completions API, for exercising the LLM call layer offline.
+
+Responses satisfy whatever JSON schema the request asks for, so structured-output nodes
+parse them normally, and streamed requests get the same content as server-sent events. Failures and latency are injectable per model:
+
+    python scripts/fake_openai_server.py --port 8765 --fail-models gpt-4o-mini --delay 0.2 --slow-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-local uvicorn main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_TEXT = "Order platform processes 1,200 orders per day across 3 regions"
+
+
+def sample_value(schema: dict, definitions: dict, depth: int = 0):
+    if "$ref" in schema:
+        return sample_value(definitions[schema["$ref"].split("/")[-1]], definitions, depth)
+    if "anyOf" in schema:
+        return sample_value(schema["anyOf"][0], definitions, depth)
+    if "enum" in schema:
+        return schema["enum"][depth % len(schema["enum"])]
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {name: sample_value(child, definitions, depth) for name, child in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), 6 if depth == 0 else 3)
+        return [sample_value(schema.get("items", {}), definitions, depth + index + 1) for index in range(count)]
+    if schema_type == "integer":
+        return 3
+    if schema_type == "number":
+        return 1.5
+    if schema_type == "boolean":
+        return True
+    return SAMPLE_TEXT
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    options: argparse.Namespace
+    request_counter = 0
+    counter_lock = threading.Lock()
+
+    def send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, model: str, request_number: int, content: str, include_usage: bool):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def event(delta: dict, finish_reason=None, usage=None):
+            chunk = {
+                "id": f"chatcmpl-fake-{request_number}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        size = self.options.stream_chunk_chars
+        for start in range(0, len(content), size):
+            time.sleep(self.options.stream_delay)
+            event({"content": content[start:start + size]})
+        event({}, "stop")
+        if include_usage:
+            event({}, usage={"prompt_tokens": 1000, "completion_tokens": 300, "total_tokens": 1300})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = body.get("model", "gpt-4o")
+        options = self.options
+        with self.counter_lock:
+            FakeOpenAIHandler.request_counter += 1
+            request_number = FakeOpenAIHandler.request_counter
+
+        delay = options.delay
+        if random.random() < options.slow_rate or request_number <= options.slow_first:
+            delay += options.slow_delay
+        time.sleep(delay)
+
+        failing = model in options.fail_models or random.random() < options.fail_rate
+        if failing or request_number <= options.fail_first:
+            self.send_json(options.fail_status, {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+
+        response_format = body.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {}).get("schema")
+        if schema:
+            content = json.dumps(sample_value(schema, schema.get("$defs", {})))
+        else:
+            content = SAMPLE_TEXT
+
+        if body.get("stream"):
+            self.send_stream(model, request_number, content, (body.get("stream_options") or {}).get("include_usage"))
+            return
+
+        self.send_json(200, {
+            "id": f"chatcmpl-fake-{request_number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 300, "total_tokens": 1300},
+        })
+
+    def log_message(self, format, *args):
+        if self.options.verbose:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Base latency in seconds for every response.")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of requests that get --slow-delay on top.")
+    parser.add_argument("--slow-delay", type=float, default=5.0)
+    parser.add_argument("--slow-first", type=int, default=0, help="Give the first N requests --slow-delay on top.")
+    parser.add_argument("--fail-models", default="", help="Comma-separated models that always fail.")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests that fail at random.")
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail the first N requests, then recover.")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--stream-chunk-chars", type=int, default=24, help="Characters per streamed content delta.")
+    parser.add_argument("--stream-delay", type=float, default=0.0, help="Seconds between streamed deltas.")
+    parser.add_argument("--verbose", action="store_true")
+    options = parser.parse_args()
+    options.fail_models = {model.strip() for model in options.fail_models.split(",") if model.strip()}
+
+    FakeOpenAIHandler.options = options
+    print(f"Fake OpenAI server listening on http://127.0.0.1:{options.port}/v1")
+    ThreadingHTTPServer(("127.0.0.1", options.port), FakeOpenAIHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
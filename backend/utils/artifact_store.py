@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import func
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# "memory" keeps artifacts in this process only. "database" also writes them to the app
+# database so any worker behind the load balancer can serve any deck.
+ARTIFACT_STORE_BACKEND = os.environ.get("OMNIPITCH_ARTIFACT_STORE", "memory").strip().lower()
+ARTIFACT_MEMORY_BYTES = int(float(os.environ.get("OMNIPITCH_ARTIFACT_MEMORY_MB", 256)) * 1024 * 1024)
+# Bounds for the database table; the least recently stored artifacts go first. 0 disables either.
+ARTIFACT_DATABASE_BYTES = int(float(os.environ.get("OMNIPITCH_ARTIFACT_DATABASE_MB", 2048)) * 1024 * 1024)
+ARTIFACT_MAX_AGE_SECONDS = float(os.environ.get("OMNIPITCH_ARTIFACT_MAX_AGE_DAYS", 30)) * 24 * 3600
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Artifact:
+    key: str
+    size: int
+    content_type: str
+    created_at: float
+
+    @property
+    def etag(self) -> str:
+        # Keys are content hashes, or derived from one, so they double as strong validators.
+        return f'"{self.key}"'
+
+    def as_record(self) -> dict:
+        return {**asdict(self), "etag": self.etag}
+
+
+def artifact_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_chunks(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    view = memoryview(data)[start:end]
+    for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+        yield bytes(view[offset:offset + STREAM_CHUNK_BYTES])
+
+
+class MemoryArtifactStore:
+    """Byte-bounded LRU of rendered artifacts, keyed by content hash."""
+
+    def __init__(self, max_bytes: int = ARTIFACT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Artifact, bytes]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def put(self, data: bytes, content_type: str = PPTX_MEDIA_TYPE, key: Optional[str] = None) -> Artifact:
+        key = key or artifact_key(data)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+        return self.add(Artifact(key, len(data), content_type, time.time()), data)
+
+    def add(self, artifact: Artifact, data: bytes) -> Artifact:
+        with self.lock:
+            if artifact.key not in self.entries:
+                self.entries[artifact.key] = (artifact, data)
+                self.total_bytes += artifact.size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+        return artifact
+
+    def get(self, key: str) -> Optional[Tuple[Artifact, bytes]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def stat(self, key: str) -> Optional[Artifact]:
+        entry = self.get(key)
+        return entry[0] if entry is not None else None
+
+
+class DatabaseArtifactStore:
+    """Write-through to the app database, with the memory LRU in front for hot reads.
+
+    The table is bounded like the other tiers: each new artifact evicts rows older than
+    ``max_age_seconds`` and then the oldest rows until the total fits ``max_bytes``.
+    Storing an artifact that already exists refreshes it, so decks that keep being
+    re-rendered stay while abandoned ones age out.
+    """
+
+    def __init__(self, cache: MemoryArtifactStore, max_bytes: int = ARTIFACT_DATABASE_BYTES, max_age_seconds: float = ARTIFACT_MAX_AGE_SECONDS):
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def put(self, data: bytes, content_type: str = PPTX_MEDIA_TYPE, key: Optional[str] = None) -> Artifact:
+        from database import SessionLocal
+        import models
+
+        artifact = self.cache.put(data, content_type, key)
+        db = SessionLocal()
+        try:
+            row = db.get(models.DeckArtifact, artifact.key)
+            if row is None:
+                db.add(models.DeckArtifact(
+                    key=artifact.key,
+                    content_type=artifact.content_type,
+                    size=artifact.size,
+                    created_at=time.time(),
+                    data=data,
+                ))
+            else:
+                row.created_at = time.time()
+            db.commit()
+            if row is None:
+                self.evict(db, artifact.key)
+        finally:
+            db.close()
+        return artifact
+
+    def evict(self, db, keep_key: str):
+        import models
+
+        table = models.DeckArtifact
+        if self.max_age_seconds > 0:
+            db.query(table).filter(table.created_at < time.time() - self.max_age_seconds, table.key != keep_key).delete(synchronize_session=False)
+        if self.max_bytes > 0:
+            total = db.query(func.coalesce(func.sum(table.size), 0)).scalar()
+            if total > self.max_bytes:
+                evicted = []
+                for key, size in db.query(table.key, table.size).filter(table.key != keep_key).order_by(table.created_at):
+                    if total <= self.max_bytes:
+                        break
+                    evicted.append(key)
+                    total -= size
+                db.query(table).filter(table.key.in_(evicted)).delete(synchronize_session=False)
+        db.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Artifact, bytes]]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        from database import SessionLocal
+        import models
+
+        db = SessionLocal()
+        try:
+            row = db.get(models.DeckArtifact, key)
+            if row is None:
+                return None
+            artifact = Artifact(row.key, row.size, row.content_type, row.created_at)
+            data = bytes(row.data)
+        finally:
+            db.close()
+        self.cache.add(artifact, data)
+        return artifact, data
+
+
+    def stat(self, key: str) -> Optional[Artifact]:
+        cached = self.cache.stat(key)
+        if cached is not None:
+            return cached
+
+        from database import SessionLocal
+        import models
+
+        table = models.DeckArtifact
+        db = SessionLocal()
+        try:
+            # Metadata only; the data column is left unread.
+            row = db.query(table.key, table.size, table.content_type, table.created_at).filter(table.key == key).first()
+        finally:
+            db.close()
+        return Artifact(row.key, row.size, row.content_type, row.created_at) if row is not None else None
+
+
+def build_artifact_store():
+    cache = MemoryArtifactStore()
+    if ARTIFACT_STORE_BACKEND == "database":
+        return DatabaseArtifactStore(cache)
+    return cache
+
+
+artifact_store = build_artifact_store()
@@ -0,0 +1,283 @@
+import ast
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+MAX_OUTLINE_ITEMS = 40
+MAX_SIGNATURE_CHARS = 140
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "python",
+    ".js": "javascript", ".jsx": "javascript", ".ts": "javascript", ".tsx": "javascript",
+    ".java": "jvm", ".kt": "jvm", ".kts": "jvm", ".scala": "jvm", ".cs": "jvm", ".swift": "jvm",
+    ".go": "go",
+    ".rs": "rust",
+    ".rb": "ruby",
+    ".php": "php",
+    ".c": "c", ".h": "c", ".cpp": "c", ".cc": "c",
+    ".sql": "sql",
+    ".sh": "shell",
+    ".env": "env",
+}
+
+# Each language family maps outline sections to line-anchored patterns; group 1 is what gets listed.
+LANGUAGE_PATTERNS: Dict[str, Dict[str, List[re.Pattern]]] = {
+    "python": {
+        "imports": [re.compile(r"^\s*from\s+([\w.]+)\s+import"), re.compile(r"^\s*import\s+([\w.]+)")],
+        "types": [re.compile(r"^\s*(class\s+\w+(?:\([^)]*\))?)")],
+        "functions": [re.compile(r"^(?:async\s+)?(def\s+\w+\s*\([^)]*\))")],
+        "routes": [re.compile(r"^\s*@\w+\.(get|post|put|patch|delete)\(\s*['\"]([^'\"]+)['\"]")],
+        "config": [re.compile(r"os\.(?:environ\.get|getenv)\(\s*['\"]([A-Z0-9_]+)['\"]")],
+    },
+    "javascript": {
+        "imports": [
+            re.compile(r"^\s*import\s+(?:.+?\s+from\s+)?['\"]([^'\"]+)['\"]"),
+            re.compile(r"require\(\s*['\"]([^'\"]+)['\"]\s*\)"),
+        ],
+        "types": [re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?((?:class|interface|type|enum)\s+\w+[^{=]*)")],
+        "functions": [
+            re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?(function\s*\*?\s*\w+\s*\([^)]*\))"),
+            re.compile(r"^\s*(?:export\s+)?const\s+(\w+\s*=\s*(?:async\s+)?\([^)]*\)\s*(?::\s*[^=]+)?=>)"),
+        ],
+        "routes": [re.compile(r"\b(?:app|router|server)\.(get|post|put|patch|delete)\(\s*['\"`]([^'\"`]+)")],
+        "config": [re.compile(r"(?:process\.env|import\.meta\.env)\.([A-Z][A-Z0-9_]+)")],
+    },
+    "jvm": {
+        "imports": [re.compile(r"^\s*(?:import|using)\s+(?:static\s+)?([\w.]+)")],
+        "types": [re.compile(r"^\s*(?:public\s+|private\s+|protected\s+|internal\s+|abstract\s+|final\s+|sealed\s+|data\s+|open\s+|static\s+|partial\s+)*((?:class|interface|enum|record|object|struct|protocol|trait)\s+\w+)")],
+        "functions": [
+            re.compile(r"^\s*(?:public|protected|internal|override|open|suspend)\s+(?:[\w<>\[\],?\s]+\s+)?((?:fun\s+)?\w+\s*\([^)]*\))\s*(?::\s*[\w<>?]+)?\s*(?:throws\s+[\w.,\s]+)?\{?\s*$"),
+            re.compile(r"^\s*(?:fun|def|func)\s+(\w+\s*\([^)]*\))"),
+        ],
+        "routes": [re.compile(r"@(Get|Post|Put|Patch|Delete|Request)Mapping\(\s*(?:value\s*=\s*|path\s*=\s*)?\"([^\"]+)\"")],
+        "config": [re.compile(r"@Value\(\s*\"\$\{([\w.\-]+)")],
+    },
+    "go": {
+        "imports": [re.compile(r"^\s*(?:import\s+)?\"([\w./\-]+)\"\s*$")],
+        "types": [re.compile(r"^type\s+(\w+\s+(?:struct|interface))")],
+        "functions": [re.compile(r"^func\s+((?:\([^)]*\)\s*)?\w+\s*\([^)]*\))")],
+        "routes": [re.compile(r"\.(GET|POST|PUT|PATCH|DELETE|HandleFunc|Handle)\(\s*\"([^\"]+)\"")],
+        "config": [re.compile(r"os\.Getenv\(\s*\"([A-Z0-9_]+)\"")],
+    },
+    "rust": {
+        "imports": [re.compile(r"^\s*use\s+([\w:]+)")],
+        "types": [re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?((?:struct|enum|trait|impl)\s+[\w<>:, ]+)")],
+        "functions": [re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(fn\s+\w+\s*(?:<[^>]*>)?\s*\([^)]*\))")],
+        "routes": [re.compile(r"#\[(get|post|put|patch|delete)\(\s*\"([^\"]+)\"")],
+        "config": [re.compile(r"env::var\(\s*\"([A-Z0-9_]+)\"")],
+    },
+    "ruby": {
+        "imports": [re.compile(r"^\s*require(?:_relative)?\s+['\"]([^'\"]+)['\"]")],
+        "types": [re.compile(r"^\s*((?:class|module)\s+[\w:]+(?:\s*<\s*[\w:]+)?)")],
+        "functions": [re.compile(r"^\s*(def\s+[\w.?!]+(?:\([^)]*\))?)")],
+        "routes": [re.compile(r"^\s*(get|post|put|patch|delete)\s+['\"]([^'\"]+)['\"]")],
+        "config": [re.compile(r"ENV\[\s*['\"]([A-Z0-9_]+)['\"]")],
+    },
+    "php": {
+        "imports": [re.compile(r"^\s*use\s+([\w\\]+)")],
+        "types": [re.compile(r"^\s*(?:abstract\s+|final\s+)?((?:class|interface|trait)\s+\w+)")],
+        "functions": [re.compile(r"^\s*(?:public\s+|private\s+|protected\s+|static\s+)*(function\s+\w+\s*\([^)]*\))")],
+        "routes": [re.compile(r"Route::(get|post|put|patch|delete)\(\s*['\"]([^'\"]+)['\"]")],
+        "config": [re.compile(r"env\(\s*['\"]([A-Z0-9_]+)['\"]")],
+    },
+    "c": {
+        "imports": [re.compile(r"^\s*#include\s+[<\"]([^>\"]+)[>\"]")],
+        "types": [re.compile(r"^\s*(?:typedef\s+)?((?:struct|class|enum|union)\s+\w+)\s*[{:]")],
+        "functions": [re.compile(r"^(?!\s*(?:if|for|while|switch|return|else)\b)[\w:*&<>\s]+?\b(\w+(?:::\w+)?\s*\([^;{)]*\))\s*(?:const\s*)?\{?\s*$")],
+        "routes": [],
+        "config": [re.compile(r"getenv\(\s*\"([A-Z0-9_]+)\"")],
+    },
+    "sql": {
+        "imports": [],
+        "types": [re.compile(r"^\s*create\s+(?:or\s+replace\s+)?((?:table|view|index|function|procedure|type)\s+(?:if\s+not\s+exists\s+)?[\w.\"]+)", re.IGNORECASE)],
+        "functions": [],
+        "routes": [],
+        "config": [],
+    },
+    "shell": {
+        "imports": [re.compile(r"^\s*(?:source|\.)\s+(\S+)")],
+        "types": [],
+        "functions": [re.compile(r"^\s*(?:function\s+)?(\w+)\s*\(\)\s*\{")],
+        "routes": [],
+        "config": [re.compile(r"^\s*(?:export\s+)?([A-Z][A-Z0-9_]+)=")],
+    },
+    "env": {
+        "imports": [],
+        "types": [],
+        "functions": [],
+        "routes": [],
+        "config": [re.compile(r"^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_.]*)\s*=")],
+    },
+}
+
+PYTHON_ROUTE_METHODS = {"get", "post", "put", "patch", "delete", "route", "api_route", "websocket"}
+
+
+def code_language(filename: str) -> Optional[str]:
+    basename = os.path.basename((filename or "").lower())
+    if basename == ".env" or basename.startswith(".env."):
+        return "env"
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(basename)[1])
+
+
+def clamp_signature(value: str) -> str:
+    text = re.sub(r"\s+", " ", value or "").strip()
+    if len(text) <= MAX_SIGNATURE_CHARS:
+        return text
+    return f"{text[: MAX_SIGNATURE_CHARS - 1].rstrip()}…"
+
+
+def unique_items(values: List[str], max_items: int = MAX_OUTLINE_ITEMS) -> List[str]:
+    seen = []
+    for value in values:
+        if value and value not in seen:
+            seen.append(value)
+        if len(seen) >= max_items:
+            break
+    return seen
+
+
+def format_python_arguments(arguments: ast.arguments) -> str:
+    parts = []
+    positional = list(arguments.posonlyargs) + list(arguments.args)
+    defaults_offset = len(positional) - len(arguments.defaults)
+    for index, argument in enumerate(positional):
+        text = argument.arg
+        if argument.annotation is not None:
+            text = f"{text}: {ast.unparse(argument.annotation)}"
+        if index >= defaults_offset:
+            text = f"{text}=…"
+        parts.append(text)
+    if arguments.vararg:
+        parts.append(f"*{arguments.vararg.arg}")
+    for argument in arguments.kwonlyargs:
+        parts.append(argument.arg)
+    if arguments.kwarg:
+        parts.append(f"**{arguments.kwarg.arg}")
+    return ", ".join(parts)
+
+
+def format_python_function(node: ast.AST) -> str:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {node.name}({format_python_arguments(node.args)})"
+    if node.returns is not None:
+        signature = f"{signature} -> {ast.unparse(node.returns)}"
+    return clamp_signature(signature)
+
+
+def python_route(decorator: ast.AST) -> Optional[Tuple[str, str]]:
+    if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+        return None
+    method = decorator.func.attr.lower()
+    if method not in PYTHON_ROUTE_METHODS or not decorator.args:
+        return None
+    path = decorator.args[0]
+    if not isinstance(path, ast.Constant) or not isinstance(path.value, str):
+        return None
+    return method.upper(), path.value
+
+
+def outline_python(source: str) -> Optional[Dict[str, List[str]]]:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    outline: Dict[str, List[str]] = {"summary": [], "imports": [], "types": [], "functions": [], "routes": [], "config": []}
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        outline["summary"].append(clamp_signature(docstring.strip().splitlines()[0]))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            outline["imports"].extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            outline["imports"].append(node.module)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in {"get", "getenv"}:
+            if node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+                owner = ast.unparse(node.func.value)
+                if owner in {"os", "os.environ"}:
+                    outline["config"].append(node.args[0].value)
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            outline["functions"].append(format_python_function(node))
+            for decorator in node.decorator_list:
+                route = python_route(decorator)
+                if route:
+                    outline["routes"].append(f"{route[0]} {route[1]} -> {node.name}")
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(base) for base in node.bases)
+            methods = [
+                child.name
+                for child in node.body
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and not child.name.startswith("__")
+            ]
+            fields = [
+                child.target.id
+                for child in node.body
+                if isinstance(child, ast.AnnAssign) and isinstance(child.target, ast.Name)
+            ]
+            entry = f"class {node.name}({bases})" if bases else f"class {node.name}"
+            if fields:
+                entry = f"{entry} fields: {', '.join(fields[:12])}"
+            if methods:
+                entry = f"{entry} methods: {', '.join(methods[:12])}"
+            outline["types"].append(clamp_signature(entry))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id.isupper():
+                    outline["config"].append(target.id)
+
+    return outline
+
+
+def outline_with_patterns(source: str, language: str) -> Dict[str, List[str]]:
+    patterns = LANGUAGE_PATTERNS.get(language, {})
+    outline: Dict[str, List[str]] = {"summary": [], "imports": [], "types": [], "functions": [], "routes": [], "config": []}
+    for line in source.splitlines():
+        if len(line) > 400:
+            continue
+        for section, section_patterns in patterns.items():
+            for pattern in section_patterns:
+                for match in pattern.finditer(line):
+                    if section == "routes" and match.lastindex and match.lastindex >= 2:
+                        outline[section].append(f"{match.group(1).upper()} {match.group(2)}")
+                    else:
+                        outline[section].append(clamp_signature(match.group(1)))
+    return outline
+
+
+def build_code_outline(filename: str, source: str) -> str:
+    language = code_language(filename)
+    if not language or not (source or "").strip():
+        return ""
+
+    outline = outline_python(source) if language == "python" else None
+    if outline is None:
+        outline = outline_with_patterns(source, language)
+
+    sections = [
+        ("Summary", outline["summary"]),
+        ("Imports", outline["imports"]),
+        ("Routes", outline["routes"]),
+        ("Config keys", outline["config"]),
+        ("Types", outline["types"]),
+        ("Functions", outline["functions"]),
+    ]
+    if not any(values for _, values in sections[1:]):
+        return ""
+
+    line_count = source.count("\n") + 1
+    lines = [f"Code outline ({language}, {line_count} lines)"]
+    for title, values in sections:
+        values = unique_items(values)
+        if not values:
+            continue
+        if title in {"Imports", "Config keys"}:
+            lines.append(f"{title}: {', '.join(values)}")
+            continue
+        lines.append(f"{title}:")
+        lines.extend(f"- {value}" for value in values)
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# End-to-end latency budget for one generation job. 0 disables deadlines entirely.
+JOB_DEADLINE_SECONDS = float(os.environ.get("OMNIPITCH_JOB_DEADLINE_SECONDS", 150))
+DEADLINE_WORKERS = int(os.environ.get("OMNIPITCH_DEADLINE_WORKERS", 8))
+
+# Share of the job budget each LLM node may spend, in graph order. The remainder is held
+# back for formatting and rendering, and time a node does not use flows to later nodes.
+NODE_DEADLINE_SHARES: Dict[str, float] = {
+    "CodeParser_Node": 0.4,
+    "BusinessValue_Node": 0.15,
+    "Narrative_Node": 0.4,
+}
+RENDER_RESERVE_SECONDS = 4.0
+
+llm_executor = ThreadPoolExecutor(max_workers=DEADLINE_WORKERS, thread_name_prefix="omnipitch-llm")
+
+
+@dataclass
+class DeadlineOutcome:
+    value: Any
+    source: str
+    reason: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    elapsed_ms: float = 0.0
+    error: Optional[BaseException] = None
+
+    @property
+    def used_fallback(self) -> bool:
+        return self.source == "fallback"
+
+    def as_record(self) -> Dict[str, Any]:
+        return {
+            "reason": self.reason,
+            "timeout_seconds": self.timeout_seconds,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+def job_deadline(started_at: Optional[float] = None) -> Optional[float]:
+    if JOB_DEADLINE_SECONDS <= 0:
+        return None
+    return (started_at or time.time()) + JOB_DEADLINE_SECONDS
+
+
+def deadline_from_config(config: Optional[Dict[str, Any]]) -> Optional[float]:
+    return ((config or {}).get("configurable") or {}).get("deadline_at")
+
+
+def node_timeout(node: str, deadline_at: Optional[float], now: Optional[float] = None) -> Optional[float]:
+    """Seconds this node may wait on the LLM, or None when the job has no deadline."""
+    if deadline_at is None or node not in NODE_DEADLINE_SHARES:
+        return None
+    remaining = deadline_at - (now or time.time()) - RENDER_RESERVE_SECONDS
+    if remaining <= 0:
+        return 0.0
+    nodes = list(NODE_DEADLINE_SHARES)
+    pending_share = sum(NODE_DEADLINE_SHARES[name] for name in nodes[nodes.index(node):])
+    return round(remaining * NODE_DEADLINE_SHARES[node] / pending_share, 2)
+
+
+def run_with_deadline(
+    primary: Callable[[Optional[float]], Any],
+    fallback: Callable[[], Any],
+    timeout_seconds: Optional[float],
+) -> DeadlineOutcome:
+    """Race an LLM call against its deadline while the heuristic result is built alongside.
+
+    The fallback is computed on the calling thread while the primary call runs on the
+    shared executor, so a missed deadline costs nothing extra to recover from. A primary
+    that raises also resolves to the fallback, matching the nodes' existing behaviour.
+
+    The budget starts when a worker picks the call up, not when it is queued, so a burst
+    of jobs does not spend it waiting for a free thread; a call still queued after a whole
+    budget is cancelled instead. ``primary`` gets the budget as its request timeout,
+    because a call that has started cannot be cancelled and would otherwise keep its
+    worker busy long after the node has moved on.
+    """
+    started_at = time.perf_counter()
+
+    def finish(value: Any, source: str, reason: Optional[str] = None, error: Optional[BaseException] = None) -> DeadlineOutcome:
+        return DeadlineOutcome(
+            value=value,
+            source=source,
+            reason=reason,
+            timeout_seconds=timeout_seconds,
+            elapsed_ms=round((time.perf_counter() - started_at) * 1000, 1),
+            error=error,
+        )
+
+    if timeout_seconds is not None and timeout_seconds <= 0:
+        return finish(fallback(), "fallback", "deadline")
+
+    began = threading.Event()
+    began_at: List[float] = []
+
+    def run_primary() -> Any:
+        began_at.append(time.perf_counter())
+        began.set()
+        return primary(timeout_seconds)
+
+    # copy_context keeps LangChain callbacks (usage tracking, tracing) attached to the call.
+    future = llm_executor.submit(contextvars.copy_context().run, run_primary)
+    speculative = fallback()
+    remaining = None
+    if timeout_seconds is not None:
+        queued_for = time.perf_counter() - started_at
+        if not began.wait(max(timeout_seconds - queued_for, 0)) and future.cancel():
+            return finish(speculative, "fallback", "queued")
+        # cancel() fails once a worker has taken the call, which then starts any moment.
+        began.wait()
+        remaining = max(began_at[0] + timeout_seconds - time.perf_counter(), 0)
+    try:
+        return finish(future.result(timeout=remaining), "llm")
+    except FutureTimeoutError:
+        return finish(speculative, "fallback", "deadline")
+    except Exception as exc:
+        return finish(speculative, "fallback", "error", exc)
@@ -0,0 +1,274 @@
+import base64
+import hashlib
+import io
+import posixpath
+import zipfile
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
+
+from .text_fit import LINE_HEIGHT, wrap_lines
+
+SNAPSHOT_MEDIA_TYPE = "text/html; charset=utf-8"
+# Part of every snapshot's storage key; bump it when the drawing changes.
+SNAPSHOT_VERSION = "2"
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+EMU_PER_PX = 9525
+PX_PER_POINT = 96 / 72
+# bodyPr insets when a shape does not set its own (0.1" left/right, 0.05" top/bottom).
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)
+# Runs without their own properties use the template's default text style.
+DEFAULT_FONT_SIZE = 1800
+FONT_STACKS = {
+    "+mn-lt": "Calibri, Carlito, Arial, sans-serif",
+    "Aptos": "Aptos, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif",
+    "Aptos Display": "'Aptos Display', Aptos, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif",
+}
+TEXT_ANCHORS = {"l": "start", "ctr": "middle", "r": "end"}
+IMAGE_MEDIA_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif", ".svg": "image/svg+xml"}
+# Top of a line box to its baseline, as a share of the font size.
+BASELINE_OFFSET = 0.95
+
+SNAPSHOT_STYLE = (
+    "html{background:#e2e8f0}body{margin:0;padding:24px;font-family:'Segoe UI',Arial,sans-serif}"
+    ".deck{display:grid;gap:24px;max-width:1280px;margin:0 auto}"
+    ".slide{margin:0;aspect-ratio:16/9;box-shadow:0 8px 28px rgba(15,23,42,.18)}"
+    ".slide svg{display:block;width:100%;height:100%}"
+    "@media print{@page{size:landscape;margin:0}html{background:none}body{padding:0}"
+    ".deck{gap:0;max-width:none}.slide{box-shadow:none;break-after:page}}"
+)
+
+
+def px(emu) -> str:
+    return f"{int(emu) / EMU_PER_PX:.1f}".rstrip("0").rstrip(".")
+
+
+def color_attrs(parent, prefix: str) -> str:
+    """SVG paint attributes for the solid fill under ``parent``, or ``none``."""
+    if parent is None or parent.find("a:noFill", NS) is not None:
+        return f'{prefix}="none"'
+    color = parent.find("a:solidFill/a:srgbClr", NS)
+    if color is None:
+        return f'{prefix}="none"'
+    attrs = f'{prefix}="#{color.get("val")}"'
+    alpha = color.find("a:alpha", NS)
+    if alpha is not None:
+        attrs += f' {prefix}-opacity="{int(alpha.get("val")) / 100000:g}"'
+    return attrs
+
+
+class SlidePart:
+    """The shape tree of one slide or layout part, read straight from the package."""
+
+    def __init__(self, package: zipfile.ZipFile, name: str):
+        self.package = package
+        self.name = name
+        self.root = etree.fromstring(package.read(name))
+        rels_name = posixpath.join(posixpath.dirname(name), "_rels", posixpath.basename(name) + ".rels")
+        self.rels: Dict[str, str] = {}
+        if rels_name in package.NameToInfo:
+            for rel in etree.fromstring(package.read(rels_name)).iterfind("rel:Relationship", NS):
+                self.rels[rel.get("Id")] = posixpath.normpath(posixpath.join(posixpath.dirname(name), rel.get("Target")))
+
+    def related(self, kind: str) -> Optional[str]:
+        for target in self.rels.values():
+            if f"/{kind}" in target:
+                return target
+        return None
+
+    def shapes(self, tree=None) -> List[etree._Element]:
+        tree = self.root.find("p:cSld/p:spTree", NS) if tree is None else tree
+        return tree.xpath("./p:sp | ./p:cxnSp | ./p:pic | ./p:grpSp", namespaces=NS)
+
+
+def group_svg(group, part: SlidePart) -> str:
+    """A group's children, mapped from its child coordinate space onto the slide."""
+    xfrm = group.find("p:grpSpPr/a:xfrm", NS)
+    children = "".join(shape_svg(child, part) for child in part.shapes(group))
+    if xfrm is None or xfrm.find("a:chExt", NS) is None:
+        return children
+    offset, extent = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+    child_offset, child_extent = xfrm.find("a:chOff", NS), xfrm.find("a:chExt", NS)
+    scale_x = int(extent.get("cx")) / max(int(child_extent.get("cx")), 1)
+    scale_y = int(extent.get("cy")) / max(int(child_extent.get("cy")), 1)
+    translate_x = int(offset.get("x")) - int(child_offset.get("x")) * scale_x
+    translate_y = int(offset.get("y")) - int(child_offset.get("y")) * scale_y
+    return f'<g transform="matrix({scale_x:g} 0 0 {scale_y:g} {px(translate_x)} {px(translate_y)})">{children}</g>'
+
+
+def picture_svg(picture, part: SlidePart, left: int, top: int, width: int, height: int) -> str:
+    """The picture inlined as a data URI, so the page still makes no external requests."""
+    embed = picture.xpath("string(p:blipFill/a:blip/@r:embed)", namespaces=NS)
+    target = part.rels.get(embed)
+    media_type = IMAGE_MEDIA_TYPES.get(posixpath.splitext(target or "")[1].lower())
+    if not media_type or target not in part.package.NameToInfo:
+        return ""
+    data = base64.b64encode(part.package.read(target)).decode("ascii")
+    return (
+        f'<image x="{px(left)}" y="{px(top)}" width="{px(width)}" height="{px(height)}"'
+        f' preserveAspectRatio="none" href="data:{media_type};base64,{data}"/>'
+    )
+
+
+def shape_svg(shape, part: SlidePart) -> str:
+    if etree.QName(shape).localname == "grpSp":
+        return group_svg(shape, part)
+    xfrm = shape.find("p:spPr/a:xfrm", NS)
+    if xfrm is None:
+        return ""
+    offset, extent = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+    left, top = int(offset.get("x")), int(offset.get("y"))
+    width, height = int(extent.get("cx")), int(extent.get("cy"))
+    if etree.QName(shape).localname == "pic":
+        return picture_svg(shape, part, left, top, width, height)
+    sp_pr = shape.find("p:spPr", NS)
+    line = sp_pr.find("a:ln", NS)
+    stroke = color_attrs(line, "stroke")
+    if line is not None and line.get("w"):
+        stroke += f' stroke-width="{px(line.get("w"))}"'
+
+    geometry = sp_pr.xpath("string(a:prstGeom/@prst)", namespaces=NS) or "rect"
+    if etree.QName(shape).localname == "cxnSp":
+        x1, x2 = (left + width, left) if xfrm.get("flipH") == "1" else (left, left + width)
+        y1, y2 = (top + height, top) if xfrm.get("flipV") == "1" else (top, top + height)
+        return f'<line x1="{px(x1)}" y1="{px(y1)}" x2="{px(x2)}" y2="{px(y2)}" {stroke}/>'
+
+    fill = color_attrs(sp_pr, "fill")
+    parts = []
+    if geometry == "ellipse":
+        parts.append(f'<ellipse cx="{px(left + width / 2)}" cy="{px(top + height / 2)}" rx="{px(width / 2)}" ry="{px(height / 2)}" {fill} {stroke}/>')
+    elif fill != 'fill="none"' or stroke != 'stroke="none"':
+        # roundRect's default corner is 16.667% of the shorter side.
+        radius = f' rx="{px(min(width, height) * 0.16667)}"' if geometry == "roundRect" else ""
+        parts.append(f'<rect x="{px(left)}" y="{px(top)}" width="{px(width)}" height="{px(height)}"{radius} {fill} {stroke}/>')
+    parts.append(text_svg(shape, left, top, width, height))
+    return "".join(parts)
+
+
+def paragraph_text(paragraph) -> Tuple[str, Optional[etree._Element]]:
+    """Plain text of a paragraph, line breaks as newlines, and its first run's properties."""
+    text, properties = [], None
+    for child in paragraph:
+        name = etree.QName(child).localname
+        if name == "br":
+            text.append("\n")
+        elif name == "r":
+            text.append(child.findtext("a:t", default="", namespaces=NS))
+            if properties is None:
+                properties = child.find("a:rPr", NS)
+    return "".join(text), properties
+
+
+def text_svg(shape, left: int, top: int, width: int, height: int) -> str:
+    body = shape.find("p:txBody", NS)
+    if body is None:
+        return ""
+    body_pr = body.find("a:bodyPr", NS)
+    insets = [int(body_pr.get(name, default)) for name, default in zip(("lIns", "tIns", "rIns", "bIns"), DEFAULT_INSETS)]
+    inner_width = max(width - insets[0] - insets[2], 1)
+    # Text in a plain shape takes the style's light font color; text boxes use the text color.
+    default_color = "FFFFFF" if shape.find("p:style/a:fontRef/a:schemeClr[@val='lt1']", NS) is not None else "000000"
+
+    lines = []
+    cursor = 0.0
+    for paragraph in body.iterfind("a:p", NS):
+        text, properties = paragraph_text(paragraph)
+        size, bold, font, color = DEFAULT_FONT_SIZE / 100, False, "+mn-lt", default_color
+        if properties is not None:
+            size = int(properties.get("sz", DEFAULT_FONT_SIZE)) / 100
+            bold = properties.get("b") == "1"
+            font = properties.xpath("string(a:latin/@typeface)", namespaces=NS) or font
+            color = properties.xpath("string(a:solidFill/a:srgbClr/@val)", namespaces=NS) or color
+        align = paragraph.xpath("string(a:pPr/@algn)", namespaces=NS) or "l"
+        space_after = paragraph.xpath("string(a:pPr/a:spcAft/a:spcPts/@val)", namespaces=NS)
+        for line in wrap_lines(text, bold, max(round(size), 1), inner_width) if text.strip() else ():
+            lines.append((cursor, line, size, bold, font, color, align))
+            cursor += size * LINE_HEIGHT
+        if not text.strip():
+            cursor += size * LINE_HEIGHT
+        cursor += int(space_after) / 100 if space_after else 0
+    if not lines:
+        return ""
+
+    text_height = lines[-1][0] + lines[-1][2] * LINE_HEIGHT
+    anchor = body_pr.get("anchor", "t")
+    available = (height - insets[1] - insets[3]) / EMU_PER_PX / PX_PER_POINT
+    shift = {"ctr": (available - text_height) / 2, "b": available - text_height}.get(anchor, 0.0)
+    origin_y = (top + insets[1]) / EMU_PER_PX
+    x_by_align = {
+        "l": px(left + insets[0]),
+        "ctr": px(left + insets[0] + inner_width / 2),
+        "r": px(left + width - insets[2]),
+    }
+
+    elements = []
+    for offset, line, size, bold, font, color, align in lines:
+        baseline = origin_y + (shift + offset + size * BASELINE_OFFSET) * PX_PER_POINT
+        family = quoteattr(FONT_STACKS.get(font, f"{font}, sans-serif"))
+        weight = ' font-weight="700"' if bold else ""
+        elements.append(
+            f'<text x="{x_by_align.get(align, x_by_align["l"])}" y="{baseline:.1f}" font-size="{size * PX_PER_POINT:.1f}"'
+            f' font-family={family} fill="#{color}"{weight} text-anchor="{TEXT_ANCHORS.get(align, "start")}">{escape(line)}</text>'
+        )
+    return "".join(elements)
+
+
+def slide_svg(package: zipfile.ZipFile, slide_name: str, width: int, height: int, label: str, layouts: Dict[str, str]) -> str:
+    slide = SlidePart(package, slide_name)
+    layout_name = slide.related("slideLayout")
+    if layout_name and layout_name not in layouts:
+        # Every slide of a theme shares one of two layouts, so draw each only once.
+        layout = SlidePart(package, layout_name)
+        layouts[layout_name] = "".join(shape_svg(shape, layout) for shape in layout.shapes())
+    shapes = layouts.get(layout_name, "") + "".join(shape_svg(shape, slide) for shape in slide.shapes())
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {px(width)} {px(height)}" role="img" aria-label={quoteattr(label)}>'
+        f'<rect width="100%" height="100%" fill="#FFFFFF"/>{shapes}</svg>'
+    )
+
+
+def snapshot_key(deck_key: str, title: str = "") -> str:
+    """Storage key of the snapshot of the deck stored under ``deck_key``.
+
+    The page is a pure function of the deck's bytes, its title and SNAPSHOT_VERSION, so
+    deriving the key from those lets a re-stored deck skip drawing it again.
+    """
+    return hashlib.sha256(f"snapshot:{SNAPSHOT_VERSION}:{deck_key}:{title}".encode("utf-8")).hexdigest()
+
+
+def render_snapshot(pptx_data: bytes, title: str = "") -> bytes:
+    """A self-contained HTML page with one inline SVG per slide of a rendered deck.
+
+    It is drawn from the same slide XML the .pptx download contains, so geometry, colors and
+    the fitted font sizes match it, and text is wrapped with the renderer's own measurements.
+    Pictures are inlined as data URIs and groups keep their child transforms. There are no
+    scripts or external requests, and the page prints one slide per sheet.
+    """
+    package = zipfile.ZipFile(io.BytesIO(pptx_data))
+    presentation = SlidePart(package, "ppt/presentation.xml")
+    size = presentation.root.find("p:sldSz", NS)
+    width, height = int(size.get("cx")), int(size.get("cy"))
+    slide_names = [
+        presentation.rels[slide_id.get(f"{{{NS['r']}}}id")]
+        for slide_id in presentation.root.iterfind("p:sldIdLst/p:sldId", NS)
+    ]
+    title = title or "Executive Deck"
+    layouts: Dict[str, str] = {}
+    figures = "".join(
+        f'<figure class="slide">{slide_svg(package, name, width, height, f"{title}, slide {index}", layouts)}</figure>'
+        for index, name in enumerate(slide_names, start=1)
+    )
+    document = (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{escape(title)}</title><style>{SNAPSHOT_STYLE}</style></head>"
+        f'<body><main class="deck">{figures}</main></body></html>'
+    )
+    return document.encode("utf-8")
@@ -0,0 +1,119 @@
+import base64
+import io
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+IMAGE_MAX_EDGE = int(os.environ.get("OMNIPITCH_IMAGE_MAX_EDGE", 1536))
+IMAGE_JPEG_QUALITY = int(os.environ.get("OMNIPITCH_IMAGE_JPEG_QUALITY", 82))
+IMAGE_LOW_DETAIL_MAX_EDGE = 512
+# A 16x16 difference hash (256 bits) separates screenshots of the same UI that differ in
+# content; only re-encodes, resizes and light crops stay within this many bits.
+IMAGE_DUPLICATE_HAMMING_DISTANCE = 10
+DHASH_SIZE = 16
+
+
+@dataclass
+class ProcessedImage:
+    data_url: str
+    detail: str
+    width: int
+    height: int
+    bytes_in: int
+    bytes_out: int
+    phash: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(self.bytes_in - self.bytes_out, 0)
+
+
+def difference_hash(image: Image.Image) -> int:
+    grayscale = image.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(grayscale.getdata())
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for column in range(DHASH_SIZE):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return bin(left ^ right).count("1")
+
+
+def is_near_duplicate(phash: int, seen_hashes: List[int], max_distance: int = IMAGE_DUPLICATE_HAMMING_DISTANCE) -> bool:
+    return any(hamming_distance(phash, seen) <= max_distance for seen in seen_hashes)
+
+
+def choose_detail(width: int, height: int) -> str:
+    # Small images cost the flat low-detail rate; tiling them at high detail adds nothing.
+    return "low" if max(width, height) <= IMAGE_LOW_DETAIL_MAX_EDGE else "high"
+
+
+def has_transparency(image: Image.Image) -> bool:
+    if image.mode in ("RGBA", "LA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+def normalize_mode(image: Image.Image) -> Image.Image:
+    """CMYK, palette, 16-bit and other modes become RGB(A) or L, which both encoders accept."""
+    if has_transparency(image):
+        return image if image.mode == "RGBA" else image.convert("RGBA")
+    return image if image.mode in ("RGB", "L") else image.convert("RGB")
+
+
+def encode_image(image: Image.Image, prefer_png: bool) -> tuple[str, bytes]:
+    image = normalize_mode(image)
+    if image.mode == "RGBA":
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        return "image/png", buffer.getvalue()
+
+    rgb_image = image.convert("RGB")
+    jpeg_buffer = io.BytesIO()
+    rgb_image.save(jpeg_buffer, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+    if not prefer_png:
+        return "image/jpeg", jpeg_buffer.getvalue()
+
+    # Flat diagrams and screenshots often compress better (and stay sharper) as PNG.
+    png_buffer = io.BytesIO()
+    image.save(png_buffer, format="PNG", optimize=True)
+    if png_buffer.tell() <= jpeg_buffer.tell():
+        return "image/png", png_buffer.getvalue()
+    return "image/jpeg", jpeg_buffer.getvalue()
+
+
+def preprocess_image(label: str, content: bytes, max_edge: int = IMAGE_MAX_EDGE) -> Optional[ProcessedImage]:
+    """Downscale and re-encode an upload; None when it cannot be decoded or encoded safely."""
+    try:
+        with Image.open(io.BytesIO(content)) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+
+        phash = difference_hash(image)
+        resized = max(image.size) > max_edge
+        if resized:
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        original_mime = "image/png" if os.path.splitext(label.lower())[1] == ".png" else "image/jpeg"
+        mime, encoded = encode_image(image, prefer_png=original_mime == "image/png")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        return None
+    if not resized and len(encoded) >= len(content):
+        mime, encoded = original_mime, content
+
+    width, height = image.size
+    return ProcessedImage(
+        data_url=f"data:{mime};base64,{base64.b64encode(encoded).decode('utf-8')}",
+        detail=choose_detail(width, height),
+        width=width,
+        height=height,
+        bytes_in=len(content),
+        bytes_out=len(encoded),
+        phash=phash,
+    )
@@ -0,0 +1,117 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class JsonArrayStream:
+    """Incremental scanner for a streamed JSON object with one array of objects inside.
+
+    Each call to ``feed`` scans only the new text, so the cost over a whole response stays
+    linear. Items of the top-level ``array_key`` array are returned with their position as
+    soon as their closing brace arrives, and top-level scalar fields (deck_title and the
+    like) are kept in ``fields`` once complete. ``array_length`` is set when the array
+    closes. Malformed items are skipped but still take up their position; the caller still
+    validates the full document when the stream ends.
+    """
+
+    array_key: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    buffer: str = ""
+    position: int = 0
+    stack: List[str] = field(default_factory=list)
+    in_string: bool = False
+    escaped: bool = False
+    string_start: int = -1
+    value_start: int = -1
+    pending_key: Optional[str] = None
+    current_key: Optional[str] = None
+    in_array: bool = False
+    item_start: int = -1
+    items_seen: int = 0
+    array_length: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[int, Dict[str, Any]]]:
+        self.buffer += text
+        completed: List[Tuple[int, Dict[str, Any]]] = []
+        buffer = self.buffer
+        for index in range(self.position, len(buffer)):
+            char = buffer[index]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    self.close_string(index)
+                continue
+
+            depth = len(self.stack)
+            if char == '"':
+                self.in_string = True
+                self.string_start = index
+            elif char == ":" and depth == 1:
+                self.current_key, self.pending_key = self.pending_key, None
+                self.value_start = index + 1
+            elif char in ",}" and depth == 1:
+                self.close_scalar(index)
+                if char == "}":
+                    self.stack.pop()
+            elif char in "{[":
+                if depth == 1 and char == "[" and self.current_key == self.array_key:
+                    self.in_array = True
+                elif depth == 2 and char == "{" and self.in_array:
+                    self.item_start = index
+                self.stack.append(char)
+            elif char in "}]":
+                if self.stack:
+                    self.stack.pop()
+                depth = len(self.stack)
+                if depth == 2 and char == "}" and self.in_array and self.item_start >= 0:
+                    item = self.parse_item(buffer[self.item_start:index + 1])
+                    self.item_start = -1
+                    if item is not None:
+                        completed.append((self.items_seen - 1, item))
+                elif depth == 1 and char == "]" and self.in_array:
+                    self.in_array = False
+                    self.array_length = self.items_seen
+                if depth == 1:
+                    self.current_key = None
+        self.position = len(buffer)
+        return completed
+
+    def close_string(self, index: int):
+        if len(self.stack) != 1:
+            return
+        value = json.loads(self.buffer[self.string_start:index + 1])
+        if self.current_key is None:
+            self.pending_key = value
+        else:
+            self.fields[self.current_key] = value
+            self.current_key = None
+
+    def close_scalar(self, index: int):
+        # Strings are recorded as they close; this picks up numbers, booleans and null.
+        if self.current_key is None or self.value_start < 0:
+            self.current_key = None
+            return
+        raw = self.buffer[self.value_start:index].strip()
+        if raw:
+            try:
+                self.fields[self.current_key] = json.loads(raw)
+            except ValueError:
+                pass
+        self.current_key = None
+
+    def parse_item(self, raw: str) -> Optional[Dict[str, Any]]:
+        self.items_seen += 1
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
+
+    @property
+    def text(self) -> str:
+        return self.buffer
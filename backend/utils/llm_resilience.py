@@ -0,0 +1,217 @@
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import openai
+
+# Per-call request timeout ceilings. The node deadline, when one is set, can only shorten these.
+# OMNIPITCH_LLM_TIMEOUTS takes a JSON object of node -> seconds to override them.
+NODE_CALL_TIMEOUTS: Dict[str, float] = {
+    "CodeParser_Node": 90.0,
+    "BusinessValue_Node": 30.0,
+    "Narrative_Node": 120.0,
+}
+NODE_CALL_TIMEOUTS.update(json.loads(os.environ.get("OMNIPITCH_LLM_TIMEOUTS", "") or "{}"))
+
+LLM_MAX_RETRIES = int(os.environ.get("OMNIPITCH_LLM_MAX_RETRIES", 2))
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get("OMNIPITCH_LLM_BACKOFF_BASE_SECONDS", 0.5))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get("OMNIPITCH_LLM_BACKOFF_MAX_SECONDS", 8.0))
+
+# Send a duplicate request once a call has run longer than this latency percentile of recent
+# successful calls for the same node and model. 0 disables hedging.
+LLM_HEDGE_PERCENTILE = float(os.environ.get("OMNIPITCH_LLM_HEDGE_PERCENTILE", 0))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("OMNIPITCH_LLM_CIRCUIT_FAILURES", 5))
+CIRCUIT_COOLDOWN_SECONDS = float(os.environ.get("OMNIPITCH_LLM_CIRCUIT_COOLDOWN_SECONDS", 30))
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="omnipitch-hedge")
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, model: str, retry_in_seconds: float):
+        super().__init__(f"Circuit open for {model}; retrying in {retry_in_seconds:.0f}s")
+        self.model = model
+        self.retry_in_seconds = retry_in_seconds
+
+
+@dataclass
+class CircuitBreaker:
+    """Consecutive-failure breaker: open after a run of provider failures, probe once after cooldown."""
+
+    model: str
+    failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD
+    cooldown_seconds: float = CIRCUIT_COOLDOWN_SECONDS
+    state: str = "closed"
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def before_call(self):
+        with self.lock:
+            if self.state == "closed":
+                return
+            waited = time.monotonic() - self.opened_at
+            if self.state == "open" and waited >= self.cooldown_seconds:
+                # Let exactly one probe through; everyone else keeps shedding until it reports back.
+                self.state = "half_open"
+                return
+            raise CircuitOpenError(self.model, max(self.cooldown_seconds - waited, 0))
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def release_probe(self):
+        # A non-retryable error (a bad request) says nothing about the provider's health, so a
+        # probe that hits one hands the probe slot back without closing the breaker.
+        with self.lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"model": self.model, "state": self.state, "consecutive_failures": self.consecutive_failures}
+
+
+@dataclass
+class LatencyTracker:
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        index = min(int(round(percentile / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+latency_trackers: Dict[str, LatencyTracker] = {}
+registry_lock = threading.Lock()
+
+
+def circuit_breaker(model: str) -> CircuitBreaker:
+    with registry_lock:
+        return circuit_breakers.setdefault(model, CircuitBreaker(model))
+
+
+def latency_tracker(node: str, model: str) -> LatencyTracker:
+    with registry_lock:
+        return latency_trackers.setdefault(f"{node}:{model}", LatencyTracker())
+
+
+def circuit_snapshot() -> List[Dict[str, Any]]:
+    with registry_lock:
+        breakers = list(circuit_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError, TimeoutError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter: spreads retries from concurrent jobs instead of having them stampede together.
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def call_timeout(node: str, remaining: Optional[float]) -> Optional[float]:
+    ceiling = NODE_CALL_TIMEOUTS.get(node)
+    if remaining is None:
+        return ceiling
+    return min(ceiling, remaining) if ceiling else remaining
+
+
+def hedged_call(node: str, model: str, call: Callable[[Optional[float]], Any], timeout: Optional[float]) -> Any:
+    hedge_after = latency_tracker(node, model).percentile(LLM_HEDGE_PERCENTILE) if LLM_HEDGE_PERCENTILE > 0 else None
+    if hedge_after is None or (timeout is not None and hedge_after >= timeout):
+        return call(timeout)
+
+    started_at = time.monotonic()
+    primary = hedge_executor.submit(contextvars.copy_context().run, call, timeout)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    hedge_timeout = None if timeout is None else max(timeout - (time.monotonic() - started_at), 0.1)
+    pending = {primary, hedge_executor.submit(contextvars.copy_context().run, call, hedge_timeout)}
+    first_error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for straggler in pending:
+                    straggler.cancel()
+                return future.result()
+            first_error = first_error or future.exception()
+    raise first_error
+
+
+def call_with_resilience(
+    node: str,
+    model: str,
+    call: Callable[[Optional[float]], Any],
+    timeout_seconds: Optional[float] = None,
+) -> Any:
+    """Run ``call(request_timeout)`` with retries, optional hedging and a per-model circuit breaker.
+
+    ``timeout_seconds`` bounds the whole sequence, backoff sleeps included; each request also
+    respects the node's ceiling in NODE_CALL_TIMEOUTS. Non-retryable errors (bad requests,
+    schema validation) are raised straight away and do not count against the breaker.
+    """
+    breaker = circuit_breaker(model)
+    started_at = time.monotonic()
+    attempt = 0
+    while True:
+        remaining = None if timeout_seconds is None else timeout_seconds - (time.monotonic() - started_at)
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError(f"{node} ran out of time calling {model}")
+
+        breaker.before_call()
+        request_started_at = time.monotonic()
+        try:
+            value = hedged_call(node, model, call, call_timeout(node, remaining))
+        except Exception as exc:
+            if not is_retryable(exc):
+                breaker.release_probe()
+                raise
+            breaker.record_failure()
+            if attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            if remaining is not None and time.monotonic() - started_at + delay >= timeout_seconds:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        latency_tracker(node, model).record(time.monotonic() - request_started_at)
+        breaker.record_success()
+        return value
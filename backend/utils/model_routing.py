@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import get_usage_metadata_callback
+
+from .llm_resilience import call_with_resilience
+from .token_budget import DEFAULT_MODEL, summarize_usage_callback
+
+# Inline JSON or a path to a JSON file, shaped like DEFAULT_MODEL_ROUTES. Nodes present in
+# the override replace their default rule list; other nodes keep the defaults.
+MODEL_ROUTES_ENV = "OMNIPITCH_MODEL_ROUTES"
+
+# Rules are checked in order and the first whose max_input_tokens fits the corpus wins.
+# Models after the first form the fallback chain used on errors and timeouts.
+DEFAULT_MODEL_ROUTES: Dict[str, List[Dict[str, Any]]] = {
+    "CodeParser_Node": [
+        {"name": "short-corpus", "max_input_tokens": 4000, "models": ["gpt-4o-mini", "gpt-4o"]},
+        {"name": "default", "models": ["gpt-4o", "gpt-4o-mini"]},
+    ],
+    "BusinessValue_Node": [
+        {"name": "default", "models": ["gpt-4o-mini", "gpt-4o"]},
+    ],
+    "Narrative_Node": [
+        {"name": "default", "models": ["gpt-4o", "gpt-4o-mini"]},
+    ],
+}
+
+# Without an explicit attempt timeout, an attempt that still has fallbacks behind it may use
+# this share of the node's remaining time so the next model gets a real chance.
+CHAINED_ATTEMPT_SHARE = 0.65
+
+
+@dataclass
+class ModelRoute:
+    node: str
+    rule: str
+    models: List[str]
+    attempt_timeout_seconds: Optional[float] = None
+
+    @property
+    def primary_model(self) -> str:
+        return self.models[0]
+
+
+@dataclass
+class RouteResult:
+    value: Any
+    model: str
+    usage_metadata: Dict[str, Any]
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class RouteExhaustedError(RuntimeError):
+    def __init__(self, route: ModelRoute, attempts: List[Dict[str, Any]]):
+        super().__init__(f"All models failed for {route.node} ({route.rule}): {', '.join(route.models)}")
+        self.route = route
+        self.attempts = attempts
+
+
+route_metrics: Dict[str, Dict[str, Any]] = {}
+route_metrics_lock = threading.Lock()
+
+
+def load_route_config() -> Dict[str, List[Dict[str, Any]]]:
+    routes = {node: [dict(rule) for rule in rules] for node, rules in DEFAULT_MODEL_ROUTES.items()}
+    raw = os.environ.get(MODEL_ROUTES_ENV, "").strip()
+    if not raw:
+        return routes
+    try:
+        if not raw.startswith("{"):
+            with open(raw, "r", encoding="utf-8") as handle:
+                raw = handle.read()
+        overrides = json.loads(raw)
+    except (OSError, ValueError) as exc:
+        print(f"Ignoring {MODEL_ROUTES_ENV}: {exc}")
+        return routes
+
+    for node, rules in (overrides or {}).items():
+        valid_rules = [rule for rule in rules or [] if isinstance(rule, dict) and rule.get("models")]
+        if valid_rules:
+            routes[node] = valid_rules
+    return routes
+
+
+MODEL_ROUTES = load_route_config()
+
+
+def resolve_route(node: str, input_tokens: int) -> ModelRoute:
+    for index, rule in enumerate(MODEL_ROUTES.get(node, [])):
+        max_input_tokens = rule.get("max_input_tokens")
+        if max_input_tokens is not None and input_tokens > max_input_tokens:
+            continue
+        return ModelRoute(
+            node=node,
+            rule=rule.get("name") or f"rule-{index}",
+            models=list(rule["models"]),
+            attempt_timeout_seconds=rule.get("attempt_timeout_seconds"),
+        )
+    return ModelRoute(node=node, rule="default", models=[DEFAULT_MODEL])
+
+
+def attempt_timeout(route: ModelRoute, remaining: Optional[float], attempts_left: int) -> Optional[float]:
+    if remaining is None:
+        return route.attempt_timeout_seconds
+    if route.attempt_timeout_seconds is not None:
+        return min(route.attempt_timeout_seconds, remaining)
+    return remaining * CHAINED_ATTEMPT_SHARE if attempts_left > 1 else remaining
+
+
+def record_route_attempt(route: ModelRoute, model: str, status: str, latency_ms: float, usage: Dict[str, int]):
+    key = f"{route.node}:{route.rule}:{model}"
+    with route_metrics_lock:
+        entry = route_metrics.setdefault(key, {
+            "node": route.node,
+            "rule": route.rule,
+            "model": model,
+            "calls": 0,
+            "errors": 0,
+            "total_latency_ms": 0.0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+        })
+        entry["calls"] += 1
+        entry["errors"] += status != "ok"
+        entry["total_latency_ms"] += latency_ms
+        entry["input_tokens"] += usage.get("input_tokens", 0)
+        entry["output_tokens"] += usage.get("output_tokens", 0)
+
+
+def route_metrics_snapshot() -> List[Dict[str, Any]]:
+    with route_metrics_lock:
+        entries = [dict(entry) for entry in route_metrics.values()]
+    for entry in entries:
+        entry["avg_latency_ms"] = round(entry["total_latency_ms"] / entry["calls"], 1) if entry["calls"] else 0.0
+        entry["total_latency_ms"] = round(entry["total_latency_ms"], 1)
+    return sorted(entries, key=lambda entry: (entry["node"], entry["rule"], entry["model"]))
+
+
+def invoke_route(
+    route: ModelRoute,
+    build_runnable: Callable[[str, Optional[float]], Any],
+    payload: Any,
+    timeout_seconds: Optional[float] = None,
+) -> RouteResult:
+    """Invoke each model in the route's chain until one succeeds within the time left.
+
+    ``build_runnable`` receives the model name and the request timeout, so callers keep
+    control of prompts and structured output while the route picks models. Retries, hedging
+    and circuit breaking for each model happen in call_with_resilience.
+    """
+    started_at = time.perf_counter()
+    attempts: List[Dict[str, Any]] = []
+    for index, model in enumerate(route.models):
+        remaining = None
+        if timeout_seconds is not None:
+            remaining = timeout_seconds - (time.perf_counter() - started_at)
+            if remaining <= 0:
+                break
+
+        attempt_started_at = time.perf_counter()
+        try:
+            with get_usage_metadata_callback() as usage_callback:
+                value = call_with_resilience(
+                    route.node,
+                    model,
+                    lambda request_timeout, model=model: build_runnable(model, request_timeout).invoke(payload),
+                    attempt_timeout(route, remaining, len(route.models) - index),
+                )
+        except Exception as exc:
+            latency_ms = round((time.perf_counter() - attempt_started_at) * 1000, 1)
+            attempts.append({"model": model, "status": "error", "latency_ms": latency_ms, "error": type(exc).__name__})
+            record_route_attempt(route, model, "error", latency_ms, {})
+            continue
+
+        latency_ms = round((time.perf_counter() - attempt_started_at) * 1000, 1)
+        usage = summarize_usage_callback(usage_callback.usage_metadata)
+        attempts.append({"model": model, "status": "ok", "latency_ms": latency_ms, **usage})
+        record_route_attempt(route, model, "ok", latency_ms, usage)
+        return RouteResult(value=value, model=model, usage_metadata=usage_callback.usage_metadata, attempts=attempts)
+
+    raise RouteExhaustedError(route, attempts)
+
+
+def describe_route(route: ModelRoute, result: Optional[RouteResult] = None, error: Optional[BaseException] = None) -> Dict[str, Any]:
+    attempts = result.attempts if result else getattr(error, "attempts", [])
+    return {
+        "rule": route.rule,
+        "models": route.models,
+        "model": result.model if result else None,
+        "attempts": attempts,
+    }
@@ -1,16 +1,36 @@
+import copy
+import hashlib
+import io
+import json
 import os
-import tempfile
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
 from pptx import Presentation
 from pptx.dml.color import RGBColor
-from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE, MSO_CONNECTOR
+from pptx.enum.shapes import MSO_AUTO_SHAPE_TYPE, MSO_CONNECTOR, PP_PLACEHOLDER
 from pptx.enum.text import MSO_ANCHOR, MSO_AUTO_SIZE, PP_ALIGN
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.shapes.autoshape import AutoShapeType, Shape
 from pptx.util import Inches, Pt
 
+from .text_fit import fit_font_sizes
+
+# Part of every render cache key; bump it whenever a change alters the rendered output.
+RENDERER_VERSION = "3"
+SLIDE_WIDTH = Inches(13.333)
+SLIDE_HEIGHT = Inches(7.5)
+SLIDE_FRAGMENT_CACHE_SIZE = int(os.environ.get("OMNIPITCH_SLIDE_FRAGMENT_CACHE_SIZE", 2048))
 
-@dataclass
+
+@dataclass(frozen=True)
 class ThemeSpec:
     name: str
     background: RGBColor
@@ -30,11 +50,10 @@ def rgb(hex_value: str) -> RGBColor:
     return RGBColor(int(hex_value[0:2], 16), int(hex_value[2:4], 16), int(hex_value[4:6], 16))
 
 
-def resolve_theme(theme_vibe: str) -> ThemeSpec:
-    vibe = (theme_vibe or "").lower()
-
-    if "google" in vibe or "startup" in vibe or "visionary" in vibe or "bold" in vibe:
-        return ThemeSpec(
+THEME_REGISTRY: Dict[str, ThemeSpec] = {
+    theme.name: theme
+    for theme in (
+        ThemeSpec(
             name="Catalyst",
             background=rgb("#F7F9FC"),
             surface=rgb("#FFFFFF"),
@@ -44,10 +63,8 @@ def resolve_theme(theme_vibe: str) -> ThemeSpec:
             text=rgb("#0F172A"),
             muted=rgb("#64748B"),
             inverse_text=rgb("#FFFFFF"),
-        )
-
-    if "apple" in vibe or "minimal" in vibe or "clean" in vibe or "story" in vibe:
-        return ThemeSpec(
+        ),
+        ThemeSpec(
             name="Monochrome",
             background=rgb("#F2F2F0"),
             surface=rgb("#FFFFFF"),
@@ -57,10 +74,8 @@ def resolve_theme(theme_vibe: str) -> ThemeSpec:
             text=rgb("#111111"),
             muted=rgb("#6B7280"),
             inverse_text=rgb("#FFFFFF"),
-        )
-
-    if "cyber" in vibe or "hacker" in vibe or "matrix" in vibe or "technical" in vibe or "deep" in vibe:
-        return ThemeSpec(
+        ),
+        ThemeSpec(
             name="Signal Grid",
             background=rgb("#08111F"),
             surface=rgb("#101A30"),
@@ -70,19 +85,42 @@ def resolve_theme(theme_vibe: str) -> ThemeSpec:
             text=rgb("#EAFBFF"),
             muted=rgb("#93A4BF"),
             inverse_text=rgb("#08111F"),
-        )
-
-    return ThemeSpec(
-        name="Executive Blueprint",
-        background=rgb("#0F172A"),
-        surface=rgb("#111C33"),
-        surface_alt=rgb("#1E293B"),
-        accent=rgb("#38BDF8"),
-        accent_alt=rgb("#F59E0B"),
-        text=rgb("#F8FAFC"),
-        muted=rgb("#94A3B8"),
-        inverse_text=rgb("#0F172A"),
+        ),
+        ThemeSpec(
+            name="Executive Blueprint",
+            background=rgb("#0F172A"),
+            surface=rgb("#111C33"),
+            surface_alt=rgb("#1E293B"),
+            accent=rgb("#38BDF8"),
+            accent_alt=rgb("#F59E0B"),
+            text=rgb("#F8FAFC"),
+            muted=rgb("#94A3B8"),
+            inverse_text=rgb("#0F172A"),
+        ),
     )
+}
+
+# Checked in order; the first theme with a keyword in the vibe wins.
+THEME_KEYWORDS = (
+    ("Catalyst", ("google", "startup", "visionary", "bold")),
+    ("Monochrome", ("apple", "minimal", "clean", "story")),
+    ("Signal Grid", ("cyber", "hacker", "matrix", "technical", "deep")),
+)
+DEFAULT_THEME = "Executive Blueprint"
+
+
+THEME_NAMES = {name.lower(): name for name in THEME_REGISTRY}
+
+
+@lru_cache(maxsize=512)
+def resolve_theme(theme_vibe: str) -> ThemeSpec:
+    vibe = (theme_vibe or "").lower()
+    if vibe.strip() in THEME_NAMES:
+        return THEME_REGISTRY[THEME_NAMES[vibe.strip()]]
+    for name, keywords in THEME_KEYWORDS:
+        if any(keyword in vibe for keyword in keywords):
+            return THEME_REGISTRY[name]
+    return THEME_REGISTRY[DEFAULT_THEME]
 
 
 def accent_for_tone(theme: ThemeSpec, tone: Optional[str] = None) -> RGBColor:
@@ -105,6 +143,82 @@ def ensure_min_length(length, minimum=Inches(0.08)):
     return length if length > minimum else minimum
 
 
+# The shapes below are emitted as XML in one go rather than built through python-pptx's
+# proxies, which cost an attribute set (and often an XPath lookup) per margin, run and font
+# property. The markup is exactly what the proxy calls used to produce, and
+# scripts/bench_shape_builder.py checks that against the object-model path.
+TEXTBOX_SP_XML = (
+    '<p:sp {nsdecls}><p:nvSpPr><p:cNvPr id="{id}" name="TextBox {index}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square" anchor="t" lIns="0" rIns="0" tIns="0" bIns="0"><a:noAutofit/></a:bodyPr>'
+    "<a:lstStyle/>{paragraphs}</p:txBody></p:sp>"
+)
+CARD_SP_XML = (
+    '<p:sp {nsdecls}><p:nvSpPr><p:cNvPr id="{id}" name="Rounded Rectangle {index}"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{left}" y="{top}"/><a:ext cx="{width}" cy="{height}"/></a:xfrm>'
+    '<a:prstGeom prst="roundRect"><a:avLst/></a:prstGeom><a:solidFill><a:srgbClr val="{fill}"/></a:solidFill>'
+    '<a:ln><a:solidFill><a:srgbClr val="{line}"/></a:solidFill></a:ln></p:spPr>'
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef><a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef><a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="t" lIns="{inset}" tIns="{inset}" rIns="{inset}" bIns="{inset}" wrap="square"/>'
+    "<a:lstStyle/>{paragraphs}</p:txBody></p:sp>"
+)
+SHAPE_NSDECLS = nsdecls("p", "a", "r")
+BULLET_FONT_SIZE = 18
+LINE_BREAK_PATTERN = re.compile("\n|\v")
+CONTROL_CHAR_PATTERN = re.compile("([\x00-\x08\x0B-\x1F])")
+
+
+def run_text_xml(text: str, run_properties: str = "") -> str:
+    """Runs separated by line breaks, as python-pptx's ``paragraph.text`` setter lays them out."""
+    runs = []
+    for part in LINE_BREAK_PATTERN.split(text):
+        text_value = escape(CONTROL_CHAR_PATTERN.sub(lambda match: "_x%04X_" % ord(match.group(1)), part))
+        runs.append(f"<a:r>{run_properties}<a:t>{text_value}</a:t></a:r>" if part else "")
+    return "<a:br/>".join(runs)
+
+
+def styled_paragraph_xml(
+    text: str,
+    theme: ThemeSpec,
+    font_size: int,
+    color: RGBColor = None,
+    bold: bool = False,
+    font_name: str = None,
+    align=PP_ALIGN.LEFT,
+    space_after: Optional[int] = None,
+) -> str:
+    """One ``<a:p>`` with ``text`` styled as style_paragraph would, plus an optional space after in points."""
+    if not LINE_BREAK_PATTERN.sub("", text):
+        # style_paragraph gives a paragraph without runs a single space so the styling sticks.
+        text = text or " "
+    run_properties = (
+        f'<a:rPr sz="{font_size * 100}" b="{1 if bold else 0}"><a:solidFill><a:srgbClr val="{color or theme.text}"/></a:solidFill>'
+        f"<a:latin typeface={quoteattr(font_name or theme.body_font)}/></a:rPr>"
+    )
+    spacing = f'<a:spcAft><a:spcPts val="{space_after * 100}"/></a:spcAft>' if space_after is not None else ""
+    paragraph_properties = f'<a:pPr algn="{align.xml_value}">{spacing}</a:pPr>' if spacing else f'<a:pPr algn="{align.xml_value}"/>'
+    return f"<a:p>{paragraph_properties}{run_text_xml(text, run_properties)}</a:p>"
+
+
+def append_shape_xml(slide, template: str, left, top, width, height, paragraphs: List[str], **values):
+    shape_id = slide.shapes._next_shape_id
+    sp = parse_xml(template.format(
+        nsdecls=SHAPE_NSDECLS,
+        id=shape_id,
+        index=shape_id - 1,
+        left=int(left),
+        top=int(top),
+        width=int(width),
+        height=int(height),
+        paragraphs="".join(paragraphs),
+        **values,
+    ))
+    slide.shapes._spTree.insert_element_before(sp, "p:extLst")
+    return Shape(sp, slide.shapes)
+
+
 def add_text_box(
     slide,
     left,
@@ -121,114 +235,93 @@ def add_text_box(
 ):
     width = ensure_min_length(width)
     height = ensure_min_length(height)
-    text_box = slide.shapes.add_textbox(left, top, width, height)
-    text_frame = text_box.text_frame
-    text_frame.word_wrap = True
-    text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-    text_frame.vertical_anchor = MSO_ANCHOR.TOP
-    text_frame.margin_left = 0
-    text_frame.margin_right = 0
-    text_frame.margin_top = 0
-    text_frame.margin_bottom = 0
-    text_frame.clear()
-
-    paragraph = text_frame.paragraphs[0]
-    paragraph.text = text
-    style_paragraph(paragraph, theme, font_size, color=color, bold=bold, font_name=font_name, align=align)
-    return text_box
+    (font_size,) = fit_font_sizes(((text, bold, font_size, 0),), width, height)
+    return append_shape_xml(
+        slide,
+        TEXTBOX_SP_XML,
+        left,
+        top,
+        width,
+        height,
+        [styled_paragraph_xml(text, theme, font_size, color=color, bold=bold, font_name=font_name, align=align)],
+    )
 
 
 def add_body_bullets(slide, left, top, width, height, bullets: List[str], theme: ThemeSpec, font_size: int = 14):
     if not bullets:
         return
 
+    # Bullets have always been written as bare runs: prefixing the bullet replaced the styled
+    # runs, so they take their formatting from the theme's defaults. Only the fitted size is set.
     width = ensure_min_length(width)
     height = ensure_min_length(height)
-    text_box = slide.shapes.add_textbox(left, top, width, height)
-    text_frame = text_box.text_frame
-    text_frame.word_wrap = True
-    text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-    text_frame.vertical_anchor = MSO_ANCHOR.TOP
-    text_frame.margin_left = 0
-    text_frame.margin_right = 0
-    text_frame.margin_top = 0
-    text_frame.margin_bottom = 0
-    text_frame.clear()
-
-    for index, bullet in enumerate(bullets):
-        paragraph = text_frame.paragraphs[0] if index == 0 else text_frame.add_paragraph()
-        paragraph.text = bullet
-        paragraph.level = 0
-        paragraph.space_after = Pt(10)
-        style_paragraph(paragraph, theme, font_size, color=theme.text)
-        paragraph.text = f"• {paragraph.text}"
+    texts = ["• " + (bullet or " ") for bullet in bullets]
+    sizes = fit_font_sizes(tuple((text, False, BULLET_FONT_SIZE, 10) for text in texts), width, height)
+    paragraphs = []
+    for text, size in zip(texts, sizes):
+        runs = run_text_xml(text, f'<a:rPr sz="{size * 100}"/>')
+        paragraphs.append(f'<a:p><a:pPr algn="l"><a:spcAft><a:spcPts val="1000"/></a:spcAft></a:pPr>{runs}</a:p>')
+    append_shape_xml(slide, TEXTBOX_SP_XML, left, top, width, height, paragraphs)
 
 
 def add_card(slide, left, top, width, height, title: str, body: str, theme: ThemeSpec, accent: RGBColor = None, compact: bool = False):
-    card = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, left, top, width, height)
-    card.fill.solid()
-    card.fill.fore_color.rgb = theme.surface
-    card.fill.transparency = 0.05 if theme.background != theme.surface else 0
-    card.line.color.rgb = accent or theme.accent
-    card.line.transparency = 0.45
-
-    tf = card.text_frame
-    tf.clear()
-    inset = Inches(0.16 if compact else 0.22)
-    tf.margin_left = inset
-    tf.margin_top = inset
-    tf.margin_right = inset
-    tf.margin_bottom = inset
-    tf.vertical_anchor = MSO_ANCHOR.TOP
-    tf.word_wrap = True
-
-    p_title = tf.paragraphs[0]
-    p_title.text = title
-    style_paragraph(p_title, theme, 10 if compact else 14, color=accent or theme.accent, bold=True)
-    p_title.space_after = Pt(4 if compact else 8)
-
-    p_body = tf.add_paragraph()
-    p_body.text = body
-    style_paragraph(p_body, theme, 11 if compact else 14, color=theme.text, font_name=theme.body_font)
-
-    return card
+    inset = int(Inches(0.16 if compact else 0.22))
+    title_spacing = 4 if compact else 8
+    title_size, body_size = fit_font_sizes(
+        (
+            (title, True, 10 if compact else 14, title_spacing),
+            (body, False, 11 if compact else 14, 0),
+        ),
+        width - 2 * inset,
+        height - 2 * inset,
+    )
+    return append_shape_xml(
+        slide,
+        CARD_SP_XML,
+        left,
+        top,
+        width,
+        height,
+        [
+            styled_paragraph_xml(title, theme, title_size, color=accent or theme.accent, bold=True, space_after=title_spacing),
+            styled_paragraph_xml(body, theme, body_size, color=theme.text, font_name=theme.body_font),
+        ],
+        fill=theme.surface,
+        line=accent or theme.accent,
+        inset=inset,
+    )
 
 
 def add_metric_card(slide, left, top, width, height, metric: Dict[str, str], theme: ThemeSpec, accent: RGBColor = None, compact: bool = False):
     accent_color = accent or theme.accent
-    card = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, left, top, width, height)
-    card.fill.solid()
-    card.fill.fore_color.rgb = theme.surface
-    card.line.color.rgb = accent_color
-    card.line.transparency = 0.35
-
-    tf = card.text_frame
-    tf.clear()
-    inset = Inches(0.16 if compact else 0.22)
-    tf.margin_left = inset
-    tf.margin_top = inset
-    tf.margin_right = inset
-    tf.margin_bottom = inset
-    tf.vertical_anchor = MSO_ANCHOR.TOP
-    tf.word_wrap = True
-
-    p_label = tf.paragraphs[0]
-    p_label.text = metric.get("label", "Metric")
-    style_paragraph(p_label, theme, 10 if compact else 12, color=theme.muted, bold=True)
-    p_label.space_after = Pt(2 if compact else 6)
-
-    p_value = tf.add_paragraph()
-    p_value.text = metric.get("value", "Signal")
-    style_paragraph(p_value, theme, 18 if compact else 30, color=accent_color, bold=True, font_name=theme.title_font)
-    p_value.space_after = Pt(2 if compact else 6)
-
-    detail = metric.get("detail", "")
+    inset = int(Inches(0.16 if compact else 0.22))
+    spacing = 2 if compact else 6
+    label, value, detail = metric.get("label", "Metric"), metric.get("value", "Signal"), metric.get("detail", "")
+    fit = [
+        (label, True, 10 if compact else 12, spacing),
+        (value, True, 18 if compact else 30, spacing),
+    ]
     if detail:
-        p_detail = tf.add_paragraph()
-        p_detail.text = detail
-        style_paragraph(p_detail, theme, 10 if compact else 13, color=theme.text)
-
-    return card
+        fit.append((detail, False, 10 if compact else 13, 0))
+    sizes = fit_font_sizes(tuple(fit), width - 2 * inset, height - 2 * inset)
+    paragraphs = [
+        styled_paragraph_xml(label, theme, sizes[0], color=theme.muted, bold=True, space_after=spacing),
+        styled_paragraph_xml(value, theme, sizes[1], color=accent_color, bold=True, font_name=theme.title_font, space_after=spacing),
+    ]
+    if detail:
+        paragraphs.append(styled_paragraph_xml(detail, theme, sizes[2], color=theme.text))
+    return append_shape_xml(
+        slide,
+        CARD_SP_XML,
+        left,
+        top,
+        width,
+        height,
+        paragraphs,
+        fill=theme.surface,
+        line=accent_color,
+        inset=inset,
+    )
 
 
 def apply_background(slide, width, height, theme: ThemeSpec):
@@ -250,15 +343,19 @@ def apply_background(slide, width, height, theme: ThemeSpec):
     orb_two.line.fill.background()
 
 
+def add_accent_rule(slide, theme: ThemeSpec):
+    accent_rule = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, Inches(0.7), Inches(2.42), Inches(1.15), Inches(0.06))
+    accent_rule.fill.solid()
+    accent_rule.fill.fore_color.rgb = theme.accent
+    accent_rule.line.fill.background()
+
+
 def add_slide_chrome(slide, slide_data: Dict[str, Any], theme: ThemeSpec, width, height, slide_number: int):
+    # The background and accent rule come from the themed content layout.
     add_text_box(slide, Inches(0.7), Inches(0.45), Inches(2.6), Inches(0.28), slide_data.get("section_label", "Strategy").upper(), theme, 10, color=theme.accent, bold=True)
     add_text_box(slide, Inches(0.7), Inches(0.78), Inches(10), Inches(0.48), slide_data.get("title", "Executive Insight"), theme, 13, color=theme.muted, bold=True)
     add_text_box(slide, Inches(0.7), Inches(1.18), Inches(8.6), Inches(0.74), slide_data.get("headline", slide_data.get("title", "")), theme, 26, color=theme.text, bold=True, font_name=theme.title_font)
     add_text_box(slide, Inches(0.7), Inches(1.95), Inches(8.8), Inches(0.56), slide_data.get("subheadline", ""), theme, 14, color=theme.muted)
-    accent_rule = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, Inches(0.7), Inches(2.42), Inches(1.15), Inches(0.06))
-    accent_rule.fill.solid()
-    accent_rule.fill.fore_color.rgb = theme.accent
-    accent_rule.line.fill.background()
     footer = add_text_box(slide, width - Inches(1.2), height - Inches(0.45), Inches(0.6), Inches(0.18), f"{slide_number}", theme, 10, color=theme.muted, align=PP_ALIGN.RIGHT)
     footer.text_frame.vertical_anchor = MSO_ANCHOR.BOTTOM
 
@@ -467,6 +564,9 @@ def render_process_flow(slide, slide_data: Dict[str, Any], theme: ThemeSpec):
     step_height = Inches(1.25)
     gap = Inches(0.25)
     line_y = Inches(4.02)
+    # The step body sits below the badge, inset from the card's other edges.
+    step_inset = Inches(0.16)
+    step_body_top = Inches(0.65)
 
     connector = slide.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, Inches(1.6), line_y, Inches(8.9), line_y)
     connector.line.color.rgb = theme.accent
@@ -500,16 +600,21 @@ def render_process_flow(slide, slide_data: Dict[str, Any], theme: ThemeSpec):
 
         tf = card.text_frame
         tf.clear()
-        tf.margin_left = Inches(0.16)
-        tf.margin_top = Inches(0.65)
-        tf.margin_right = Inches(0.16)
-        tf.margin_bottom = Inches(0.16)
+        tf.margin_left = step_inset
+        tf.margin_top = step_body_top
+        tf.margin_right = step_inset
+        tf.margin_bottom = step_inset
         tf.vertical_anchor = MSO_ANCHOR.TOP
         tf.word_wrap = True
 
         p = tf.paragraphs[0]
         p.text = step.get("body", "")
-        style_paragraph(p, theme, 11, color=theme.text)
+        (body_size,) = fit_font_sizes(
+            ((p.text, False, 11, 0),),
+            step_width - 2 * step_inset,
+            step_height - step_body_top - step_inset,
+        )
+        style_paragraph(p, theme, body_size, color=theme.text)
 
     supporting_card = get_supporting_card(
         slide_data,
@@ -614,7 +719,6 @@ def render_closing(slide, slide_data: Dict[str, Any], theme: ThemeSpec):
 
 
 def render_content_slide(slide, slide_data: Dict[str, Any], theme: ThemeSpec, width, height, slide_number: int):
-    apply_background(slide, width, height, theme)
     add_slide_chrome(slide, slide_data, theme, width, height, slide_number)
 
     layout = slide_data.get("layout_style", "insight-grid")
@@ -634,12 +738,7 @@ def render_content_slide(slide, slide_data: Dict[str, Any], theme: ThemeSpec, wi
         render_insight_grid(slide, slide_data, theme)
 
 
-def render_cover_slide(prs: Presentation, presentation_json: Dict[str, Any], theme: ThemeSpec):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    width = prs.slide_width
-    height = prs.slide_height
-    apply_background(slide, width, height, theme)
-
+def render_cover_slide(slide, presentation_json: Dict[str, Any], theme: ThemeSpec, width, height):
     panel = slide.shapes.add_shape(MSO_AUTO_SHAPE_TYPE.ROUNDED_RECTANGLE, Inches(0.7), Inches(0.85), Inches(5.3), Inches(5.7))
     panel.fill.solid()
     panel.fill.fore_color.rgb = theme.surface
@@ -663,12 +762,7 @@ def render_cover_slide(prs: Presentation, presentation_json: Dict[str, Any], the
         add_card(slide, Inches(6.4), Inches(3.55), Inches(3.6), Inches(2.0), highlight_cards[1].get("title", "Impact"), highlight_cards[1].get("body", ""), theme, accent=accent_for_tone(theme, highlight_cards[1].get("tone")))
 
 
-def render_closing_slide(prs: Presentation, presentation_json: Dict[str, Any], theme: ThemeSpec):
-    slide = prs.slides.add_slide(prs.slide_layouts[6])
-    width = prs.slide_width
-    height = prs.slide_height
-    apply_background(slide, width, height, theme)
-
+def render_closing_slide(slide, presentation_json: Dict[str, Any], theme: ThemeSpec, width, height):
     closing_payload = presentation_json.get("closing_payload") or {}
     add_text_box(slide, Inches(1.0), Inches(2.1), Inches(8.8), Inches(0.4), (closing_payload.get("eyebrow") or "NEXT MOVE").upper(), theme, 12, color=theme.accent, bold=True)
     add_text_box(slide, Inches(1.0), Inches(2.7), Inches(8.8), Inches(1.0), closing_payload.get("headline", "Turn the strategy into execution."), theme, 36, color=theme.text, bold=True, font_name=theme.title_font, align=PP_ALIGN.CENTER)
@@ -693,13 +787,219 @@ def render_closing_slide(prs: Presentation, presentation_json: Dict[str, Any], t
     style_paragraph(p, theme, 12, color=theme.inverse_text, bold=True, align=PP_ALIGN.CENTER)
 
 
-def build_pptx(presentation_json: Dict[str, Any], org_name: str = "Enterprise", theme_vibe: str = "Corporate") -> str:
+def theme_fingerprint(theme: ThemeSpec) -> Dict[str, str]:
+    return {spec.name: str(getattr(theme, spec.name)) for spec in fields(theme)}
+
+
+class SlideFragmentCache:
+    """LRU of serialized slide part XML, so unchanged slides are copied instead of rebuilt.
+
+    Slides only reference their layout (no pictures or hyperlinks), so a part's XML is
+    self-contained and can be dropped into any deck built from the same template.
+    """
+
+    def __init__(self, max_entries: int = SLIDE_FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            xml = self.entries.get(key)
+            if xml is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return xml
+
+    def put(self, key: str, xml: bytes):
+        with self.lock:
+            self.entries[key] = xml
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(xml) for xml in self.entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+slide_fragment_cache = SlideFragmentCache()
+
+
+COLOR_FIELDS = [spec.name for spec in fields(ThemeSpec) if spec.type is RGBColor]
+# Stand-in colors for theme-neutral body slides; each is swapped for the real theme's color.
+NEUTRAL_COLORS = {field: RGBColor(0xFE, index, 0xC0) for index, field in enumerate(COLOR_FIELDS, start=1)}
+NEUTRAL_COLOR_PATTERN = re.compile(rb'<a:srgbClr val="FE0([1-9])C0"')
+
+
+@lru_cache(maxsize=64)
+def neutral_theme(theme: ThemeSpec) -> ThemeSpec:
+    """The theme with its colors replaced by stand-ins, so body slides can be built once for every palette."""
+    return ThemeSpec(name="Neutral", **NEUTRAL_COLORS, title_font=theme.title_font, body_font=theme.body_font)
+
+
+def recolor_fragment(xml: bytes, theme: ThemeSpec) -> bytes:
+    colors = [str(getattr(theme, field)).encode("ascii") for field in COLOR_FIELDS]
+    return NEUTRAL_COLOR_PATTERN.sub(lambda match: b'<a:srgbClr val="' + colors[int(match.group(1)) - 1] + b'"', xml)
+
+
+def slide_fragment_key(kind: str, data: Dict[str, Any], theme: ThemeSpec, slide_number: int, width, height) -> str:
+    canonical = json.dumps(
+        {
+            "renderer": RENDERER_VERSION,
+            "kind": kind,
+            "data": data,
+            "theme": theme_fingerprint(theme),
+            "slide_number": slide_number,
+            "size": [int(width), int(height)],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LayoutCanvas:
+    """Exposes a slide layout through the ``slide.shapes.add_shape`` calls the drawing helpers use."""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.shapes = self
+
+    def add_shape(self, autoshape_type_id, left, top, width, height):
+        sp_tree = self.layout.shapes._spTree
+        shape_id = sp_tree.max_shape_id + 1
+        sp = sp_tree.add_autoshape(shape_id, f"Theme Shape {shape_id}", AutoShapeType(autoshape_type_id).prst, left, top, width, height)
+        return Shape(sp, self.layout.shapes)
+
+
+# Indexes into the default template's layouts, repurposed as themed layouts.
+BACKGROUND_LAYOUT = 6  # Blank: background only, used by the cover and closing slides
+CONTENT_LAYOUT = 5  # Title Only with its title removed: background plus the accent rule
+
+
+def build_theme_template(theme: ThemeSpec) -> Presentation:
+    """A template with the theme's background and static chrome baked into its layouts."""
     prs = Presentation()
-    prs.slide_width = Inches(13.333)
-    prs.slide_height = Inches(7.5)
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
     prs.core_properties.author = "OmniPitchAI"
     prs.core_properties.company = "Aisynch Labs"
+
+    content_layout = prs.slide_layouts[CONTENT_LAYOUT]
+    for placeholder in list(content_layout.placeholders):
+        if placeholder.placeholder_format.type == PP_PLACEHOLDER.TITLE:
+            placeholder.element.getparent().remove(placeholder.element)
+
+    for index, name in ((BACKGROUND_LAYOUT, "Background"), (CONTENT_LAYOUT, "Content")):
+        layout = prs.slide_layouts[index]
+        layout.element.cSld.name = f"OmniPitch {theme.name} {name}"
+        apply_background(LayoutCanvas(layout), prs.slide_width, prs.slide_height, theme)
+    add_accent_rule(LayoutCanvas(content_layout), theme)
+    return prs
+
+
+theme_templates: Dict[str, Presentation] = {}
+theme_templates_lock = threading.Lock()
+
+
+def new_presentation(theme: ThemeSpec) -> Presentation:
+    # Copying a parsed template is cheaper than opening the default package from disk again.
+    # Cached templates are never modified, so only the lookup and insert need the lock.
+    with theme_templates_lock:
+        template = theme_templates.get(theme.name)
+    if template is None:
+        built = build_theme_template(theme)
+        with theme_templates_lock:
+            template = theme_templates.setdefault(theme.name, built)
+    return copy.deepcopy(template)
+
+
+def add_cached_slide(prs: Presentation, layout_index: int, key: str, render: Callable[[Any], None], recolor: Optional[ThemeSpec] = None):
+    """Add a slide from the fragment cache, rendering and caching it on a miss.
+
+    With ``recolor``, the cached fragment is theme-neutral and gets that theme's colors as it
+    is copied in, so one fragment serves every theme.
+    """
+    slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+    xml = slide_fragment_cache.get(key)
+    if xml is None:
+        render(slide)
+        xml = etree.tostring(slide.part._element)
+        slide_fragment_cache.put(key, xml)
+        if recolor is None:
+            return
+    slide.part._element = parse_xml(recolor_fragment(xml, recolor) if recolor else xml)
+
+
+def content_fragment_key(slide_data: Dict[str, Any], theme: ThemeSpec, slide_number: int) -> str:
+    return slide_fragment_key("content", slide_data, neutral_theme(theme), slide_number, SLIDE_WIDTH, SLIDE_HEIGHT)
+
+
+def render_content_fragment(slide, slide_data: Dict[str, Any], theme: ThemeSpec, slide_number: int):
+    render_content_slide(slide, slide_data, neutral_theme(theme), SLIDE_WIDTH, SLIDE_HEIGHT, slide_number)
+
+
+FragmentJob = Tuple[str, Dict[str, Any], str, int]
+
+
+def shared_fragment_jobs(requests: List[Tuple[Dict[str, Any], str, str]]) -> List[FragmentJob]:
+    """Body slides that appear in more than one of the (presentation_json, org_name, theme_vibe) requests.
+
+    Theme variants of one deck share every body slide, so building these once and handing
+    the fragments to each variant's render leaves only recoloring and packaging per theme.
+    """
+    jobs: Dict[str, FragmentJob] = {}
+    seen = set()
+    for presentation_json, _org_name, theme_vibe in requests:
+        theme = resolve_theme(presentation_json.get("theme_vibe") or theme_vibe)
+        for number, slide_data in enumerate(presentation_json.get("slides", []), start=2):
+            key = content_fragment_key(slide_data, theme, number)
+            if key in seen:
+                jobs.setdefault(key, (key, slide_data, theme.name, number))
+            seen.add(key)
+    return list(jobs.values())
+
+
+def render_fragments(jobs: List[FragmentJob]) -> Dict[str, bytes]:
+    """Build the theme-neutral fragments for ``jobs`` (or take them from the cache) and return them by key."""
+    fragments = {}
+    scratch = None
+    for key, slide_data, theme_name, number in jobs:
+        xml = slide_fragment_cache.get(key)
+        if xml is None:
+            theme = THEME_REGISTRY.get(theme_name) or resolve_theme(theme_name)
+            scratch = scratch or new_presentation(theme)
+            slide = scratch.slides.add_slide(scratch.slide_layouts[CONTENT_LAYOUT])
+            render_content_fragment(slide, slide_data, theme, number)
+            xml = etree.tostring(slide.part._element)
+            slide_fragment_cache.put(key, xml)
+        fragments[key] = xml
+    return fragments
+
+
+def seed_fragments(fragments: Dict[str, bytes]):
+    for key, xml in fragments.items():
+        slide_fragment_cache.put(key, xml)
+
+
+def build_presentation(presentation_json: Dict[str, Any], org_name: str = "Enterprise", theme_vibe: str = "Corporate") -> Presentation:
     theme = resolve_theme(presentation_json.get("theme_vibe") or theme_vibe)
+    prs = new_presentation(theme)
 
     if not presentation_json.get("deck_title"):
         presentation_json = {
@@ -711,15 +1011,35 @@ def build_pptx(presentation_json: Dict[str, Any], org_name: str = "Enterprise",
     prs.core_properties.title = presentation_json.get("deck_title", org_name or "Executive Strategy Deck")
     prs.core_properties.subject = presentation_json.get("deck_subtitle", "Executive narrative deck")
 
-    render_cover_slide(prs, presentation_json, theme)
+    width, height = prs.slide_width, prs.slide_height
+    deck_fields = {key: value for key, value in presentation_json.items() if key != "slides"}
+    slides = presentation_json.get("slides", [])
 
-    for index, slide_data in enumerate(presentation_json.get("slides", []), start=1):
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        render_content_slide(slide, slide_data, theme, prs.slide_width, prs.slide_height, index + 1)
+    add_cached_slide(
+        prs,
+        BACKGROUND_LAYOUT,
+        slide_fragment_key("cover", deck_fields, theme, 1, width, height),
+        lambda slide: render_cover_slide(slide, presentation_json, theme, width, height),
+    )
+    for index, slide_data in enumerate(slides, start=1):
+        add_cached_slide(
+            prs,
+            CONTENT_LAYOUT,
+            content_fragment_key(slide_data, theme, index + 1),
+            lambda slide, slide_data=slide_data, number=index + 1: render_content_fragment(slide, slide_data, theme, number),
+            recolor=theme,
+        )
+    add_cached_slide(
+        prs,
+        BACKGROUND_LAYOUT,
+        slide_fragment_key("closing", deck_fields, theme, len(slides) + 2, width, height),
+        lambda slide: render_closing_slide(slide, presentation_json, theme, width, height),
+    )
+    return prs
 
-    render_closing_slide(prs, presentation_json, theme)
 
-    fd, path = tempfile.mkstemp(prefix="omnipitch_deck_", suffix=".pptx")
-    os.close(fd)
-    prs.save(path)
-    return path
+def render_pptx(presentation_json: Dict[str, Any], org_name: str = "Enterprise", theme_vibe: str = "Corporate") -> bytes:
+    """Render the deck into memory; callers hand the bytes to the artifact store rather than disk."""
+    buffer = io.BytesIO()
+    build_presentation(presentation_json, org_name, theme_vibe).save(buffer)
+    return buffer.getvalue()
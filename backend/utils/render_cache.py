@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pptx_generator import RENDERER_VERSION, resolve_theme, slide_fragment_cache, theme_fingerprint
+from .render_service import RenderRequest, render_service
+from .text_fit import text_fit_snapshot
+
+RENDER_CACHE_MEMORY_BYTES = int(float(os.environ.get("OMNIPITCH_RENDER_CACHE_MEMORY_MB", 64)) * 1024 * 1024)
+RENDER_CACHE_DISK_BYTES = int(float(os.environ.get("OMNIPITCH_RENDER_CACHE_DISK_MB", 512)) * 1024 * 1024)
+# Shared directory for the disk tier; several workers may point at the same one. "off" disables it.
+RENDER_CACHE_DIR = os.environ.get("OMNIPITCH_RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "omnipitch_render_cache"))
+
+
+def render_key(presentation_json: Dict[str, Any], org_name: str, theme_vibe: str) -> str:
+    """Canonical hash of everything that decides the rendered bytes."""
+    theme = resolve_theme(presentation_json.get("theme_vibe") or theme_vibe)
+    canonical = json.dumps(
+        {
+            "renderer": RENDERER_VERSION,
+            "theme": theme_fingerprint(theme),
+            "org_name": org_name or "",
+            "deck": presentation_json,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Two-tier LRU of rendered decks: process memory first, then a bounded disk directory.
+
+    Disk writes happen on a background thread so a miss only pays for the render itself.
+    Because identical inputs return the very same bytes, the content-addressed artifact
+    store also dedupes them across jobs.
+    """
+
+    def __init__(self, memory_bytes: int = RENDER_CACHE_MEMORY_BYTES, disk_bytes: int = RENDER_CACHE_DISK_BYTES, directory: str = RENDER_CACHE_DIR):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = None if directory.strip().lower() in {"", "off", "none"} else directory
+        self.memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.memory_used = 0
+        self.disk: "OrderedDict[str, int]" = OrderedDict()
+        self.disk_used = 0
+        self.lock = threading.Lock()
+        self.disk_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="omnipitch-render-cache")
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "render_ms_total": 0.0,
+            "render_ms_saved": 0.0,
+        }
+        self.render_ms: Dict[str, float] = {}
+        if self.directory:
+            self.load_disk_index()
+
+    def load_disk_index(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".pptx")]
+        except OSError as exc:
+            print(f"Render cache disk tier disabled: {exc}")
+            self.directory = None
+            return
+        for entry in sorted(entries, key=lambda item: item.stat().st_mtime):
+            size = entry.stat().st_size
+            self.disk[entry.name[:-5]] = size
+            self.disk_used += size
+
+    def disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pptx")
+
+    def remember(self, key: str, data: bytes):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return
+            self.memory[key] = data
+            self.memory_used += len(data)
+            while self.memory_used > self.memory_bytes and len(self.memory) > 1:
+                _, evicted = self.memory.popitem(last=False)
+                self.memory_used -= len(evicted)
+                self.stats["memory_evictions"] += 1
+
+    def read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        with self.lock:
+            if key not in self.disk:
+                return None
+            self.disk.move_to_end(key)
+        path = self.disk_path(key)
+        try:
+            with open(path, "rb") as handle:
+                data = handle.read()
+            os.utime(path)
+        except OSError:
+            # Another worker sharing the directory may have evicted it.
+            with self.lock:
+                self.disk_used -= self.disk.pop(key, 0)
+            return None
+        return data
+
+    def write_disk(self, key: str, data: bytes):
+        path = self.disk_path(key)
+        try:
+            fd, staging = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(staging, path)
+        except OSError as exc:
+            print(f"Render cache write failed for {key}: {exc}")
+            return
+
+        evicted = []
+        with self.lock:
+            if key not in self.disk:
+                self.disk[key] = len(data)
+                self.disk_used += len(data)
+            while self.disk_used > self.disk_bytes and len(self.disk) > 1:
+                old_key, size = self.disk.popitem(last=False)
+                self.disk_used -= size
+                self.stats["disk_evictions"] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self.disk_path(old_key))
+            except OSError:
+                pass
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], str]:
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["render_ms_saved"] += self.render_ms.get(key, 0.0)
+                return data, "memory"
+
+        data = self.read_disk(key)
+        if data is not None:
+            self.remember(key, data)
+            with self.lock:
+                self.stats["disk_hits"] += 1
+                self.stats["render_ms_saved"] += self.render_ms.get(key, 0.0)
+            return data, "disk"
+        return None, "render"
+
+    def store(self, key: str, data: bytes, elapsed_ms: float):
+        self.remember(key, data)
+        with self.lock:
+            self.stats["misses"] += 1
+            self.stats["render_ms_total"] += elapsed_ms
+            self.render_ms[key] = round(elapsed_ms, 1)
+            if len(self.render_ms) > 4096:
+                self.render_ms.pop(next(iter(self.render_ms)))
+        if self.directory:
+            self.disk_writer.submit(self.write_disk, key, data)
+
+    def render(self, presentation_json: Dict[str, Any], org_name: str = "", theme_vibe: str = "") -> Tuple[bytes, str]:
+        """Return the deck bytes and where they came from: memory, disk or render."""
+        return self.render_many([(presentation_json, org_name, theme_vibe)])[0]
+
+    def render_many(self, requests: List[RenderRequest]) -> List[Tuple[bytes, str]]:
+        """Like render for several decks at once; the misses are rendered in parallel by the render service."""
+        keys = [render_key(*request) for request in requests]
+        results = [self.lookup(key) for key in keys]
+        # Identical requests in one batch are rendered once.
+        missing = {key: request for key, request, (data, _) in zip(keys, requests, results) if data is None}
+        if missing:
+            started_at = time.perf_counter()
+            rendered = dict(zip(missing, render_service.render_many(list(missing.values()))))
+            elapsed_ms = (time.perf_counter() - started_at) * 1000 / len(missing)
+            for key, data in rendered.items():
+                self.store(key, data, elapsed_ms)
+            results = [(rendered[key], "render") if data is None else (data, source) for key, (data, source) in zip(keys, results)]
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats.update({
+                "hit_rate": round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0,
+                "render_ms_total": round(stats["render_ms_total"], 1),
+                "render_ms_saved": round(stats["render_ms_saved"], 1),
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_used,
+                "memory_limit_bytes": self.memory_bytes,
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk_used,
+                "disk_limit_bytes": self.disk_bytes if self.directory else 0,
+                "renderer_version": RENDERER_VERSION,
+            })
+        # Fragments are cached inside whichever process renders; with a worker pool only the
+        # aggregate hit counts make it back here.
+        stats["slide_fragments"] = render_service.fragment_snapshot() if render_service.workers else slide_fragment_cache.snapshot()
+        stats["render_service"] = render_service.snapshot()
+        if not render_service.workers:
+            stats["text_fit"] = text_fit_snapshot()
+        return stats
+
+
+render_cache = RenderCache()
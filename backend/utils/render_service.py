@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pptx_generator import render_fragments, render_pptx, seed_fragments, shared_fragment_jobs, slide_fragment_cache
+
+# Worker processes for python-pptx rendering, sized independently of LLM concurrency.
+# 0 renders in the calling thread, which is what tests and single-core hosts want.
+RENDER_WORKERS = int(os.environ.get("OMNIPITCH_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+# Recycle each worker after this many renders so lxml/python-pptx memory growth stays bounded.
+RENDER_MAX_TASKS_PER_CHILD = int(os.environ.get("OMNIPITCH_RENDER_MAX_TASKS_PER_CHILD", 200)) or None
+
+RenderRequest = Tuple[Dict[str, Any], str, str]
+
+
+def render_in_worker(presentation_json: Dict[str, Any], org_name: str, theme_vibe: str, fragments: Optional[Dict[str, bytes]] = None) -> Dict[str, Any]:
+    """Pool entry point. Templates and slide fragments are cached per worker process."""
+    if fragments:
+        seed_fragments(fragments)
+    hits, misses = slide_fragment_cache.hits, slide_fragment_cache.misses
+    started_at = time.perf_counter()
+    data = render_pptx(presentation_json, org_name, theme_vibe)
+    return {
+        "data": data,
+        "render_ms": (time.perf_counter() - started_at) * 1000,
+        "pid": os.getpid(),
+        "fragment_hits": slide_fragment_cache.hits - hits,
+        "fragment_misses": slide_fragment_cache.misses - misses,
+    }
+
+
+def warm_worker() -> int:
+    return os.getpid()
+
+
+class RenderService:
+    """Renders decks on a process pool so XML building does not hold the API's GIL.
+
+    ``submit`` returns a future of the deck bytes and ``render_many`` fans a batch (every
+    theme of one deck, say) out across the workers. A pool that breaks, e.g. a worker killed
+    by the OOM killer, is replaced on the next call and the affected renders are retried
+    in-process once.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, max_tasks_per_child: Optional[int] = RENDER_MAX_TASKS_PER_CHILD):
+        self.workers = max(workers, 0)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "pool_restarts": 0,
+            "max_queue_depth": 0,
+            "render_ms_total": 0.0,
+            "wait_ms_total": 0.0,
+            "fragment_hits": 0,
+            "fragment_misses": 0,
+            "shared_fragments": 0,
+        }
+        self.worker_renders: Dict[int, int] = {}
+
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        if not self.workers:
+            return None
+        with self.lock:
+            if self.pool is None:
+                # Spawned workers never inherit the parent's threads or open connections.
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self.pool
+
+    def start(self):
+        """Spawn the workers up front so the first render does not pay for interpreter start-up."""
+        pool = self.executor()
+        if pool is not None:
+            for future in [pool.submit(warm_worker) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def reset_pool(self, broken: ProcessPoolExecutor):
+        with self.lock:
+            if self.pool is broken:
+                self.pool = None
+                self.stats["pool_restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def record(self, result: Dict[str, Any], submitted_at: float):
+        elapsed_ms = (time.perf_counter() - submitted_at) * 1000
+        with self.lock:
+            self.stats["completed"] += 1
+            self.stats["render_ms_total"] += result["render_ms"]
+            self.stats["wait_ms_total"] += max(elapsed_ms - result["render_ms"], 0.0)
+            self.stats["fragment_hits"] += result["fragment_hits"]
+            self.stats["fragment_misses"] += result["fragment_misses"]
+            self.worker_renders[result["pid"]] = self.worker_renders.get(result["pid"], 0) + 1
+            if len(self.worker_renders) > 64:
+                self.worker_renders.pop(next(iter(self.worker_renders)))
+
+    def submit(self, presentation_json: Dict[str, Any], org_name: str = "", theme_vibe: str = "", fragments: Optional[Dict[str, bytes]] = None) -> "Future[bytes]":
+        submitted_at = time.perf_counter()
+        with self.lock:
+            self.stats["submitted"] += 1
+            self.queued += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queued)
+
+        outcome: "Future[bytes]" = Future()
+        pool = self.executor()
+        if pool is None:
+            self.run_inline(outcome, presentation_json, org_name, theme_vibe, submitted_at)
+            return outcome
+
+        def finished(task: Future):
+            with self.lock:
+                self.queued -= 1
+            error = task.exception()
+            if isinstance(error, BrokenProcessPool):
+                self.reset_pool(pool)
+                threading.Thread(
+                    target=self.run_inline,
+                    args=(outcome, presentation_json, org_name, theme_vibe, submitted_at, False),
+                    daemon=True,
+                ).start()
+                return
+            if error is not None:
+                with self.lock:
+                    self.stats["failed"] += 1
+                outcome.set_exception(error)
+                return
+            result = task.result()
+            self.record(result, submitted_at)
+            outcome.set_result(result["data"])
+
+        try:
+            pool.submit(render_in_worker, presentation_json, org_name, theme_vibe, fragments).add_done_callback(finished)
+        except BrokenProcessPool:
+            with self.lock:
+                self.queued -= 1
+            self.reset_pool(pool)
+            self.run_inline(outcome, presentation_json, org_name, theme_vibe, submitted_at, False)
+        return outcome
+
+    def run_inline(self, outcome: Future, presentation_json: Dict[str, Any], org_name: str, theme_vibe: str, submitted_at: float, counted: bool = True):
+        with self.lock:
+            if counted:
+                self.queued -= 1
+            self.running += 1
+        try:
+            result = render_in_worker(presentation_json, org_name, theme_vibe)
+        except Exception as exc:
+            with self.lock:
+                self.stats["failed"] += 1
+            outcome.set_exception(exc)
+            return
+        finally:
+            with self.lock:
+                self.running -= 1
+        self.record(result, submitted_at)
+        outcome.set_result(result["data"])
+
+    def render(self, presentation_json: Dict[str, Any], org_name: str = "", theme_vibe: str = "") -> bytes:
+        return self.submit(presentation_json, org_name, theme_vibe).result()
+
+    def render_many(self, requests: List[RenderRequest]) -> List[bytes]:
+        """Render every (presentation_json, org_name, theme_vibe) request, in parallel across workers.
+
+        Body slides shared between requests (the same deck in several themes) are built once
+        by one worker and handed to every render, which then only recolors and packages them.
+        """
+        if not self.workers:
+            return [self.render(*request) for request in requests]
+        fragments = self.shared_fragments(requests) if len(requests) > 1 else {}
+        futures = [self.submit(*request, fragments=fragments) for request in requests]
+        return [future.result() for future in futures]
+
+    def shared_fragments(self, requests: List[RenderRequest]) -> Dict[str, bytes]:
+        jobs = shared_fragment_jobs(requests)
+        if not jobs:
+            return {}
+        pool = self.executor()
+        try:
+            fragments = pool.submit(render_fragments, jobs).result()
+        except BrokenProcessPool:
+            self.reset_pool(pool)
+            return {}
+        with self.lock:
+            self.stats["shared_fragments"] += len(fragments)
+        return fragments
+
+    def fragment_snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            hits, misses = self.stats["fragment_hits"], self.stats["fragment_misses"]
+        return {"scope": "per-worker", "hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            completed = stats["completed"]
+            stats.update({
+                "mode": "process" if self.workers else "inline",
+                "workers": self.workers,
+                "max_tasks_per_child": self.max_tasks_per_child,
+                "pool_started": self.pool is not None,
+                # Renders submitted but not finished; anything beyond the worker count is waiting.
+                "in_flight": self.queued + self.running,
+                "queue_depth": max(self.queued - self.workers, 0) if self.workers else 0,
+                "avg_render_ms": round(stats["render_ms_total"] / completed, 1) if completed else 0.0,
+                "avg_wait_ms": round(stats["wait_ms_total"] / completed, 1) if completed else 0.0,
+                "render_ms_total": round(stats["render_ms_total"], 1),
+                "wait_ms_total": round(stats["wait_ms_total"], 1),
+                "renders_by_worker": dict(self.worker_renders),
+            })
+        return stats
+
+
+render_service = RenderService()
@@ -0,0 +1,88 @@
+import hashlib
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+SHINGLE_SIZE = 5
+SKETCH_SIZE = 64
+CANDIDATE_PREFIX = 8
+MIN_WORDS_FOR_NEAR_MATCH = 40
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class DuplicateMatch:
+    label: str
+    duplicate_of: str
+    kind: str
+    similarity: float
+
+
+@dataclass
+class SourceDeduper:
+    threshold: float = NEAR_DUPLICATE_THRESHOLD
+    exact_hashes: Dict[str, str] = field(default_factory=dict)
+    sketches: List[Tuple[str, List[int]]] = field(default_factory=list)
+    sketch_index: Dict[int, List[int]] = field(default_factory=dict)
+
+    def check(self, label: str, text: str) -> Optional[DuplicateMatch]:
+        words = WORD_PATTERN.findall((text or "").lower())
+        digest = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+        if digest in self.exact_hashes:
+            return DuplicateMatch(label, self.exact_hashes[digest], "exact", 1.0)
+
+        sketch = minhash_sketch(words) if len(words) >= MIN_WORDS_FOR_NEAR_MATCH else []
+        if sketch:
+            best_label, best_similarity = self.best_candidate(sketch)
+            if best_label and best_similarity >= self.threshold:
+                return DuplicateMatch(label, best_label, "near", round(best_similarity, 3))
+
+        self.exact_hashes[digest] = label
+        if sketch:
+            position = len(self.sketches)
+            self.sketches.append((label, sketch))
+            for value in sketch[:CANDIDATE_PREFIX]:
+                self.sketch_index.setdefault(value, []).append(position)
+        return None
+
+    def best_candidate(self, sketch: List[int]) -> Tuple[Optional[str], float]:
+        # Near-duplicates almost always share one of their smallest hashes, so only those
+        # documents are compared instead of every source seen so far.
+        candidates: Set[int] = set()
+        for value in sketch[:CANDIDATE_PREFIX]:
+            candidates.update(self.sketch_index.get(value, []))
+
+        best_label, best_similarity = None, 0.0
+        for position in candidates:
+            label, other = self.sketches[position]
+            similarity = estimate_jaccard(sketch, other)
+            if similarity > best_similarity:
+                best_label, best_similarity = label, similarity
+        return best_label, best_similarity
+
+
+def shingle_hashes(words: List[str], size: int = SHINGLE_SIZE) -> Set[int]:
+    hashes = set()
+    for index in range(max(len(words) - size + 1, 1)):
+        shingle = " ".join(words[index:index + size]).encode("utf-8")
+        hashes.add(int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big"))
+    return hashes
+
+
+def minhash_sketch(words: List[str], size: int = SKETCH_SIZE) -> List[int]:
+    # Bottom-k MinHash: a single hash function, keeping the k smallest shingle hashes.
+    return heapq.nsmallest(size, shingle_hashes(words))
+
+
+def estimate_jaccard(left: List[int], right: List[int]) -> float:
+    if not left or not right:
+        return 0.0
+    size = min(len(left), len(right))
+    left_set = set(left)
+    right_set = set(right)
+    union_sketch = heapq.nsmallest(size, left_set | right_set)
+    shared = sum(1 for value in union_sketch if value in left_set and value in right_set)
+    return shared / len(union_sketch)
@@ -0,0 +1,164 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# A source filter takes (filename, text) and returns the text to keep. Returning an empty
+# string drops the source entirely; returning the input unchanged is a no-op.
+SourceFilter = Callable[[str, str], str]
+
+LOCKFILE_NAMES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "npm-shrinkwrap.json", "bun.lockb",
+    "poetry.lock", "pipfile.lock", "uv.lock", "cargo.lock", "gemfile.lock", "composer.lock",
+    "go.sum", "packages.lock.json", "podfile.lock", "mix.lock",
+}
+LICENSE_FILE_NAMES = {"license", "license.md", "license.txt", "licence", "copying", "notice", "third_party_notices.txt"}
+ENV_SAMPLE_NAMES = {".env.example", ".env.sample", ".env.template", ".env.dist", "env.example"}
+LOW_SIGNAL_DIRECTORIES = {
+    "node_modules", "bower_components", "dist", "build", ".next", ".nuxt", "coverage",
+    "__pycache__", ".venv", "venv", "site-packages", "vendor", "third_party", ".git", ".idea", ".vscode",
+}
+GENERATED_PATH_PATTERN = re.compile(
+    r"(?:_pb2(?:_grpc)?\.py|\.pb\.(?:go|cc|h)|_grpc\.pb\.go|\.pb\.gw\.go|\.g\.dart|\.gen\.(?:ts|go|py)|\.generated\.\w+|\.designer\.cs)$"
+    r"|(?:^|/)(?:generated|__generated__|gen|openapi-client|swagger-client)/",
+    re.IGNORECASE,
+)
+MINIFIED_PATH_PATTERN = re.compile(r"\.min\.(?:js|css)$|\.map$|\.bundle\.js$|\.chunk\.js$", re.IGNORECASE)
+GENERATED_MARKERS = (
+    "code generated",
+    "do not edit",
+    "@generated",
+    "auto-generated",
+    "autogenerated",
+    "automatically generated",
+    "generated by the protocol buffer compiler",
+    "openapi-generator",
+    "swagger-codegen",
+)
+LICENSE_MARKERS = ("license", "copyright", "spdx-license-identifier", "all rights reserved")
+COMMENT_LINE_PATTERN = re.compile(r"^\s*(?:#|//|/\*|\*|\*/|<!--|-->|--|;)")
+
+# Prose keeps whole paragraphs on one line and uses "#", "*" and "--" as markup, and data
+# files are compact by nature, so the code heuristics below leave both alone.
+PROSE_EXTENSIONS = {".md", ".markdown", ".txt", ".rst"}
+DATA_EXTENSIONS = {".json", ".jsonl", ".ndjson", ".csv", ".tsv"}
+
+MINIFIED_AVERAGE_LINE_CHARS = 300
+MINIFIED_MAX_LINE_CHARS = 2000
+HEADER_SCAN_LINES = 20
+LICENSE_SCAN_LINES = 60
+
+
+@dataclass
+class FilterReport:
+    text: str
+    removed_bytes: Dict[str, int] = field(default_factory=dict)
+    dropped_by: Optional[str] = None
+
+
+def path_parts(filename: str) -> List[str]:
+    return [part.lower() for part in re.split(r"[\\/]+", filename or "") if part]
+
+
+def file_extension(filename: str) -> str:
+    return os.path.splitext((filename or "").lower())[1]
+
+
+def drop_low_signal_paths(filename: str, text: str) -> str:
+    parts = path_parts(filename)
+    basename = parts[-1] if parts else ""
+    if basename in LOCKFILE_NAMES or basename in ENV_SAMPLE_NAMES or basename in LICENSE_FILE_NAMES:
+        return ""
+    if any(part in LOW_SIGNAL_DIRECTORIES for part in parts[:-1]):
+        return ""
+    if GENERATED_PATH_PATTERN.search("/".join(parts)) or MINIFIED_PATH_PATTERN.search(basename):
+        return ""
+    return text
+
+
+def drop_generated_files(filename: str, text: str) -> str:
+    if file_extension(filename) in PROSE_EXTENSIONS:
+        return text
+    header = "\n".join(text.splitlines()[:HEADER_SCAN_LINES]).lower()
+    if any(marker in header for marker in GENERATED_MARKERS):
+        return ""
+    return text
+
+
+def drop_minified_content(filename: str, text: str) -> str:
+    if file_extension(filename) in PROSE_EXTENSIONS | DATA_EXTENSIONS:
+        return text
+    lines = text.splitlines() or [text]
+    longest_line = max(len(line) for line in lines)
+    average_line = len(text) / len(lines)
+    if average_line > MINIFIED_AVERAGE_LINE_CHARS or (longest_line > MINIFIED_MAX_LINE_CHARS and len(lines) < 20):
+        return ""
+    return text
+
+
+def strip_license_header(filename: str, text: str) -> str:
+    if file_extension(filename) in PROSE_EXTENSIONS:
+        return text
+    lines = text.splitlines()
+    header_end = 0
+    for index, line in enumerate(lines[:LICENSE_SCAN_LINES]):
+        if not line.strip() or COMMENT_LINE_PATTERN.match(line):
+            header_end = index + 1
+            continue
+        break
+
+    if header_end == 0:
+        return text
+    header = "\n".join(lines[:header_end]).lower()
+    if not any(marker in header for marker in LICENSE_MARKERS):
+        return text
+    return "\n".join(lines[header_end:]).lstrip("\n")
+
+
+SOURCE_FILTERS: List[Tuple[str, SourceFilter]] = [
+    ("low_signal_path", drop_low_signal_paths),
+    ("generated_file", drop_generated_files),
+    ("minified", drop_minified_content),
+    ("license_header", strip_license_header),
+]
+
+# Why a dropped source was left out, for the upload warnings.
+FILTER_REASONS = {
+    "low_signal_path": "a lockfile, license, sample env, bundle, generated or vendored file by its path",
+    "generated_file": "marked as generated code",
+    "minified": "minified or bundled content",
+    "license_header": "nothing but a license header",
+}
+
+
+def register_source_filter(name: str, source_filter: SourceFilter, before: Optional[str] = None):
+    entry = (name, source_filter)
+    names = [existing for existing, _ in SOURCE_FILTERS]
+    if name in names:
+        SOURCE_FILTERS[names.index(name)] = entry
+    elif before in names:
+        SOURCE_FILTERS.insert(names.index(before), entry)
+    else:
+        SOURCE_FILTERS.append(entry)
+
+
+def disabled_filters() -> set:
+    raw = os.environ.get("OMNIPITCH_DISABLED_SOURCE_FILTERS", "")
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+def run_source_filters(filename: str, text: str) -> FilterReport:
+    report = FilterReport(text=text)
+    skipped = disabled_filters()
+    for name, source_filter in SOURCE_FILTERS:
+        if name in skipped:
+            continue
+        filtered = source_filter(filename, report.text)
+        removed = len(report.text.encode("utf-8")) - len(filtered.encode("utf-8"))
+        if removed > 0:
+            report.removed_bytes[name] = removed
+        report.text = filtered
+        if not filtered.strip():
+            report.dropped_by = name
+            break
+    return report
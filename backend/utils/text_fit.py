@@ -0,0 +1,143 @@
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+# Measurements are memoized per (text, weight, size, box) so re-renders, theme variants and repeated
+# card copy measure each string once per process.
+TEXT_FIT_CACHE_SIZE = int(os.environ.get("OMNIPITCH_TEXT_FIT_CACHE_SIZE", 8192))
+
+EMU_PER_POINT = 12700
+# Single line spacing for the sans faces the themes use, as a multiple of the font size.
+LINE_HEIGHT = 1.2
+# Text is shrunk in these steps, down to MIN_FONT_SCALE of its designed size, before it is
+# left to overflow. Sizes never drop below MIN_FONT_SIZE points.
+FONT_SCALE_STEP = 0.05
+MIN_FONT_SCALE = 0.5
+MIN_FONT_SIZE = 8
+# Measured widths are padded slightly so text still fits a viewer whose face runs a touch wider.
+WIDTH_SAFETY = 1.05
+
+# Advance widths in 1/1000 em for printable ASCII (space through tilde), Helvetica's AFM
+# metrics. Aptos and the template's Calibri are no wider, so a fit here fits there too, and one
+# table serves every face the themes use.
+REGULAR_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+EXTRA_WIDTHS = {"•": 350, "…": 1000, "—": 1000, "–": 556, "‘": 222, "’": 222, "“": 333, "”": 333, "€": 556, "£": 556}
+# Anything else (accented Latin, symbols) is measured as a digit, about the face's mean width.
+DEFAULT_WIDTH = 556
+WIDE_WIDTH = 1000
+
+LINE_BREAK_PATTERN = re.compile("\n|\v")
+
+# (text, bold, font size in points, space after in points)
+FitParagraph = Tuple[str, bool, int, int]
+
+
+def char_width(char: str, bold: bool) -> int:
+    code = ord(char)
+    if 32 <= code <= 126:
+        return (BOLD_WIDTHS if bold else REGULAR_WIDTHS)[code - 32]
+    if char in EXTRA_WIDTHS:
+        return EXTRA_WIDTHS[char]
+    # CJK and other full-width scripts take a whole em.
+    return WIDE_WIDTH if code >= 0x1100 else DEFAULT_WIDTH
+
+
+def text_width(text: str, bold: bool = False) -> float:
+    """Width of ``text`` in ems."""
+    return sum(char_width(char, bold) for char in text) * WIDTH_SAFETY / 1000
+
+
+@lru_cache(maxsize=TEXT_FIT_CACHE_SIZE)
+def wrap_lines(text: str, bold: bool, font_size: int, width: int) -> Tuple[str, ...]:
+    """Greedy word wrap of ``text`` at ``font_size`` points into a ``width`` EMU wide box.
+
+    Explicit line breaks are kept, and a word wider than the box is split between
+    characters, as PowerPoint does.
+    """
+    max_ems = width / EMU_PER_POINT / font_size
+    lines = []
+    for segment in LINE_BREAK_PATTERN.split(text):
+        line = ""
+        for word in segment.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, bold) <= max_ems:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = ""
+            for char in word:
+                if line and text_width(line + char, bold) > max_ems:
+                    lines.append(line)
+                    line = ""
+                line += char
+        lines.append(line)
+    return tuple(lines)
+
+
+def fitted_size(font_size: int, scale: float) -> int:
+    return max(min(font_size, MIN_FONT_SIZE), round(font_size * scale))
+
+
+def text_height(paragraphs: Tuple[FitParagraph, ...], scale: float, width: int) -> float:
+    """Height in points of the paragraphs laid out at ``scale`` of their sizes."""
+    height = 0.0
+    for index, (text, bold, font_size, space_after) in enumerate(paragraphs):
+        size = fitted_size(font_size, scale)
+        height += len(wrap_lines(text, bold, size, width)) * size * LINE_HEIGHT
+        if index < len(paragraphs) - 1:
+            height += space_after
+    return height
+
+
+@lru_cache(maxsize=TEXT_FIT_CACHE_SIZE)
+def fit_font_scale(paragraphs: Tuple[FitParagraph, ...], width: int, height: int) -> float:
+    """Largest scale, in FONT_SCALE_STEP steps, at which the paragraphs fit a ``width`` x ``height`` EMU box.
+
+    This is the shrink-on-overflow PowerPoint's autofit does at open time, done once at
+    render time so every viewer gets the same explicit sizes.
+    """
+    available = height / EMU_PER_POINT
+    steps = round((1 - MIN_FONT_SCALE) / FONT_SCALE_STEP)
+    for step in range(steps + 1):
+        scale = round(1 - step * FONT_SCALE_STEP, 2)
+        if text_height(paragraphs, scale, width) <= available:
+            return scale
+    return MIN_FONT_SCALE
+
+
+def fit_font_sizes(paragraphs: Tuple[FitParagraph, ...], width: int, height: int) -> Tuple[int, ...]:
+    """Explicit point size for each paragraph so the whole block fits the box."""
+    scale = fit_font_scale(paragraphs, max(int(width), 1), max(int(height), 1))
+    return tuple(fitted_size(paragraph[2], scale) for paragraph in paragraphs)
+
+
+def text_fit_snapshot() -> Dict[str, Any]:
+    snapshot = {}
+    for name, cached in (("wrap", wrap_lines), ("fit", fit_font_scale)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        snapshot[name] = {
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+        }
+    return snapshot
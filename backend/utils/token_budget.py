@@ -0,0 +1,224 @@
+import math
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_BUDGET_MODE = "balanced"
+BUDGET_MODE_ENV = "OMNIPITCH_TOKEN_BUDGET_MODE"
+
+MODEL_PROFILES: Dict[str, Dict[str, Any]] = {
+    "gpt-4o": {"context_tokens": 128000, "max_output_tokens": 16384, "input_cost_per_mtok": 2.5, "output_cost_per_mtok": 10.0},
+    "gpt-4o-mini": {"context_tokens": 128000, "max_output_tokens": 16384, "input_cost_per_mtok": 0.15, "output_cost_per_mtok": 0.6},
+    "gpt-4.1": {"context_tokens": 1000000, "max_output_tokens": 32768, "input_cost_per_mtok": 2.0, "output_cost_per_mtok": 8.0},
+    "gpt-4.1-mini": {"context_tokens": 1000000, "max_output_tokens": 32768, "input_cost_per_mtok": 0.4, "output_cost_per_mtok": 1.6},
+}
+
+# Share of the model context window each mode is willing to spend on prompt input,
+# plus a hard ceiling so large-context models do not balloon latency or cost.
+BUDGET_MODES: Dict[str, Dict[str, float]] = {
+    "quality": {"context_share": 0.6, "input_ceiling": 90000},
+    "balanced": {"context_share": 0.4, "input_ceiling": 48000},
+    "latency": {"context_share": 0.2, "input_ceiling": 24000},
+    "cost": {"context_share": 0.15, "input_ceiling": 16000},
+}
+
+# Per-node share of the mode's input budget, and how that share is split between the
+# user brief, source text and images. Only CodeParser reads the full corpus.
+NODE_ALLOCATIONS: Dict[str, Dict[str, float]] = {
+    "CodeParser_Node": {"input_share": 1.0, "brief": 0.05, "sources": 0.8, "images": 0.15, "output_tokens": 2500},
+    "BusinessValue_Node": {"input_share": 0.08, "brief": 0.1, "sources": 0.9, "images": 0.0, "output_tokens": 900},
+    "Narrative_Node": {"input_share": 0.1, "brief": 0.1, "sources": 0.9, "images": 0.0, "output_tokens": 6000},
+}
+
+# Fixed prompt scaffolding (system prompt, schema, formatting) the planner reserves per node.
+NODE_PROMPT_OVERHEAD_TOKENS = {
+    "CodeParser_Node": 900,
+    "BusinessValue_Node": 700,
+    "Narrative_Node": 1800,
+}
+
+IMAGE_LOW_DETAIL_TOKENS = 85
+IMAGE_HIGH_DETAIL_TILE_TOKENS = 170
+IMAGE_HIGH_DETAIL_DEFAULT_TILES = 4
+
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d{1,3}|[^\sA-Za-z\d]{1,2}| {2,}|\t+|\n+")
+
+
+@dataclass
+class NodeBudget:
+    node: str
+    model: str
+    mode: str
+    input_tokens: int
+    brief_tokens: int
+    source_tokens: int
+    image_tokens: int
+    output_tokens: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def resolve_budget_mode(mode: Optional[str] = None) -> str:
+    candidate = (mode or os.environ.get(BUDGET_MODE_ENV) or DEFAULT_BUDGET_MODE).strip().lower()
+    return candidate if candidate in BUDGET_MODES else DEFAULT_BUDGET_MODE
+
+
+def get_model_profile(model: str) -> Dict[str, Any]:
+    if model in MODEL_PROFILES:
+        return MODEL_PROFILES[model]
+    for name in sorted(MODEL_PROFILES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PROFILES[name]
+    return MODEL_PROFILES[DEFAULT_MODEL]
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        first = piece[0]
+        if first.isalpha():
+            # Common short words are a single BPE token; long identifiers split every ~6 chars.
+            tokens += 1 if len(piece) <= 7 else math.ceil(len(piece) / 6)
+        elif first in " \t":
+            tokens += math.ceil(len(piece) / 4)
+        else:
+            tokens += 1
+    return tokens
+
+
+def chars_per_token(text: str, default: float = 4.0) -> float:
+    sample = (text or "")[:20000]
+    tokens = estimate_tokens(sample)
+    if not tokens:
+        return default
+    return max(len(sample) / tokens, 1.0)
+
+
+def tokens_to_chars(tokens: int, sample_text: str = "") -> int:
+    return max(int(tokens * chars_per_token(sample_text)), 0)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    text = text or ""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    limit = min(tokens_to_chars(max_tokens, text), len(text))
+    trimmed = text[:limit]
+    while limit > 0 and estimate_tokens(trimmed) > max_tokens:
+        limit = int(limit * 0.9)
+        trimmed = text[:limit]
+    return trimmed.rstrip()
+
+
+def estimate_image_tokens(detail: str = "high", tiles: int = IMAGE_HIGH_DETAIL_DEFAULT_TILES) -> int:
+    if detail == "low":
+        return IMAGE_LOW_DETAIL_TOKENS
+    return IMAGE_LOW_DETAIL_TOKENS + IMAGE_HIGH_DETAIL_TILE_TOKENS * max(tiles, 1)
+
+
+def plan_node_budget(node: str, model: str = DEFAULT_MODEL, mode: Optional[str] = None) -> NodeBudget:
+    resolved_mode = resolve_budget_mode(mode)
+    mode_spec = BUDGET_MODES[resolved_mode]
+    profile = get_model_profile(model)
+    allocation = NODE_ALLOCATIONS.get(node, NODE_ALLOCATIONS["Narrative_Node"])
+
+    output_tokens = min(int(allocation["output_tokens"]), profile["max_output_tokens"])
+    usable_context = profile["context_tokens"] - output_tokens - NODE_PROMPT_OVERHEAD_TOKENS.get(node, 1000)
+    mode_tokens = min(usable_context * mode_spec["context_share"], mode_spec["input_ceiling"])
+    input_tokens = max(int(mode_tokens * allocation["input_share"]), 1200)
+
+    return NodeBudget(
+        node=node,
+        model=model,
+        mode=resolved_mode,
+        input_tokens=input_tokens,
+        brief_tokens=int(input_tokens * allocation["brief"]),
+        source_tokens=int(input_tokens * allocation["sources"]),
+        image_tokens=int(input_tokens * allocation["images"]),
+        output_tokens=output_tokens,
+    )
+
+
+def plan_ingestion_limits(model: str = DEFAULT_MODEL, mode: Optional[str] = None) -> Tuple[int, int]:
+    # Ingestion keeps a little headroom over the CodeParser budget so the node, not the
+    # upload handler, decides how sections share the window.
+    budget = plan_node_budget("CodeParser_Node", model, mode)
+    total_tokens = int((budget.brief_tokens + budget.source_tokens) * 1.25)
+    per_source_tokens = max(int(total_tokens / 4), 2000)
+    return per_source_tokens, total_tokens
+
+
+def allocate_section_budgets(section_tokens: List[int], total_budget: int) -> List[int]:
+    # Water-filling: small sections are kept whole and the remainder is split evenly
+    # across the larger ones instead of truncating whatever happens to come last.
+    allocations = [0] * len(section_tokens)
+    remaining_budget = max(total_budget, 0)
+    pending = sorted(range(len(section_tokens)), key=lambda index: section_tokens[index])
+
+    while pending:
+        fair_share = remaining_budget // len(pending)
+        index = pending[0]
+        if section_tokens[index] <= fair_share:
+            allocations[index] = section_tokens[index]
+            remaining_budget -= section_tokens[index]
+            pending.pop(0)
+            continue
+        for index in pending:
+            allocations[index] = fair_share
+        break
+
+    return allocations
+
+
+def estimate_cost_usd(model: str, input_tokens: int, output_tokens: int) -> float:
+    profile = get_model_profile(model)
+    cost = (input_tokens * profile["input_cost_per_mtok"] + output_tokens * profile["output_cost_per_mtok"]) / 1_000_000
+    return round(cost, 6)
+
+
+def summarize_usage_callback(usage_metadata: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    input_tokens = 0
+    output_tokens = 0
+    for usage in (usage_metadata or {}).values():
+        input_tokens += int(usage.get("input_tokens", 0) or 0)
+        output_tokens += int(usage.get("output_tokens", 0) or 0)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+
+def build_usage_record(
+    budget: NodeBudget,
+    predicted_input_tokens: int,
+    usage_metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    # model is the one that actually answered, which differs from the planned one when a
+    # route falls back down its chain.
+    model = model or budget.model
+    actual = summarize_usage_callback(usage_metadata or {})
+    record = {
+        "model": model,
+        "mode": budget.mode,
+        "budget": budget.as_dict(),
+        "predicted_input_tokens": predicted_input_tokens,
+        "actual_input_tokens": actual["input_tokens"],
+        "actual_output_tokens": actual["output_tokens"],
+        "estimated_cost_usd": estimate_cost_usd(model, actual["input_tokens"] or predicted_input_tokens, actual["output_tokens"]),
+    }
+    if actual["input_tokens"]:
+        record["prediction_error_ratio"] = round(predicted_input_tokens / actual["input_tokens"] - 1, 4)
+    return record
+
+
+def merge_usage(existing: Optional[Dict[str, Any]], node: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(existing or {})
+    merged[node] = record
+    return merged
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { GenerationStatusPayload } from '../types/generation';
+import type { BriefVariant, GenerationMode, GenerationStatusPayload, ThemePreviewResponse } from '../types/generation';
 
 export const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -23,6 +23,7 @@ export const uploadDocument = async (
     targetAudience: string,
     keyMessage: string,
     designVibe: string,
+    generationMode: GenerationMode = 'standard',
 ) => {
     const formData = new FormData();
     files.forEach((file) => {
@@ -33,20 +34,66 @@ export const uploadDocument = async (
     formData.append('target_audience', targetAudience);
     formData.append('key_message', keyMessage);
     formData.append('design_vibe', designVibe);
+    formData.append('generation_mode', generationMode);
 
     const response = await api.post<GenerationStatusPayload>('/api/upload', formData);
     return response.data;
 };
 
+export const uploadBatch = async (
+    files: File[],
+    orgName: string,
+    purpose: string,
+    keyMessage: string,
+    designVibe: string,
+    variants: BriefVariant[],
+) => {
+    const formData = new FormData();
+    files.forEach((file) => {
+        formData.append('files', file);
+    });
+    formData.append('org_name', orgName);
+    formData.append('purpose', purpose);
+    formData.append('key_message', keyMessage);
+    formData.append('design_vibe', designVibe);
+    formData.append('variants', JSON.stringify(variants));
+
+    const response = await api.post<GenerationStatusPayload>('/api/upload/batch', formData);
+    return response.data;
+};
+
 export const checkStatus = async (jobId: string) => {
     const response = await api.get<GenerationStatusPayload>(`/api/status/${jobId}`);
     return response.data;
 };
 
+export const regenerateSlides = async (jobId: string, slideIndexes: number[], instructions = '') => {
+    const response = await api.post<GenerationStatusPayload>(`/api/jobs/${jobId}/slides/regenerate`, {
+        slide_indexes: slideIndexes,
+        instructions,
+    });
+    return response.data;
+};
+
+export const changeDeckTheme = async (jobId: string, themeVibe: string) => {
+    const response = await api.post<GenerationStatusPayload>(`/api/jobs/${jobId}/theme`, { theme_vibe: themeVibe });
+    return response.data;
+};
+
+export const renderThemePreviews = async (jobId: string, themes?: string[]) => {
+    const response = await api.post<ThemePreviewResponse>(`/api/jobs/${jobId}/themes/render`, themes ? { themes } : {});
+    return response.data;
+};
+
 export const getDownloadUrl = (jobId: string) => {
     return `${API_BASE_URL}/api/download/${jobId}`;
 };
 
+// Static HTML/SVG snapshot of the current deck; safe to share or embed in an iframe.
+export const getSnapshotUrl = (jobId: string) => {
+    return `${API_BASE_URL}/api/jobs/${jobId}/snapshot`;
+};
+
 // --- AUTHENTICATION API ---
 
 export const loginUser = async (email: string, password: string) => {
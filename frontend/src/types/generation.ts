@@ -1,8 +1,17 @@
+export interface DuplicateSource {
+    name: string;
+    duplicate_of: string;
+    match: 'exact' | 'near';
+    similarity: number;
+}
+
 export interface GenerationSource {
     name: string;
     kind: string;
     size_bytes?: number;
     skipped?: boolean;
+    duplicates_skipped?: number;
+    duplicates?: DuplicateSource[];
 }
 
 export interface DeckMetric {
@@ -53,6 +62,7 @@ export interface PresentationSlide {
     flow_steps: string[];
     quote: string;
     accent: string;
+    content_origin?: 'llm' | 'fallback';
     render_payload?: SlideRenderPayload;
 }
 
@@ -70,6 +80,82 @@ export interface GenerationSourceSummary {
     text_sources: number;
     image_sources: number;
     archive_entries: number;
+    code_outlines?: number;
+    duplicate_sources?: number;
+    duplicate_chars_skipped?: number;
+    filtered_sources?: number;
+    filtered_bytes?: Record<string, number>;
+    duplicate_images?: number;
+    image_bytes_in?: number;
+    image_bytes_saved?: number;
+}
+
+export interface DeckRevision {
+    kind: 'slides' | 'theme';
+    slide_indexes?: number[];
+    origins?: Record<string, 'llm' | 'fallback'>;
+    theme_vibe?: string;
+    narrative_ms?: number;
+    render_ms: number;
+}
+
+export type GenerationMode = 'standard' | 'draft' | 'draft_refine' | 'batch';
+
+export interface BriefVariant {
+    label?: string;
+    target_audience?: string;
+    persona?: string;
+    purpose?: string;
+    key_message?: string;
+    design_vibe?: string;
+}
+
+export interface SlideQualityReport {
+    scores: { score: number; issues: string[]; passed: boolean }[];
+    failing: number[];
+    mean_score: number;
+    repaired?: number[];
+}
+
+export interface DeckArtifact {
+    key: string;
+    size: number;
+    content_type: string;
+    created_at: number;
+    etag: string;
+    render_source?: 'memory' | 'disk' | 'render';
+    snapshot?: DeckSnapshot;
+}
+
+export interface DeckSnapshot {
+    key: string;
+    size: number;
+    content_type: string;
+    created_at: number;
+    etag: string;
+    deck_key: string;
+    url: string;
+}
+
+export interface ThemePreview {
+    theme: string;
+    theme_vibe: string;
+    artifact: DeckArtifact;
+    download_url: string;
+}
+
+export interface ThemePreviewResponse {
+    job_id: string;
+    variants: ThemePreview[];
+    render_ms: number;
+}
+
+export interface BatchVariantStatus {
+    label: string;
+    job_id: string;
+    status: string;
+    current_step: string;
+    progress_percent: number;
 }
 
 export interface GenerationStatusPayload {
@@ -84,4 +170,21 @@ export interface GenerationStatusPayload {
     slides_generated: number;
     source_summary: GenerationSourceSummary;
     presentation_json: PresentationDeck | null;
+    deadline_seconds?: number | null;
+    fallback_slides?: number[];
+    generation_mode?: GenerationMode;
+    is_draft?: boolean;
+    draft_ms?: number | null;
+    refine_status?: 'processing' | 'completed' | 'error' | null;
+    refine_job_id?: string | null;
+    revision?: number;
+    last_revision?: DeckRevision | null;
+    time_to_first_slide_ms?: number | null;
+    streamed_slides?: number;
+    slide_quality?: SlideQualityReport | null;
+    artifact?: DeckArtifact | null;
+    snapshot_url?: string | null;
+    parent_job_id?: string | null;
+    variant_label?: string | null;
+    variants?: BatchVariantStatus[] | null;
 }